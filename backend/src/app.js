@@ -60,7 +60,8 @@ app.get('/api', (req, res) => {
             events: {
                 'GET /api/events': 'Get all active events',
                 'GET /api/events/:id': 'Get event by ID',
-                'GET /api/events/upcoming': 'Get upcoming events'
+                'GET /api/events/upcoming': 'Get upcoming events',
+                'GET /api/events/version': 'Get the catalog version (changes only when events change)'
             },
             subscriptions: {
                 'POST /api/subscribe': 'Subscribe to event notifications',
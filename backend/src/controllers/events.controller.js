@@ -1,3 +1,4 @@
+const mongoose = require('mongoose');
 const Event = require('../models/Event');
 
 // @desc    Get all active events
@@ -135,6 +136,52 @@ const getEventsByDateRange = async (req, res, next) => {
     }
 };
 
+// @desc    Get upcoming events near a point, nearest first
+// @route   GET /api/events/nearby?lat=-33.86&lon=151.21&radius=2 (radius in km)
+// @access  Public
+const getNearbyEvents = async (req, res, next) => {
+    try {
+        const lat = parseFloat(req.query.lat);
+        const lon = parseFloat(req.query.lon);
+        const radius = req.query.radius === undefined ? 2 : parseFloat(req.query.radius);
+
+        if (isNaN(lat) || isNaN(lon) || Math.abs(lat) > 90 || Math.abs(lon) > 180) {
+            return res.status(400).json({
+                success: false,
+                message: 'Please provide a valid lat and lon'
+            });
+        }
+
+        if (isNaN(radius) || radius <= 0 || radius > 50) {
+            return res.status(400).json({
+                success: false,
+                message: 'Radius must be between 0 and 50 km'
+            });
+        }
+
+        // Served by the 2dsphere index on geo; $nearSphere sorts by distance
+        const events = await Event.find({
+            is_active: true,
+            date: { $gte: new Date() },
+            geo: {
+                $nearSphere: {
+                    $geometry: { type: 'Point', coordinates: [lon, lat] },
+                    $maxDistance: radius * 1000
+                }
+            }
+        });
+
+        res.status(200).json({
+            success: true,
+            count: events.length,
+            near: { lat, lon, radius },
+            data: events
+        });
+    } catch (error) {
+        next(error);
+    }
+};
+
 // @desc    Search events by title or location
 // @route   GET /api/events/search?q=searchterm
 // @access  Public
@@ -197,6 +244,29 @@ const getEventStats = async (req, res, next) => {
     }
 };
 
+// @desc    Get the catalog version written by the scraper
+// @route   GET /api/events/version
+// @access  Public
+const getCatalogVersion = async (req, res, next) => {
+    try {
+        const version = await mongoose.connection
+            .collection('catalog_version')
+            .findOne({ _id: 'events' });
+
+        res.status(200).json({
+            success: true,
+            data: {
+                version: version ? version.version : 0,
+                active_digest: version ? version.active_digest : null,
+                changes: version ? version.changes : {},
+                updated_at: version ? version.updated_at : null
+            }
+        });
+    } catch (error) {
+        next(error);
+    }
+};
+
 module.exports = {
     getAllEvents,
     getUpcomingEvents,
@@ -204,5 +274,7 @@ module.exports = {
     getEventsBySource,
     getEventsByDateRange,
     searchEvents,
-    getEventStats
+    getNearbyEvents,
+    getEventStats,
+    getCatalogVersion
 };
@@ -0,0 +1,101 @@
+const fs = require('fs');
+const path = require('path');
+
+/**
+ * Precomputed Payload Middleware
+ * Serves list endpoints from the pre-compressed payloads the scraper writes
+ * to API_CACHE_DIR after each run, falling through to the normal handler
+ * when no valid payload exists
+ */
+
+// How often the manifest file is checked for a newer run (ms)
+const MANIFEST_CHECK_INTERVAL = 1000;
+
+// Preferred encodings, best first
+const ENCODINGS = ['br', 'gzip', 'identity'];
+
+const acceptsEncoding = (header, encoding) => {
+    if (encoding === 'identity') {
+        return true;
+    }
+    return (header || '').split(',').some((part) => {
+        const [name, ...params] = part.trim().split(';');
+        const rejected = params.some((param) => param.trim().replace(/\s/g, '') === 'q=0');
+        return (name === encoding || name === '*') && !rejected;
+    });
+};
+
+const servePrecomputed = (name) => {
+    const cacheDir = process.env.API_CACHE_DIR;
+    const manifestPath = cacheDir && path.join(cacheDir, `${name}.meta.json`);
+
+    // Current manifest and its loaded bodies, keyed by encoding
+    let state = null;
+    let checkedAt = 0;
+
+    const refresh = async () => {
+        const now = Date.now();
+        if (now - checkedAt < MANIFEST_CHECK_INTERVAL) {
+            return state;
+        }
+        checkedAt = now;
+
+        try {
+            const stat = await fs.promises.stat(manifestPath);
+            if (state && state.mtimeMs === stat.mtimeMs) {
+                return state;
+            }
+
+            const manifest = JSON.parse(await fs.promises.readFile(manifestPath, 'utf8'));
+            const bodies = {};
+            for (const [encoding, entry] of Object.entries(manifest.files)) {
+                bodies[encoding] = await fs.promises.readFile(path.join(cacheDir, entry.file));
+            }
+
+            state = {
+                mtimeMs: stat.mtimeMs,
+                etag: manifest.etag,
+                expiresAt: manifest.expires_at ? Date.parse(manifest.expires_at) : null,
+                bodies
+            };
+        } catch (error) {
+            // Missing or half-replaced files: serve from the database until the next check
+            state = null;
+        }
+
+        return state;
+    };
+
+    return async (req, res, next) => {
+        if (!manifestPath) {
+            return next();
+        }
+
+        const payload = await refresh();
+        if (!payload || (payload.expiresAt && Date.now() >= payload.expiresAt)) {
+            return next();
+        }
+
+        res.set('ETag', payload.etag);
+        res.set('Vary', 'Accept-Encoding');
+        res.set('Cache-Control', 'no-cache');
+
+        if (req.headers['if-none-match'] === payload.etag) {
+            return res.status(304).end();
+        }
+
+        const encoding = ENCODINGS.find(
+            (candidate) => payload.bodies[candidate] && acceptsEncoding(req.headers['accept-encoding'], candidate)
+        );
+        const body = payload.bodies[encoding];
+
+        res.set('Content-Type', 'application/json; charset=utf-8');
+        if (encoding !== 'identity') {
+            res.set('Content-Encoding', encoding);
+        }
+        res.set('Content-Length', body.length);
+        res.status(200).end(req.method === 'HEAD' ? undefined : body);
+    };
+};
+
+module.exports = { servePrecomputed };
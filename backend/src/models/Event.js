@@ -62,6 +62,21 @@ const eventSchema = new mongoose.Schema({
     type: Date,
     default: Date.now
   },
+  // Venue coordinates from the scraper's gazetteer, as a GeoJSON point
+  geo: {
+    type: {
+      type: String,
+      enum: ['Point']
+    },
+    coordinates: {
+      type: [Number], // [lon, lat]
+      default: undefined
+    }
+  },
+  geohash: {
+    type: String,
+    index: true
+  },
   // Additional fields for duplicate detection
   event_hash: {
     type: String,
@@ -77,6 +92,10 @@ const eventSchema = new mongoose.Schema({
 // Compound index for efficient queries
 eventSchema.index({ date: 1, is_active: 1 });
 eventSchema.index({ source: 1, is_active: 1 });
+// Stored detail lookup by ticket URL (scraper detail fan-out)
+eventSchema.index({ ticket_url: 1 });
+// Nearby-event queries
+eventSchema.index({ geo: '2dsphere' });
 
 // Virtual for checking if event has passed
 eventSchema.virtual('isPast').get(function () {
@@ -7,14 +7,19 @@ const {
     getEventsBySource,
     getEventsByDateRange,
     searchEvents,
-    getEventStats
+    getNearbyEvents,
+    getEventStats,
+    getCatalogVersion
 } = require('../controllers/events.controller');
+const { servePrecomputed } = require('../middleware/precomputed');
 
-// Event routes
-router.get('/', getAllEvents);
-router.get('/upcoming', getUpcomingEvents);
+// Event routes (list endpoints use the scraper's precomputed payloads when available)
+router.get('/', servePrecomputed('events'), getAllEvents);
+router.get('/upcoming', servePrecomputed('upcoming'), getUpcomingEvents);
 router.get('/stats', getEventStats);
+router.get('/version', getCatalogVersion);
 router.get('/search', searchEvents);
+router.get('/nearby', getNearbyEvents);
 router.get('/range', getEventsByDateRange);
 router.get('/source/:source', getEventsBySource);
 router.get('/:id', getEventById);
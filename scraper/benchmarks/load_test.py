@@ -0,0 +1,243 @@
+"""
+Fetch Load Test
+Crawls a local mock site farm through BaseScraper.fetch_page to exercise the
+fetch, retry and politeness machinery offline and reproducibly
+
+Usage:
+    python benchmarks/load_test.py --sites 4 --pages 20 --workers 16
+    python benchmarks/load_test.py --error-rate 0.05 --rate-limit-rate 0.02 --latency-ms 20
+    python benchmarks/load_test.py --record fixtures/   # record the crawl as a fixture run
+    python benchmarks/load_test.py --replay fixtures/   # replay it without any server
+    python benchmarks/load_test.py --incremental        # second crawl knowing the first one's events
+    python benchmarks/load_test.py --incremental --full-crawl   # ...still walking every listing page
+    python benchmarks/load_test.py --urls http://127.0.0.1:8001,http://127.0.0.1:8002
+        # against a farm started separately with benchmarks/mock_sites.py, so the
+        # servers do not share this process's interpreter lock
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+
+# Add scraper directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_sites import MockSiteFarm, add_site_arguments, site_options
+from benchmarks.run_benchmarks import SyntheticListingScraper
+from utils.date_parser import parse_event_date
+from utils.detail_fanout import fan_out_details
+from utils.frontier import PAGINATION
+from utils.host_control import HOSTS
+from utils.fetch_cache import RESPONSES
+from utils.metrics import (
+    REGISTRY, PAGES_FETCHED, FETCH_RETRIES, FETCH_FAILURES, BYTES_FETCHED, CACHE_HITS, diff_snapshots
+)
+from utils.page_archive import PageArchive, make_run_id
+
+
+class MockSiteScraper(SyntheticListingScraper):
+    """
+    Scraper for one mock site: crawls the listing pagination, then fans out to
+    the detail pages of events it has not stored yet.
+    """
+    
+    has_detail_pages = True
+    
+    def __init__(self, base_url, workers):
+        super().__init__()
+        self.source_name = f"mock:{base_url.rsplit(':', 1)[-1]}"
+        self.base_url = base_url
+        self.workers = workers
+        # Let every worker thread keep its own connection
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        # Loopback traffic never goes through a proxy; skip the per-request environment scan
+        self.session.trust_env = False
+        # Stands in for the events collection: ticket URL to stored details
+        self.stored = {}
+    
+    def parse_listing(self, soup, url):
+        events = [
+            self.create_event(card['title'], parse_event_date(card['date']), card['location'],
+                              card['description'], card['image_url'], card['ticket_url'])
+            for card in self.extract_cards(soup)
+        ]
+        next_link = soup.select_one('a[rel=next]')
+        return events, [(next_link['href'], PAGINATION)] if next_link else []
+    
+    def parse_detail(self, soup, event):
+        return {'description': self.extract_text(soup.select_one('.event-description'))}
+    
+    def crawl_site(self, parse=True):
+        """
+        Crawl the site.
+        
+        Args:
+            parse (bool): Parse listing pages (needed to discover detail pages)
+        
+        Returns:
+            int: Pages fetched successfully
+        """
+        if not parse:
+            return int(self.fetch_page(self.make_absolute_url('/events?page=1')) is not None)
+        
+        self.events = []
+        events = self.crawl(['/events?page=1'])
+        details = fan_out_details(self, events, self.stored, self.workers)
+        
+        for event in events:
+            self.stored[event['ticket_url']] = {
+                'listing_fingerprint': event['listing_fingerprint'],
+                'description': event['description']
+            }
+        
+        return self.crawl_stats['fetched'] + details['fetched']
+
+
+def run_load_test(urls, workers, parse=True, politeness=False, retry_delay=0.01,
+                  record_archive=None, replay_archive=None, replay_run='latest', incremental=False,
+                  full_crawl=False):
+    """
+    Crawl every site concurrently and measure throughput.
+    
+    Args:
+        urls (list): Base URLs of the sites
+        workers (int): Concurrent detail fetches per site
+        parse (bool): Parse listings to discover detail pages
+        politeness (bool): Keep the scraper's politeness delay
+        retry_delay (float): Base retry backoff in seconds
+        record_archive (PageArchive, optional): Record every exchange as a fixture run
+        replay_archive (PageArchive, optional): Serve requests from a fixture run instead
+        replay_run (str): Fixture run to replay
+        incremental (bool): Crawl once to learn the events, then measure a second
+                            crawl that only fetches detail pages of new events and
+                            stops at pages holding only known events
+        full_crawl (bool): With incremental, still crawl every listing page
+    
+    Returns:
+        dict: Pages, seconds, pages per second and fetch metric deltas
+    """
+    record_run = make_run_id() if record_archive is not None else None
+    # Fresh host state, allowed to grow to the worker count, and no cached pages
+    HOSTS.reset(max_limit=workers)
+    RESPONSES.clear()
+    scrapers = []
+    for url in urls:
+        scraper = MockSiteScraper(url, workers)
+        scraper.retry_delay = retry_delay
+        if not politeness:
+            scraper.politeness_delay = None
+        if record_archive is not None:
+            scraper.record_fixtures(record_archive, record_run)
+        elif replay_archive is not None:
+            scraper.replay_fixtures(replay_archive, replay_run)
+        scrapers.append(scraper)
+    
+    if incremental:
+        with ThreadPoolExecutor(max_workers=len(scrapers)) as pool:
+            list(pool.map(lambda s: s.crawl_site(parse), scrapers))
+        if not full_crawl:
+            for scraper in scrapers:
+                scraper.known_hashes = {event['event_hash'] for event in scraper.events}
+        # The second crawl is a new run: it may only reuse what was stored
+        RESPONSES.clear()
+    
+    before = REGISTRY.snapshot()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(scrapers)) as pool:
+        pages = sum(pool.map(lambda s: s.crawl_site(parse), scrapers))
+    seconds = time.perf_counter() - start
+    
+    if record_archive is not None:
+        record_archive.close()
+    
+    delta = diff_snapshots(before, REGISTRY.snapshot())
+    totals = {
+        metric.name: sum(delta.get(metric.name, {}).values())
+        for metric in (PAGES_FETCHED, BYTES_FETCHED, FETCH_RETRIES, FETCH_FAILURES)
+    }
+    cache_hits = {}
+    for labels, value in delta.get(CACHE_HITS.name, {}).items():
+        cache = labels.split('cache="')[1].split('"')[0]
+        cache_hits[cache] = cache_hits.get(cache, 0) + value
+    
+    return {
+        'pages': pages,
+        'seconds': round(seconds, 3),
+        'pages_per_sec': round(pages / seconds, 1) if seconds else None,
+        'retries': totals[FETCH_RETRIES.name],
+        'failures': totals[FETCH_FAILURES.name],
+        'megabytes': round(totals[BYTES_FETCHED.name] / 2**20, 2),
+        'details_reused': cache_hits.get('detail', 0),
+        'responses_shared': cache_hits.get('response', 0) + cache_hits.get('coalesced', 0),
+        'fixture_run': record_run,
+        'hosts': HOSTS.snapshot()
+    }
+
+
+def main():
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='Load test the fetch path against mock sites')
+    add_site_arguments(parser)
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent detail fetches per site')
+    parser.add_argument('--no-parse', action='store_true', help='Fetch only the first listing page per site')
+    parser.add_argument('--politeness', action='store_true', help="Keep the scraper's politeness delay")
+    parser.add_argument('--retry-delay', type=float, default=0.01, help='Base retry backoff in seconds')
+    parser.add_argument('--record', metavar='ARCHIVE_DIR', help='Record the crawl as a fixture run')
+    parser.add_argument('--replay', metavar='ARCHIVE_DIR', help='Replay a recorded fixture run, no servers')
+    parser.add_argument('--run', default='latest', help='Fixture run to replay')
+    parser.add_argument('--urls', help='Comma-separated base URLs of an already running farm')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Measure a second crawl that already knows the first crawl\'s events')
+    parser.add_argument('--full-crawl', action='store_true',
+                        help='With --incremental, crawl every listing page and skip only detail pages')
+    args = parser.parse_args()
+    
+    record_archive = PageArchive(args.record) if args.record else None
+    replay_archive = PageArchive(args.replay) if args.replay else None
+    
+    print("=" * 70)
+    print("FETCH LOAD TEST")
+    print("=" * 70)
+    
+    if replay_archive is not None:
+        # Fixture URLs carry the recorded ports, so rebuild the site list from the run
+        urls = sorted({
+            entry['url'].split('/events')[0]
+            for entry in replay_archive.iter_run(args.run)
+            if '/events' in entry['url']
+        })
+        result = run_load_test(urls, args.workers, not args.no_parse, args.politeness, args.retry_delay,
+                               replay_archive=replay_archive, replay_run=args.run, incremental=args.incremental, full_crawl=args.full_crawl)
+        counts = None
+    elif args.urls:
+        result = run_load_test(args.urls.split(','), args.workers, not args.no_parse, args.politeness,
+                               args.retry_delay, record_archive=record_archive, incremental=args.incremental, full_crawl=args.full_crawl)
+        counts = None
+    else:
+        with MockSiteFarm(args.sites, **site_options(args)) as farm:
+            result = run_load_test(farm.urls, args.workers, not args.no_parse, args.politeness,
+                                   args.retry_delay, record_archive=record_archive, incremental=args.incremental, full_crawl=args.full_crawl)
+            counts = farm.counts()
+    
+    print(f"[OK] Pages: {result['pages']} in {result['seconds']}s ({result['pages_per_sec']} pages/s)")
+    print(f"[OK] Data: {result['megabytes']} MB")
+    print(f"[OK] Retries: {result['retries']}, failures: {result['failures']}")
+    print(f"[OK] Detail pages reused: {result['details_reused']}")
+    print(f"[OK] Responses shared in-run: {result['responses_shared']}")
+    for host, state in result['hosts'].items():
+        print(f"[OK] {host}: limit {state['limit']}, circuit {state['state']}")
+    if counts:
+        print(f"[OK] Server responses: {counts}")
+    if result['fixture_run']:
+        print(f"[OK] Recorded fixture run: {result['fixture_run']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Mock Site Farm
+Local HTTP servers serving synthetic or recorded event pages, with injectable
+latency, server errors, 429 rate limiting and configurable pagination depth
+
+Usage:
+    python benchmarks/mock_sites.py --sites 3 --pages 20 --latency-ms 50 --error-rate 0.05
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Add scraper directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_events, make_date_strings, make_listing_html, make_detail_html
+
+
+class MockSite:
+    """
+    One simulated event site.
+    
+    Listing pages live at /events?page=N (1-based, N up to pages), each linking
+    to the next, and every card links to a detail page at /e/<n>. Faults are
+    decided by hashing (seed, path, how often the path was requested), so a
+    run sees the same faults for the same request sequence regardless of
+    thread scheduling.
+    """
+    
+    def __init__(self, pages=10, per_page=50, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 rate_limit_rate=0.0, retry_after=1, seed=42, fixtures=None):
+        """
+        Build the site's pages.
+        
+        Args:
+            pages (int): Pagination depth of the listing
+            per_page (int): Events per listing page
+            latency_ms (float): Delay before every response
+            jitter_ms (float): Extra random delay, up to this much
+            error_rate (float): Share of requests answered with a 500
+            rate_limit_rate (float): Share of requests answered with a 429
+            retry_after (int): Retry-After seconds sent with 429s
+            seed (int): Seed for content and fault injection
+            fixtures (tuple, optional): (PageArchive, run_id) to serve recorded pages instead
+        """
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        
+        self.pages = self._recorded_pages(*fixtures) if fixtures else self._synthetic_pages(pages, per_page)
+        
+        self.counts = {'requests': 0, 'ok': 0, 'errors': 0, 'throttled': 0, 'not_found': 0}
+        self._hits = {}
+        self._lock = threading.Lock()
+        self.server = None
+        self.thread = None
+    
+    def _synthetic_pages(self, pages, per_page):
+        events = make_events(pages * per_page, duplicate_rate=0, seed=self.seed)
+        dates = make_date_strings(pages * per_page, seed=self.seed)
+        for i, event in enumerate(events):
+            event['ticket_url'] = f"/e/{i}"
+        
+        site = {}
+        for page in range(pages):
+            chunk = slice(page * per_page, (page + 1) * per_page)
+            next_url = f"/events?page={page + 2}" if page + 1 < pages else None
+            site[f"/events?page={page + 1}"] = make_listing_html(events[chunk], dates[chunk], next_url).encode('utf-8')
+        for i, event in enumerate(events):
+            site[f"/e/{i}"] = make_detail_html(event).encode('utf-8')
+        site['/events'] = site['/events?page=1']
+        return site
+    
+    def _recorded_pages(self, archive, run_id):
+        site = {}
+        for entry in archive.iter_run(run_id):
+            if entry['status'] == 200:
+                parts = urlsplit(entry['url'])
+                path = parts.path + (f"?{parts.query}" if parts.query else '')
+                site[path] = archive.get(entry['sha256'])
+        return site
+    
+    def _roll(self, path):
+        """Deterministic number in [0, 1) for the nth request of a path."""
+        with self._lock:
+            n = self._hits.get(path, 0)
+            self._hits[path] = n + 1
+            self.counts['requests'] += 1
+        digest = hashlib.blake2b(f"{self.seed}:{path}:{n}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') / 2**64
+    
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+    
+    def handle(self, path):
+        """
+        Decide the response to a request.
+        
+        Args:
+            path (str): Request path with query string
+        
+        Returns:
+            tuple: (status, headers, body)
+        """
+        delay = self.latency + (self.jitter * self._roll('jitter:' + path) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        
+        roll = self._roll(path)
+        if roll < self.rate_limit_rate:
+            self._count('throttled')
+            return 429, {'Retry-After': str(self.retry_after)}, b'Too Many Requests'
+        if roll < self.rate_limit_rate + self.error_rate:
+            self._count('errors')
+            return 500, {}, b'Internal Server Error'
+        
+        body = self.pages.get(path)
+        if body is None:
+            self._count('not_found')
+            return 404, {}, b'Not Found'
+        
+        self._count('ok')
+        return 200, {'Content-Type': 'text/html; charset=utf-8'}, body
+    
+    def start(self, host='127.0.0.1', port=0):
+        """
+        Serve the site on a background thread.
+        
+        Args:
+            host (str): Interface to bind
+            port (int): Port, 0 for any free port
+        
+        Returns:
+            str: Base URL of the site
+        """
+        site = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                status, headers, body = site.handle(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+    
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def stop(self):
+        """Stop serving."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class MockSiteFarm:
+    """
+    Several mock sites, each on its own port, used as a context manager.
+    """
+    
+    def __init__(self, count, first_port=0, **site_options):
+        """
+        Args:
+            count (int): Number of sites
+            first_port (int): Port of the first site, following sites count up; 0 for any free ports
+            **site_options: Options passed to every MockSite (each gets its own seed)
+        """
+        seed = site_options.pop('seed', 42)
+        self.sites = [MockSite(seed=seed + i, **site_options) for i in range(count)]
+        self.first_port = first_port
+        self.urls = []
+    
+    def __enter__(self):
+        self.urls = [
+            site.start(port=self.first_port + i if self.first_port else 0)
+            for i, site in enumerate(self.sites)
+        ]
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        for site in self.sites:
+            site.stop()
+        return False
+    
+    def counts(self):
+        """
+        Sum the request counters of all sites.
+        
+        Returns:
+            dict: Totals per response kind
+        """
+        totals = {}
+        for site in self.sites:
+            for key, value in site.counts.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+
+def add_site_arguments(parser):
+    """
+    Add the mock site options to an argument parser.
+    
+    Args:
+        parser (argparse.ArgumentParser): Parser to extend
+    """
+    parser.add_argument('--sites', type=int, default=3, help='Number of mock sites')
+    parser.add_argument('--pages', type=int, default=10, help='Pagination depth per site')
+    parser.add_argument('--per-page', type=int, default=50, help='Events per listing page')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay before each response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Extra random delay up to this much')
+    parser.add_argument('--error-rate', type=float, default=0, help='Share of requests answered with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0, help='Share of requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on 429s')
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def site_options(args):
+    """
+    Turn parsed arguments into MockSite options.
+    
+    Returns:
+        dict: Keyword arguments for MockSite / MockSiteFarm
+    """
+    return {
+        'pages': args.pages,
+        'per_page': args.per_page,
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'error_rate': args.error_rate,
+        'rate_limit_rate': args.rate_limit_rate,
+        'retry_after': args.retry_after,
+        'seed': args.seed
+    }
+
+
+def main():
+    """
+    Serve a mock site farm until interrupted.
+    """
+    parser = argparse.ArgumentParser(description='Serve mock event sites')
+    add_site_arguments(parser)
+    parser.add_argument('--archive-dir', help='Serve pages recorded in this archive instead')
+    parser.add_argument('--run', default='latest', help='Archived run to serve with --archive-dir')
+    parser.add_argument('--port', type=int, default=0, help='Port of the first site (next sites count up)')
+    args = parser.parse_args()
+    
+    options = site_options(args)
+    if args.archive_dir:
+        from utils.page_archive import PageArchive
+        options['fixtures'] = (PageArchive(args.archive_dir), args.run)
+    
+    with MockSiteFarm(args.sites, first_port=args.port, **options) as farm:
+        for url in farm.urls:
+            print(f"[OK] Serving {url}/events")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\n[STOP] Requests: {farm.counts()}")
+
+
+if __name__ == "__main__":
+    main()
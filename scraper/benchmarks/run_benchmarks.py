@@ -0,0 +1,433 @@
+"""
+Benchmark Runner
+Times the scraper pipeline stages on synthetic data and stores JSON results
+
+Usage:
+    python benchmarks/run_benchmarks.py --scale 1k
+    python benchmarks/run_benchmarks.py --scale 100k --only hash,dedup
+    python benchmarks/run_benchmarks.py --scale 1k --compare benchmarks/results/<earlier>.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add scraper directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import SCALES, make_events, make_date_strings, make_listing_pages
+from utils.base_scraper import BaseScraper
+from utils.deduplicate import generate_event_hash, remove_duplicates, add_hash_to_event, hash_event_keys
+from utils.date_parser import parse_event_date, is_past_date
+from utils.event_batch import EventBatch
+from utils.event_record import Event
+from utils.snapshot import SnapshotReader, write_snapshot
+from utils.validation import EventValidator
+from utils.text_normalize import clean_text, normalize_field, title_key, location_key
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Slowdown (as a fraction) beyond which a benchmark counts as a regression
+DEFAULT_THRESHOLD = 0.10
+
+
+class SyntheticListingScraper(BaseScraper):
+    """
+    Scraper for the synthetic listing pages, extracting cards the way a real source would.
+    """
+    
+    def __init__(self):
+        super().__init__(source_name='bench.example.com', base_url='https://bench.example.com')
+    
+    def extract_cards(self, soup):
+        """
+        Extract raw card fields from a parsed listing page.
+        
+        Args:
+            soup: BeautifulSoup object of a listing page
+        
+        Returns:
+            list: Dictionaries of raw field values
+        """
+        cards = []
+        for card in soup.select('article.event-card'):
+            cards.append({
+                'title': self.extract_text(card.select_one('.event-title')),
+                'date': self.extract_text(card.select_one('.event-date')),
+                'location': self.extract_text(card.select_one('.event-venue')),
+                'description': self.extract_text(card.select_one('.event-description')),
+                'image_url': self.extract_attribute(card.select_one('.event-image'), 'src'),
+                'ticket_url': self.extract_attribute(card.select_one('.event-link'), 'href'),
+            })
+        return cards
+
+
+def timed(func):
+    """
+    Run a function once with the garbage collector paused.
+    
+    Args:
+        func (callable): Function to time
+    
+    Returns:
+        float: Elapsed seconds
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def bench_hash(n):
+    events = make_events(n)
+    return n, timed(lambda: [
+        generate_event_hash(e['title'], e['date'], e['location']) for e in events
+    ])
+
+
+def bench_dedup(n):
+    events = make_events(n)
+    return n, timed(lambda: remove_duplicates(events))
+
+
+def bench_date_parse(n):
+    strings = make_date_strings(n)
+    return n, timed(lambda: [parse_event_date(s) for s in strings])
+
+
+def bench_process_loop(n):
+    # Scrapers hash events as they create them, so the pipeline input carries hashes
+    events = [add_hash_to_event(e) for e in make_events(n)]
+    return n, timed(lambda: [e for e in remove_duplicates(events) if not is_past_date(e['date'])])
+
+
+def bench_process_batch(n):
+    events = [add_hash_to_event(e) for e in make_events(n)]
+    return n, timed(lambda: EventBatch.from_events(events).deduplicate().filter_upcoming().records)
+
+
+def bench_parse_extract(n):
+    pages = make_listing_pages(n)
+    scraper = SyntheticListingScraper()
+    return n, timed(lambda: [scraper.extract_cards(scraper.parse_html(page)) for page in pages])
+
+
+def bench_create_event(n):
+    events = make_events(n)
+    scraper = SyntheticListingScraper()
+    return n, timed(lambda: [
+        scraper.create_event(e['title'], e['date'], e['location'], e['description'],
+                             e['image_url'], e['ticket_url'])
+        for e in events
+    ])
+
+
+def bench_validate(n):
+    events = [add_hash_to_event(e) for e in make_events(n)]
+    validator = EventValidator()
+    result = {}
+    seconds = timed(lambda: result.update(validator.validate(events)))
+    return n, seconds, {
+        'rejected': len(result['rejected']),
+        'normalized': sum(result['normalized'].values())
+    }
+
+
+def _legacy_clean_text(text):
+    # BaseScraper.clean_text before utils.text_normalize
+    if not text:
+        return ""
+    text = ' '.join(text.split())
+    text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+    return text.strip()
+
+
+def _legacy_normalize_title(title):
+    normalized = title.lower().strip()
+    for char in [',', '.', '!', '?', ':', ';', '"', "'"]:
+        normalized = normalized.replace(char, '')
+    return ' '.join(normalized.split())
+
+
+def _legacy_normalize_location(location):
+    normalized = location.lower().strip()
+    for full, abbr in {'street': 'st', 'avenue': 'ave', 'road': 'rd', 'sydney': 'syd', 'australia': 'aus'}.items():
+        normalized = normalized.replace(full, abbr)
+    return ' '.join(normalized.split())
+
+
+def bench_normalize_text(n):
+    # Scraped text as it arrives: padded, wrapped, and now and then with entities or NBSPs
+    fields = [
+        (f"  {e['title']}\n" + (' &amp; Friends' if i % 10 == 0 else ''),
+         e['date'],
+         e['location'].replace(' ', '\xa0', 1) if i % 10 == 5 else f"{e['location']}\t",
+         e['description'])
+        for i, e in enumerate(make_events(n))
+    ]
+    
+    def legacy():
+        for title, date, location, description in fields:
+            title, location = _legacy_clean_text(title), _legacy_clean_text(location)
+            _legacy_clean_text(description)
+            generate_event_hash(title, date, location)
+            _legacy_normalize_title(title)
+            _legacy_normalize_location(location)
+    
+    def engine():
+        for title, date, location, description in fields:
+            (title, title_hash_key), (location, location_hash_key) = normalize_field(title), normalize_field(location)
+            clean_text(description)
+            hash_event_keys(title_hash_key, date, location_hash_key)
+            title_key(title)
+            location_key(location)
+    
+    legacy_seconds = timed(legacy)
+    seconds = timed(engine)
+    return n, seconds, {
+        'legacy_seconds': round(legacy_seconds, 6),
+        'speedup': round(legacy_seconds / seconds, 2) if seconds else None
+    }
+
+
+def _traced_size(build):
+    """Return the bytes allocated by build() that are still alive, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+def bench_event_memory(n):
+    events = make_events(n)
+    # Field values are shared by both representations, so only the
+    # per-event container overhead is measured
+    rows = [tuple(e[field] for field in Event.FIELDS) for e in events]
+    
+    dict_bytes, _ = _traced_size(lambda: [dict(zip(Event.FIELDS, row)) for row in rows])
+    start = time.perf_counter()
+    record_bytes, _ = _traced_size(lambda: [Event(*row) for row in rows])
+    seconds = time.perf_counter() - start
+    
+    return n, seconds, {
+        'dict_bytes_per_event': round(dict_bytes / n, 1),
+        'record_bytes_per_event': round(record_bytes / n, 1),
+        'saving_per_1m_mb': round((dict_bytes - record_bytes) / n * 1_000_000 / 2**20, 1)
+    }
+
+
+def bench_snapshot_scan(n):
+    events = [add_hash_to_event(e) for e in make_events(n)]
+    directory = tempfile.mkdtemp()
+    try:
+        write_snapshot(events, directory)
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        with SnapshotReader(directory) as reader:
+            # A week-long window every 30 days across the year
+            return n, timed(lambda: [
+                sum(1 for _ in reader.range_scan(start + timedelta(days=d), start + timedelta(days=d + 7)))
+                for d in range(0, 365, 30)
+            ])
+    finally:
+        shutil.rmtree(directory)
+
+
+def bench_db_write(n, uri=None):
+    from utils.storage import connect_database
+    from run_scraper import ScraperRunner
+    
+    uri = uri or os.getenv('BENCH_MONGODB_URI', 'mongodb://localhost:27017/louderx-bench?serverSelectionTimeoutMS=500')
+    db = connect_database(uri)
+    db.command('ping')
+    
+    db.events.drop()
+    db.events.create_index('event_hash', unique=True, sparse=True)
+    
+    runner = ScraperRunner(sources=[])
+    runner.db = db
+    runner.all_events = [add_hash_to_event(e) for e in remove_duplicates(make_events(n))]
+    count = len(runner.all_events)
+    
+    try:
+        return count, timed(runner.save_to_database)
+    finally:
+        db.events.drop()
+
+
+def bench_db_write_memory(n):
+    # Same write path against the in-process store: no database needed
+    return bench_db_write(n, 'memory://louderx-bench')
+
+
+# Name -> (function, largest n worth running)
+BENCHMARKS = {
+    'hash': (bench_hash, None),
+    'dedup': (bench_dedup, None),
+    'process_loop': (bench_process_loop, None),
+    'process_batch': (bench_process_batch, None),
+    'date_parse': (bench_date_parse, 100_000),
+    'parse_extract': (bench_parse_extract, 100_000),
+    'create_event': (bench_create_event, None),
+    'validate': (bench_validate, None),
+    'normalize_text': (bench_normalize_text, None),
+    'event_memory': (bench_event_memory, 200_000),
+    'snapshot_scan': (bench_snapshot_scan, 100_000),
+    'db_write': (bench_db_write, 20_000),
+    'db_write_memory': (bench_db_write_memory, 20_000),
+}
+
+
+def git_commit():
+    """
+    Get the current commit id, if the tree is a git checkout.
+    
+    Returns:
+        str: Short commit id or 'unknown'
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_benchmarks(scale, names):
+    """
+    Run the selected benchmarks at a scale.
+    
+    Args:
+        scale (str): Key of SCALES
+        names (list): Benchmark names to run
+    
+    Returns:
+        dict: Results document
+    """
+    size = SCALES[scale]
+    results = {}
+    
+    for name in names:
+        func, cap = BENCHMARKS[name]
+        n = min(size, cap) if cap else size
+        
+        try:
+            count, seconds, *extra = func(n)
+        except Exception as e:
+            print(f"[SKIP] {name}: {e}")
+            results[name] = {'skipped': str(e)}
+            continue
+        
+        results[name] = {
+            'n': count,
+            'seconds': round(seconds, 6),
+            'per_op_us': round(seconds / count * 1e6, 3) if count else None,
+            'ops_per_sec': round(count / seconds, 1) if seconds else None
+        }
+        print(f"[OK] {name}: {count} ops in {seconds:.3f}s ({results[name]['ops_per_sec']} ops/s)")
+        
+        if extra:
+            results[name].update(extra[0])
+            for key, value in extra[0].items():
+                print(f"     {key}: {value}")
+    
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'scale': scale,
+        'results': results
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two result documents by time per operation.
+    
+    Args:
+        baseline (dict): Earlier results
+        current (dict): New results
+        threshold (float): Allowed slowdown before flagging a regression
+    
+    Returns:
+        list: Names of regressed benchmarks
+    """
+    regressions = []
+    
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name, {})
+        if not result.get('per_op_us') or not before.get('per_op_us'):
+            continue
+        
+        change = result['per_op_us'] / before['per_op_us'] - 1
+        status = 'REGRESSION' if change > threshold else 'OK'
+        print(f"[{status}] {name}: {before['per_op_us']}us -> {result['per_op_us']}us ({change:+.1%})")
+        
+        if change > threshold:
+            regressions.append(name)
+    
+    return regressions
+
+
+def main():
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='Scraper pipeline benchmarks')
+    parser.add_argument('--scale', choices=list(SCALES), default='1k')
+    parser.add_argument('--only', help='Comma-separated benchmark names')
+    parser.add_argument('--output', help='Result file (default: results/<timestamp>-<commit>.json)')
+    parser.add_argument('--compare', help='Earlier result file to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown per op before failing, e.g. 0.1 for 10%%')
+    args = parser.parse_args()
+    
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+    
+    print("=" * 70)
+    print(f"SCRAPER BENCHMARKS ({args.scale})")
+    print("=" * 70)
+    
+    report = run_benchmarks(args.scale, names)
+    
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{report['commit']}-{args.scale}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults: {output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print("-" * 70)
+        regressions = compare_results(baseline, report, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
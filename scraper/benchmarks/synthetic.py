@@ -0,0 +1,211 @@
+"""
+Synthetic Data Generator
+Builds realistic event dicts, date strings and listing HTML for benchmarks
+"""
+
+import random
+from datetime import datetime, timedelta
+from html import escape
+
+
+SCALES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+ADJECTIVES = ['Harbour', 'Midnight', 'Summer', 'Vivid', 'Electric', 'Golden', 'Secret', 'Open-Air',
+              'Late-Night', 'Indie', 'Classic', 'Botanic', 'Coastal', 'Urban', 'Winter']
+SUBJECTS = ['Jazz', 'Food & Wine', 'Tech', 'Comedy', 'Film', 'Art', 'Markets', 'Theatre', 'Yoga',
+            'Craft Beer', 'Design', 'Poetry', 'Dance', 'Photography', 'Startup']
+FORMATS = ['Festival', 'Night', 'Meetup', 'Showcase', 'Session', 'Tour', 'Workshop', 'Fair',
+           'Gala', 'Series']
+VENUES = ['Sydney Opera House', 'The Basement, Circular Quay', 'Stone & Chalk, Sydney',
+          'Darling Harbour', 'Art Gallery of NSW', 'Carriageworks, Eveleigh',
+          'Royal Botanic Garden', 'Enmore Theatre, Newtown', '123 George Street, Sydney',
+          'Bondi Pavilion, Bondi Beach', 'Museum of Contemporary Art, The Rocks',
+          'ICC Sydney, Darling Harbour', '45 King Street Wharf', 'Manly Corso, Manly']
+SOURCES = ['timeout.com/sydney', 'eventbrite.com.au/sydney', 'whatson.cityofsydney.nsw.gov.au']
+
+# Date strings in the shapes seen on listing pages
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%d %B %Y',
+    '%b %d, %Y',
+    '%d/%m/%Y',
+    '%A %d %B %Y, %I:%M %p',
+    '%a %d %b %Y %H:%M',
+    '%B %d, %Y at %I:%M %p',
+    '%Y-%m-%dT%H:%M:%S',
+]
+
+
+def make_date_strings(count, seed=42):
+    """
+    Generate date strings in a mix of listing-page formats.
+    
+    Args:
+        count (int): Number of strings
+        seed (int): Random seed
+    
+    Returns:
+        list: Date strings
+    """
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 1, 18, 0)
+    
+    return [
+        (base + timedelta(days=rng.randrange(365), minutes=30 * rng.randrange(12)))
+        .strftime(rng.choice(DATE_FORMATS))
+        for _ in range(count)
+    ]
+
+
+def _variant(title, rng):
+    """Return a cosmetic variant of a title, as a second source would list it."""
+    choice = rng.randrange(3)
+    if choice == 0:
+        return title.lower()
+    if choice == 1:
+        return title.upper()
+    return '  ' + title.replace(' ', '  ') + ' '
+
+
+def make_events(count, duplicate_rate=0.15, seed=42):
+    """
+    Generate event dictionaries shaped like BaseScraper.create_event output.
+    A share of events repeat an earlier event, either exactly or with the
+    case and whitespace differences seen across sources.
+    
+    Args:
+        count (int): Number of events
+        duplicate_rate (float): Share of events that duplicate an earlier one
+        seed (int): Random seed
+    
+    Returns:
+        list: Event dictionaries
+    """
+    rng = random.Random(seed)
+    base = datetime.now().replace(hour=19, minute=0, second=0, microsecond=0)
+    events = []
+    
+    for i in range(count):
+        if events and rng.random() < duplicate_rate:
+            original = events[rng.randrange(len(events))]
+            event = dict(original)
+            event['source'] = rng.choice(SOURCES)
+            if rng.random() < 0.5:
+                event['title'] = _variant(original['title'], rng)
+            events.append(event)
+            continue
+        
+        title = f"{rng.choice(ADJECTIVES)} {rng.choice(SUBJECTS)} {rng.choice(FORMATS)} #{i}"
+        slug = title.lower().replace(' ', '-').replace('#', '').replace('&', 'and')
+        source = rng.choice(SOURCES)
+        
+        events.append({
+            'title': title,
+            'date': base + timedelta(days=rng.randrange(-30, 365)),
+            'location': rng.choice(VENUES),
+            'description': f"{title} at {rng.choice(VENUES)}. " * rng.randint(1, 6),
+            'image_url': f"https://example.com/images/{slug}.jpg",
+            'ticket_url': f"https://www.{source.split('/')[0]}/e/{slug}",
+            'source': source,
+            'is_active': True,
+            'last_updated': datetime.now()
+        })
+    
+    return events
+
+
+def make_listing_html(events, date_strings=None, next_url='?page=2'):
+    """
+    Render events as a listing page of event cards.
+    
+    Args:
+        events (list): Event dictionaries
+        date_strings (list, optional): Date text per event; ISO dates if omitted
+        next_url (str, optional): Target of the pagination link; no link if None
+    
+    Returns:
+        str: HTML document
+    """
+    cards = []
+    for i, event in enumerate(events):
+        date_text = date_strings[i] if date_strings else event['date'].strftime('%Y-%m-%d %H:%M')
+        cards.append(
+            '<article class="event-card">'
+            f'<a class="event-link" href="{escape(event["ticket_url"])}">'
+            f'<img class="event-image" src="{escape(event["image_url"])}" alt="">'
+            f'<h3 class="event-title">{escape(event["title"])}</h3></a>'
+            f'<time class="event-date">{escape(date_text)}</time>'
+            f'<span class="event-venue">{escape(event["location"])}</span>'
+            f'<p class="event-description">{escape(event["description"])}</p>'
+            '</article>'
+        )
+    
+    pagination = (
+        f'<nav class="pagination"><a rel="next" href="{escape(next_url)}">Next</a></nav>'
+        if next_url else ''
+    )
+    
+    return (
+        '<!DOCTYPE html><html><head><title>Events in Sydney</title></head><body>'
+        '<header><nav><a href="/">Home</a><a href="/events">Events</a></nav></header>'
+        f'<main><section class="event-list">{"".join(cards)}</section>'
+        f'{pagination}</main>'
+        '<footer>&copy; Example</footer></body></html>'
+    )
+
+
+def make_detail_html(event):
+    """
+    Render an event's detail page.
+    
+    Args:
+        event (dict): Event dictionary
+    
+    Returns:
+        str: HTML document
+    """
+    return (
+        f'<!DOCTYPE html><html><head><title>{escape(event["title"])}</title></head><body>'
+        '<main class="event-detail">'
+        f'<h1 class="event-title">{escape(event["title"])}</h1>'
+        f'<img class="event-image" src="{escape(event["image_url"])}" alt="">'
+        f'<time class="event-date">{event["date"].strftime("%Y-%m-%d %H:%M")}</time>'
+        f'<span class="event-venue">{escape(event["location"])}</span>'
+        f'<div class="event-description">{escape(event["description"])}</div>'
+        f'<a class="event-tickets" href="{escape(event["ticket_url"])}">Tickets</a>'
+        '</main></body></html>'
+    )
+
+
+def make_listing_pages(count, per_page=50, seed=42):
+    """
+    Generate listing pages holding a total number of events.
+    
+    Args:
+        count (int): Total number of events
+        per_page (int): Events per page
+        seed (int): Random seed
+    
+    Returns:
+        list: HTML documents
+    """
+    events = make_events(count, seed=seed)
+    date_strings = make_date_strings(count, seed=seed)
+    
+    return [
+        make_listing_html(events[i:i + per_page], date_strings[i:i + per_page])
+        for i in range(0, count, per_page)
+    ]
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    sample = make_events(5)
+    for event in sample:
+        print(f"{event['title']!r} @ {event['location']} ({event['source']})")
+    print(make_date_strings(5))
+    print(f"Listing page size: {len(make_listing_pages(50)[0])} bytes")
@@ -0,0 +1,166 @@
+"""
+Worker Scaling Benchmark
+Starts N `worker.py work` processes against one MongoDB and measures how the
+throughput of the shared lease queue scales with them
+
+Each run seeds tasks-per-worker x N synthetic tasks into a collection of its
+own (WORKER_TASK_COLLECTION), so real crawl tasks are never touched. A task
+sleeps like a source task's fetches and then burns CPU like its parsing (see
+worker.run_bench). Throughput is counted from the first claim to the last
+completion, so interpreter startup is left out.
+
+Usage:
+    MONGODB_URI=mongodb://localhost:27017/louderx-bench python benchmarks/worker_scaling.py
+    python benchmarks/worker_scaling.py --workers 1,2,4,8 --tasks-per-worker 50 --wait-ms 100 --cpu-ms 20
+    python benchmarks/worker_scaling.py --output benchmarks/results/workers.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Add scraper directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.lease_queue import LeaseQueue
+from utils.storage import connect_database
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Collection the benchmark's tasks live in, dropped before every run
+BENCH_COLLECTION = 'bench_worker_tasks'
+
+
+def seed(queue, count, wait, cpu):
+    """
+    Replace the benchmark collection's tasks with count fresh ones.
+    
+    Args:
+        queue (LeaseQueue): Queue on the benchmark collection
+        count (int): Tasks to enqueue
+        wait (float): Seconds each task sleeps
+        cpu (float): CPU seconds each task spends
+    """
+    queue.collection.drop()
+    queue.ensure_indexes()
+    for i in range(count):
+        queue.enqueue(f"bench:{i}", 'bench', {'wait': wait, 'cpu': cpu})
+
+
+def run_workers(workers, uri, timeout):
+    """
+    Start worker processes and wait until they have drained the queue.
+    
+    Args:
+        workers (int): Worker processes to start
+        uri (str): MongoDB URI shared by all of them
+        timeout (float): Seconds to wait for each process
+    
+    Returns:
+        list: Exit codes
+    """
+    env = dict(os.environ, MONGODB_URI=uri, WORKER_TASK_COLLECTION=BENCH_COLLECTION)
+    processes = [
+        subprocess.Popen([sys.executable, 'worker.py', 'work'], cwd=SCRAPER_DIR, env=env,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(workers)
+    ]
+    return [process.wait(timeout) for process in processes]
+
+
+def measure(queue, workers):
+    """
+    Read the throughput of a finished run off its task documents.
+    
+    Args:
+        queue (LeaseQueue): Queue on the benchmark collection
+        workers (int): Worker processes that ran
+    
+    Returns:
+        dict: Task counts, span, tasks per second and tasks per worker process
+    """
+    tasks = list(queue.collection.find({}, {'status': 1, 'leased_at': 1, 'finished_at': 1, 'result': 1}))
+    done = [task for task in tasks if task['status'] == 'done']
+    if not done:
+        return {'workers': workers, 'tasks': len(tasks), 'done': 0}
+    
+    span = (max(task['finished_at'] for task in done) - min(task['leased_at'] for task in done)).total_seconds()
+    per_process = {}
+    for task in done:
+        pid = (task.get('result') or {}).get('pid')
+        per_process[pid] = per_process.get(pid, 0) + 1
+    
+    return {
+        'workers': workers,
+        'tasks': len(tasks),
+        'done': len(done),
+        'seconds': round(span, 3),
+        'tasks_per_sec': round(len(done) / span, 1) if span else None,
+        'per_process': sorted(per_process.values(), reverse=True)
+    }
+
+
+def main():
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='Lease queue throughput with N worker processes')
+    parser.add_argument('--workers', default='1,2,4,8', help='Comma-separated worker process counts')
+    parser.add_argument('--tasks-per-worker', type=int, default=50)
+    parser.add_argument('--wait-ms', type=float, default=100, help='Simulated fetch time per task')
+    parser.add_argument('--cpu-ms', type=float, default=20, help='Simulated parse time per task')
+    parser.add_argument('--timeout', type=float, default=600, help='Seconds to wait for each run')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+    
+    uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/louderx-bench')
+    if uri.startswith('memory://'):
+        parser.error("memory:// stores live inside one process; point MONGODB_URI at a mongod")
+    
+    counts = [int(count) for count in args.workers.split(',')]
+    queue = LeaseQueue(connect_database(uri)[BENCH_COLLECTION])
+    
+    print("=" * 70)
+    print(f"WORKER SCALING ({uri})")
+    print("=" * 70)
+    
+    results = []
+    for workers in counts:
+        seed(queue, workers * args.tasks_per_worker, args.wait_ms / 1000, args.cpu_ms / 1000)
+        started = time.perf_counter()
+        exit_codes = run_workers(workers, uri, args.timeout)
+        result = measure(queue, workers)
+        result['wall_seconds'] = round(time.perf_counter() - started, 3)
+        
+        if any(exit_codes) or result['done'] != result['tasks']:
+            print(f"[ERROR] {workers} workers: {result['done']}/{result['tasks']} tasks done, "
+                  f"exit codes {exit_codes}")
+        else:
+            print(f"[OK] {workers} workers: {result['tasks_per_sec']} tasks/s "
+                  f"({result['done']} tasks in {result['seconds']}s, per process {result['per_process']})")
+        results.append(result)
+    
+    # Linear scaling keeps tasks per second per worker constant
+    base = results[0]
+    for result in results[1:]:
+        if result.get('tasks_per_sec') and base.get('tasks_per_sec'):
+            speedup = result['tasks_per_sec'] / base['tasks_per_sec']
+            result['speedup'] = round(speedup, 2)
+            result['efficiency'] = round(speedup * base['workers'] / result['workers'], 2)
+            print(f"  {result['workers']} vs {base['workers']} workers: {result['speedup']}x, "
+                  f"{result['efficiency']:.0%} of linear")
+    
+    queue.collection.drop()
+    
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'uri': uri, 'args': vars(args), 'results': results}, f, indent=2)
+        print(f"\nResults: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
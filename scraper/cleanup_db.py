@@ -10,37 +10,69 @@ from datetime import datetime
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from utils.api_payloads import publish_api_payloads
+from utils.catalog_version import count_change, bump_catalog_version
+from utils.storage import connect_database
+from sources.registry import load_cities, city_path
+
 from dotenv import load_dotenv
 load_dotenv()
 
 # MongoDB connection
 try:
-    from pymongo import MongoClient
-    mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/sydney-events')
-    client = MongoClient(mongodb_uri)
-    db = client.get_database()
+    db = connect_database(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/sydney-events'))
     print(f"[OK] Connected to MongoDB: {db.name}\n")
 except Exception as e:
     print(f"[ERROR] Failed to connect to MongoDB: {e}")
     exit(1)
 
 
-def mark_expired_events():
+def city_database(city=None):
+    """
+    Get the database of a city's events.
+    
+    Args:
+        city (str, optional): City slug; the default city if omitted
+    
+    Returns:
+        Database: The city's database, or the default one if it has none of its own
+    """
+    database = load_cities().get(city, {}).get('database') if city else None
+    if not database:
+        return db
+    return connect_database(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/sydney-events'), database)
+
+
+def mark_expired_events(city=None):
     """
     Mark all past events as inactive.
+    
+    Args:
+        city (str, optional): City whose events to check; the default city if omitted
     """
-    print("Marking Expired Events")
+    print("Marking Expired Events" + (f" ({city})" if city else ""))
     print("-" * 50)
     
-    events_collection = db.events
+    city_db = city_database(city)
+    events_collection = city_db.events
     
     try:
+        expired = {
+            'date': {'$lt': datetime.now()},
+            'is_active': True
+        }
+        
+        # Per-source counts for the catalog version
+        changes = {}
+        for group in events_collection.aggregate([
+            {'$match': expired},
+            {'$group': {'_id': '$source', 'count': {'$sum': 1}}}
+        ]):
+            count_change(changes, group['_id'], 'deactivated', group['count'])
+        
         # Find and update past events
         result = events_collection.update_many(
-            {
-                'date': {'$lt': datetime.now()},
-                'is_active': True
-            },
+            expired,
             {
                 '$set': {
                     'is_active': False,
@@ -53,6 +85,11 @@ def mark_expired_events():
         print(f"[OK] Total past events: {events_collection.count_documents({'date': {'$lt': datetime.now()}})}")
         print()
         
+        # Signal the change and drop deactivated events from the precomputed API payloads
+        if result.modified_count:
+            bump_catalog_version(city_db, changes)
+            publish_api_payloads(city_db, city_path(os.getenv('API_CACHE_DIR'), city))
+        
         return result.modified_count
         
     except Exception as e:
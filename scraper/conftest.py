@@ -0,0 +1,102 @@
+"""
+Test Fixtures
+Fake listing source shared by the crawl tests: numbered listing pages served
+from memory through a requests transport adapter, so that fetch_page, its
+retries, the host controls and the response cache run as against a real site
+"""
+
+import os
+import sys
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.base_scraper import BaseScraper
+from utils.fetch_cache import RESPONSES
+from utils.frontier import PAGINATION
+from utils.host_control import HOSTS
+
+
+class ListingAdapter(BaseAdapter):
+    """
+    Transport adapter answering for a ListingSource, recording every request.
+    """
+    
+    def __init__(self, source):
+        super().__init__()
+        self.source = source
+    
+    def send(self, request, **kwargs):
+        source = self.source
+        source.fetched.append(request.url)
+        if len(source.fetched) == source.crash_at:
+            raise KeyboardInterrupt(f"Crashed fetching {request.url}")
+        
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = source.status.get(source.page_number(request.url), 200)
+        response._content = b'<ul></ul>'
+        return response
+    
+    def close(self):
+        pass
+
+
+class ListingSource(BaseScraper):
+    """
+    Source whose listing pages (?page=N) hold a few events each and link to
+    the pages links(N) returns as pagination.
+    """
+    
+    def __init__(self, links, events_per_page=0, crash_at=None, status=None):
+        """
+        Args:
+            links (callable): Page number to the page numbers it links to
+            events_per_page (int): Events on every page
+            crash_at (int, optional): Request, counting from 1, that raises KeyboardInterrupt
+            status (dict, optional): Page number to the HTTP status it answers with
+        """
+        super().__init__('test.example/listing', 'https://test.example')
+        self.links = links
+        self.events_per_page = events_per_page
+        self.crash_at = crash_at
+        self.status = status or {}
+        self.fetched = []
+        self.use_transport(ListingAdapter(self))
+    
+    @staticmethod
+    def page_number(url):
+        """Page number of a listing URL."""
+        return int(url.rsplit('=', 1)[1])
+    
+    def parse_listing(self, soup, url):
+        page = self.page_number(url)
+        events = [
+            self.create_event(f"Event {page}-{i}", None, 'Circular Quay', '', '', f"/e/{page}-{i}")
+            for i in range(self.events_per_page)
+        ]
+        return events, [(f"/listing?page={linked}", PAGINATION) for linked in self.links(page)]
+
+
+@pytest.fixture
+def listing_source():
+    """
+    Factory of fake listing sources. Each call stands for a new run: the
+    response cache and the host controls start empty.
+    
+    Returns:
+        callable: Takes ListingSource's arguments, returns a ListingSource
+    """
+    def make(*args, **kwargs):
+        RESPONSES.clear()
+        HOSTS.reset()
+        return ListingSource(*args, **kwargs)
+    
+    yield make
+    RESPONSES.clear()
+    HOSTS.reset()
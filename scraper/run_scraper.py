@@ -5,14 +5,39 @@ Coordinates all event scrapers and saves results to database
 
 import sys
 import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sources.sydney_events import TimeOutScraper, EventbriteSydneyScraper, WhatsonScraper
-from utils.deduplicate import remove_duplicates, add_hash_to_event
-from utils.date_parser import is_past_date
+from sources.registry import select_sources, create_scrapers, load_cities, city_path, DEFAULT_CITY
+from utils.deduplicate import generate_content_fingerprint
+from utils.event_batch import EventBatch
+from utils.event_record import to_document
+from utils.recrawl import plan_recrawl, record_refresh, DEFAULT_FETCH_BUDGET
+from utils.metrics import (
+    REGISTRY, STAGE_SECONDS, EVENTS_SCRAPED, EVENTS_SAVED, EVENTS_REJECTED, EVENTS_NORMALIZED, QUEUE_DEPTH, RUNS,
+    write_run_report
+)
+from utils.profiling import RunProfiler, make_run_dir
+from utils.snapshot import write_snapshot, collect_garbage
+from utils.api_payloads import publish_api_payloads
+from utils.catalog_version import count_change, total_changes, bump_catalog_version
+from utils.run_diff import diff_run, due_full_crawl, record_crawls, DEFAULT_GRACE_RUNS
+from utils.page_archive import PageArchive, ArchiveReplayAdapter, make_run_id
+from utils.storage import connect_database, GEOSPHERE
+from utils.detail_fanout import load_stored_details, fan_out_details, DEFAULT_WORKERS
+from utils.host_control import HOSTS
+from utils.fetch_cache import RESPONSES
+from utils.checkpoint import RunCheckpoint, find_unfinished_run, CHECKPOINT_EVERY, DEFAULT_CHECKPOINT_DIR
+from utils.deadline import Deadline, load_backlog, save_backlog, DEFAULT_TIME_BUDGET
+from utils.validation import EventValidator, quarantine_events
+from utils.geocode import Gazetteer, GeocodeCache, geocode_events, DEFAULT_CACHE_DIR
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -21,11 +46,11 @@ load_dotenv()
 # Import MongoDB connection
 try:
     import pymongo
-    from pymongo import MongoClient
     MONGODB_AVAILABLE = True
 except ImportError:
     MONGODB_AVAILABLE = False
-    print("Warning: pymongo not available. Will print events instead of saving to database.")
+    print("Warning: pymongo not available. Will print events instead of saving to database "
+          "(set MONGODB_URI=memory:// to use the in-process store).")
 
 
 class ScraperRunner:
@@ -33,25 +58,131 @@ class ScraperRunner:
     Main runner that coordinates all scrapers and saves to database.
     """
     
-    def __init__(self):
-        self.scrapers = [
-            TimeOutScraper(),
-            EventbriteSydneyScraper(),
-            WhatsonScraper()
-        ]
+    # Fields that scrapers may update on an already stored event
+    CONTENT_FIELDS = ('title', 'location', 'description', 'image_url', 'ticket_url')
+    
+    def __init__(self, sources=None, profiler=None, archive_dir=None, reparse_run=None, incremental=True,
+                 run_id=None, tags=None, city=None, time_budget=None):
+        """
+        Initialize the runner.
+        
+        Args:
+            sources (list, optional): Source names to run; all sources if omitted
+            profiler (RunProfiler, optional): Profiler that records each stage
+            archive_dir (str, optional): Raw page archive; PAGE_ARCHIVE_DIR if omitted
+            reparse_run (str, optional): Archived run id to replay instead of fetching;
+                the replay crawls every archived page and retires no events
+            incremental (bool): Stop paginating a source at pages holding only stored events
+            run_id (str, optional): Id of an interrupted run to resume; a new run if omitted
+            tags (list, optional): Run only sources with any of these tags
+            city (str, optional): City to scrape, in its own database and run
+                directories (see sources.registry); DEFAULT_CITY if omitted
+            time_budget (float, optional): Seconds the run may take, after which it
+                takes no new work and writes what it has; RUN_TIME_BUDGET if omitted
+        """
+        self.city = city or DEFAULT_CITY
+        self.city_settings = load_cities().get(self.city, {})
+        
+        # Only the selected sources' modules are imported
+        self.scrapers = create_scrapers(select_sources(sources, tags, [self.city]))
         self.all_events = []
+        # Per-source inserted/updated/deactivated counts of this run
+        self.changes = {}
+        # Event hashes returned by each successfully scraped source
+        self.seen_hashes = {}
+        # Sources whose crawl stopped before their last page, so their listing is partial
+        self.partial_sources = set()
+        self.diff_report = {}
+        self.detail_report = {}
+        self.validation_report = {}
+        self.geocode_report = {}
+        # An archived run says nothing about what vanished from, or is already stored
+        # by, a source since; replays neither stop early nor deactivate events
+        self.reparsing = bool(reparse_run)
+        self.incremental = incremental and not self.reparsing
         self.db = None
+        self.profiler = profiler
+        self.run_id = run_id or make_run_id()
+        # Opened by run(), so an interrupted run resumes under the same id
+        self.checkpoint = None
+        # Started by run(); until then stages run without a deadline
+        self.time_budget = DEFAULT_TIME_BUDGET if time_budget is None else time_budget
+        self.deadline = Deadline()
+        # Sources not scraped before the deadline
+        self.skipped_sources = []
+        self.skipped_report = {}
+        
+        # Archive raw pages, or replay an archived run with no network access
+        archive_dir = archive_dir or os.getenv('PAGE_ARCHIVE_DIR')
+        self.archive = PageArchive(archive_dir) if archive_dir else None
+        if reparse_run:
+            if self.archive is None:
+                raise ValueError("Reparsing needs an archive directory (PAGE_ARCHIVE_DIR or --archive-dir)")
+            adapter = ArchiveReplayAdapter(self.archive, reparse_run)
+            for scraper in self.scrapers:
+                scraper.use_transport(adapter)
+            print(f"[OK] Replaying archived run {adapter.run_id} ({len(adapter.entries)} pages)")
+        elif self.archive is not None:
+            for scraper in self.scrapers:
+                scraper.archive = self.archive
+                scraper.run_id = self.run_id
         
-        if MONGODB_AVAILABLE:
+        mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/sydney-events')
+        if MONGODB_AVAILABLE or mongodb_uri.startswith('memory://'):
             try:
-                mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/sydney-events')
-                self.client = MongoClient(mongodb_uri)
-                self.db = self.client.get_database()
+                self.db = connect_database(mongodb_uri, self.city_settings.get('database'))
                 print(f"[OK] Connected to MongoDB: {self.db.name}")
             except Exception as e:
                 print(f"[ERROR] Failed to connect to MongoDB: {e}")
                 self.db = None
     
+    def _stage(self, name, source=None):
+        """
+        Profile a pipeline stage when profiling is enabled.
+        
+        Args:
+            name (str): Stage name
+            source (str, optional): Source the stage runs for
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name, source)
+    
+    def open_checkpoint(self):
+        """
+        Open the run's checkpoint in CHECKPOINT_DIR, resuming its progress if
+        the run was interrupted before. An empty CHECKPOINT_DIR disables checkpoints.
+        """
+        checkpoint_dir = city_path(os.getenv('CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR), self.city)
+        if not checkpoint_dir:
+            return
+        
+        self.checkpoint = RunCheckpoint(self.run_id, checkpoint_dir)
+        for scraper in self.scrapers:
+            scraper.checkpoint = self.checkpoint
+        if self.checkpoint.resumed:
+            self.changes = self.checkpoint.changes
+            print(f"[OK] Resuming run {self.run_id} from checkpoint")
+    
+    def _run_once(self, name, func):
+        """
+        Run a stage after the database write, skipping it if it already ran
+        before a resumed run was interrupted.
+        
+        Args:
+            name (str): Stage name
+            func (callable): Stage to run
+        """
+        if self.checkpoint is not None and self.checkpoint.stage_done(name):
+            print(f"[SKIP] {name}: done before the interruption")
+            return
+        
+        with self._stage(name):
+            func()
+        
+        if self.checkpoint is not None:
+            self.checkpoint.finish_stage(name)
+    
     def run_all_scrapers(self):
         """
         Run all configured scrapers.
@@ -60,20 +191,130 @@ class ScraperRunner:
             list: Combined list of all scraped events
         """
         print("=" * 70)
-        print("SYDNEY EVENTS SCRAPER")
+        print(f"{self.city_settings.get('name', self.city).upper()} EVENTS SCRAPER")
         print("=" * 70)
         print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         
+        if self.incremental:
+            self.load_known_hashes()
+        self.load_backlog()
+        
         for scraper in self.scrapers:
-            try:
-                events = scraper.scrape()
-                self.all_events.extend(events)
+            restored = self.checkpoint is not None and self.checkpoint.source_done(scraper.source_name)
+            if not restored and self.deadline.expired():
+                print(f"[SKIP] Time budget reached, not scraping {scraper.source_name}\n")
+                self.skipped_sources.append(scraper.source_name)
+                continue
+            
+            if restored:
+                events, crawl_complete = self.checkpoint.source_events(scraper.source_name)
+                print(f"[OK] {scraper.source_name}: {len(events)} events restored from checkpoint\n")
+            else:
+                try:
+                    with self._stage('scrape', scraper.source_name), \
+                            STAGE_SECONDS.time(stage='scrape', source=scraper.source_name):
+                        events = scraper.scrape()
+                except Exception as e:
+                    print(f"[ERROR] Error scraping {scraper.source_name}: {e}\n")
+                    continue
+                crawl_complete = scraper.crawl_complete
+                if self.checkpoint is not None:
+                    self.checkpoint.finish_source(scraper.source_name, events, crawl_complete)
+                EVENTS_SCRAPED.inc(len(events), source=scraper.source_name)
                 print(f"[OK] {scraper.source_name}: {len(events)} events scraped\n")
-            except Exception as e:
-                print(f"[ERROR] Error scraping {scraper.source_name}: {e}\n")
+            
+            self.all_events.extend(events)
+            self.seen_hashes[scraper.source_name] = {event['event_hash'] for event in events}
+            if not crawl_complete:
+                self.partial_sources.add(scraper.source_name)
         
         return self.all_events
     
+    def load_known_hashes(self):
+        """
+        Give each scraper the hashes of its stored active events, so that its
+        crawl can stop paginating once it reaches pages with nothing new.
+        Sources due for a full crawl (see record_crawls) get none.
+        """
+        if self.db is None:
+            return
+        
+        try:
+            due = due_full_crawl(self.db, [scraper.source_name for scraper in self.scrapers])
+        except Exception as e:
+            print(f"[ERROR] Failed to load crawl state: {e}")
+            due = set()
+        
+        for scraper in self.scrapers:
+            if scraper.source_name in due:
+                print(f"[OK] {scraper.source_name}: full crawl, so vanished events can be retired")
+                continue
+            try:
+                scraper.known_hashes = set(self.db.events.distinct(
+                    'event_hash', {'source': scraper.source_name, 'is_active': True}
+                ))
+            except Exception as e:
+                print(f"[ERROR] Failed to load known events for {scraper.source_name}: {e}")
+    
+    def load_backlog(self):
+        """
+        Put the work the last run skipped for lack of time first: its skipped
+        sources run before the others, and its skipped pages are queued ahead
+        of each crawl's start pages.
+        """
+        if self.db is None:
+            return
+        
+        try:
+            backlog = load_backlog(self.db, [scraper.source_name for scraper in self.scrapers])
+        except Exception as e:
+            print(f"[ERROR] Failed to load skipped work of the last run: {e}")
+            return
+        
+        # Stable sort: the backlog goes first, otherwise registry order
+        skipped = set(backlog['sources'])
+        self.scrapers.sort(key=lambda scraper: scraper.source_name not in skipped)
+        for scraper in self.scrapers:
+            scraper.backlog_pages = backlog['pages'].get(scraper.source_name, [])
+        
+        pages = sum(len(scraper.backlog_pages) for scraper in self.scrapers)
+        if skipped or pages:
+            print(f"[OK] Last run skipped {len(skipped)} sources and {pages} pages: running them first\n")
+    
+    def record_skipped_work(self):
+        """
+        Store what this run skipped when its time budget ran out, and the
+        crawl pages it failed to fetch, for the next run to do first. The
+        backlog of sources this run finished is cleared; that of sources
+        outside it is left alone.
+        """
+        skipped = set(self.skipped_sources)
+        # A source skipped again keeps the pages an earlier run left it
+        pages = {
+            scraper.source_name: scraper.backlog_pages if scraper.source_name in skipped
+            else scraper.skipped_pages + scraper.failed_pages
+            for scraper in self.scrapers
+        }
+        pages = {source: left for source, left in pages.items() if left}
+        failed = sum(len(scraper.failed_pages) for scraper in self.scrapers if scraper.source_name not in skipped)
+        self.skipped_report.update({
+            'sources': self.skipped_sources,
+            'pages': sum(len(left) for left in pages.values()) - failed,
+            'failed_pages': failed
+        })
+        if self.skipped_sources or self.skipped_report['pages']:
+            print(f"[WARNING] Time budget reached: {len(self.skipped_sources)} sources and "
+                  f"{self.skipped_report['pages']} pages skipped, queued for the next run")
+        if failed:
+            print(f"[WARNING] {failed} pages failed to fetch, queued for the next run")
+        
+        if self.db is None:
+            return
+        try:
+            save_backlog(self.db, [scraper.source_name for scraper in self.scrapers], self.skipped_sources, pages)
+        except Exception as e:
+            print(f"[ERROR] Failed to record skipped work: {e}")
+    
     def process_events(self):
         """
         Process scraped events: deduplicate and filter.
@@ -88,24 +329,144 @@ class ScraperRunner:
         initial_count = len(self.all_events)
         print(f"Initial events: {initial_count}")
         
+        batch = EventBatch.from_events(self.all_events)
+        
         # Remove duplicates
-        self.all_events = remove_duplicates(self.all_events)
-        print(f"After deduplication: {len(self.all_events)}")
+        with STAGE_SECONDS.time(stage='dedup'):
+            batch = batch.deduplicate()
+        print(f"After deduplication: {len(batch)}")
         
         # Filter out past events
-        self.all_events = [e for e in self.all_events if not is_past_date(e['date'])]
-        print(f"After filtering past events: {len(self.all_events)}")
+        with STAGE_SECONDS.time(stage='filter'):
+            batch = batch.filter_upcoming()
+        print(f"After filtering past events: {len(batch)}")
+        
+        for source, count in sorted(batch.source_counts().items()):
+            print(f"  {source}: {count}")
+        
+        self.all_events = batch.records
+        QUEUE_DEPTH.set(len(self.all_events), queue='events')
         
         duplicates_removed = initial_count - len(self.all_events)
         print(f"Total removed: {duplicates_removed}\n")
         
         return self.all_events
     
+    def fetch_listing_details(self, workers=None):
+        """
+        Complete the events of sources with detail pages from those pages.
+        Only new events and events whose listing changed are fetched; the rest
+        reuse the description already stored.
+        
+        Args:
+            workers (int, optional): Concurrent detail fetches per source
+        """
+        scrapers = [scraper for scraper in self.scrapers if scraper.has_detail_pages]
+        if not scrapers:
+            return
+        
+        if workers is None:
+            workers = int(os.getenv('DETAIL_WORKERS', DEFAULT_WORKERS))
+        
+        print("-" * 70)
+        print("FETCHING DETAIL PAGES")
+        print("-" * 70)
+        
+        for scraper in scrapers:
+            events = [event for event in self.all_events if event['source'] == scraper.source_name]
+            if not events:
+                continue
+            
+            stored = {}
+            if self.db is not None:
+                try:
+                    ticket_urls = [event['ticket_url'] for event in events if event.get('ticket_url')]
+                    stored = load_stored_details(self.db.events, ticket_urls)
+                except Exception as e:
+                    print(f"[ERROR] Failed to load stored details for {scraper.source_name}: {e}")
+            
+            result = fan_out_details(scraper, events, stored, workers, self.deadline)
+            self.detail_report[scraper.source_name] = result
+            print(f"[OK] {scraper.source_name}: {result['fetched']} fetched, {result['reused']} reused, "
+                  f"{result['failed']} failed, {result['skipped']} skipped")
+        print()
+    
+    def validate_events(self):
+        """
+        Check the batch against the backend Event model before it is written
+        (see utils.validation): fields are trimmed and truncated to fit, and
+        events that still fail a rule are quarantined instead of saved.
+        """
+        print("-" * 70)
+        print("VALIDATING EVENTS")
+        print("-" * 70)
+        
+        with STAGE_SECONDS.time(stage='validate'):
+            result = EventValidator().validate(self.all_events)
+        
+        for event, rules in result['rejected']:
+            for rule in rules:
+                EVENTS_REJECTED.inc(rule=rule, source=event.get('source') or '')
+        for rule, count in result['normalized'].items():
+            EVENTS_NORMALIZED.inc(count, rule=rule)
+        
+        self.all_events = result['valid']
+        self.validation_report = {
+            'rejected': len(result['rejected']),
+            'rejections': result['rejections'],
+            'normalized': result['normalized']
+        }
+        QUEUE_DEPTH.set(len(self.all_events), queue='events')
+        
+        for rule, count in sorted(result['normalized'].items()):
+            print(f"[OK] Normalized {rule}: {count}")
+        for rule, count in sorted(result['rejections'].items()):
+            print(f"[WARNING] Rejected {rule}: {count}")
+        
+        if result['rejected'] and self.db is not None:
+            try:
+                quarantine_events(self.db.quarantine, result['rejected'], self.run_id)
+            except Exception as e:
+                print(f"[ERROR] Failed to quarantine rejected events: {e}")
+        
+        print(f"[OK] Valid: {len(self.all_events)}, quarantined: {len(result['rejected'])}\n")
+    
+    def geocode_events(self):
+        """
+        Attach coordinates to events at venues the local gazetteer knows
+        (see utils.geocode), through a cache kept in GEOCODE_CACHE_DIR.
+        """
+        print("-" * 70)
+        print("GEOCODING EVENTS")
+        print("-" * 70)
+        
+        try:
+            gazetteer = Gazetteer()
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Failed to load the gazetteer: {e}\n")
+            return
+        cache = GeocodeCache(gazetteer, city_path(os.getenv('GEOCODE_CACHE_DIR', DEFAULT_CACHE_DIR), self.city))
+        
+        with STAGE_SECONDS.time(stage='geocode'):
+            self.geocode_report = geocode_events(self.all_events, cache, self.city)
+        
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"[ERROR] Failed to save the geocode cache: {e}")
+        
+        print(f"[OK] Resolved: {self.geocode_report['resolved']} "
+              f"({self.geocode_report['cached']} locations from the cache)")
+        print(f"[SKIP] Unresolved: {self.geocode_report['unresolved']}\n")
+    
     def save_to_database(self):
         """
         Save events to MongoDB database.
+        
+        New events are upserted by event_hash, so a resumed run rewriting
+        events saved after its last checkpoint does not duplicate them.
         """
-        if not self.db:
+        if self.db is None:
             print("[WARNING] Database not available. Printing events instead:\n")
             self.print_events()
             return
@@ -115,39 +476,306 @@ class ScraperRunner:
         print("-" * 70)
         
         events_collection = self.db.events
+        # Serves nearby-event queries (utils.geocode.find_nearby and the API)
+        events_collection.create_index([('geo', GEOSPHERE)])
+        # Serves the stored-detail lookup of the next run's fan-out (utils.detail_fanout)
+        events_collection.create_index('ticket_url')
         
         inserted = 0
         updated = 0
         skipped = 0
+        started = time.perf_counter()
         
-        for event in self.all_events:
+        events = self.all_events
+        pending = set()
+        if self.checkpoint is not None:
+            events = [event for event in events if not self.checkpoint.is_saved(event['event_hash'])]
+            pending = self.checkpoint.pending_hashes()
+            if len(events) < len(self.all_events):
+                print(f"[SKIP] Saved before the interruption: {len(self.all_events) - len(events)}")
+        
+        written = []
+        for i, event in enumerate(events):
+            if self.checkpoint is not None and i % CHECKPOINT_EVERY == 0:
+                if i:
+                    self.checkpoint.mark_saved(written, self.changes)
+                    written = []
+                self.checkpoint.begin_batch([e['event_hash'] for e in events[i:i + CHECKPOINT_EVERY]])
+            
             try:
+                fingerprint = event.get('content_fingerprint') or generate_content_fingerprint(event)
+                
                 # Check if event already exists by hash
                 existing = events_collection.find_one({'event_hash': event.get('event_hash')})
                 
                 if existing:
                     # Update existing event
-                    events_collection.update_one(
-                        {'_id': existing['_id']},
-                        {'$set': {
-                            'last_updated': datetime.now(),
-                            'is_active': True
-                        }}
-                    )
+                    update = {'$set': {
+                        'last_updated': datetime.now(),
+                        'is_active': True
+                    }}
+                    
+                    # Listing content changed since last run
+                    content_changed = existing.get('content_fingerprint') != fingerprint
+                    if content_changed:
+                        update['$set'].update({
+                            field: event[field]
+                            for field in self.CONTENT_FIELDS
+                            if field in event
+                        })
+                        update['$set']['content_fingerprint'] = fingerprint
+                    
+                    # Comparing against a stored fingerprint is a check like a detail refresh,
+                    # so change_count never outgrows check_count in volatility_score()
+                    if existing.get('content_fingerprint'):
+                        update['$inc'] = {'check_count': 1}
+                        if content_changed:
+                            update['$inc']['change_count'] = 1
+                    
+                    # Set by the detail fan-out; None makes the next run fetch the page again
+                    listing_fingerprint = event.get('listing_fingerprint', existing.get('listing_fingerprint'))
+                    if listing_fingerprint != existing.get('listing_fingerprint'):
+                        update['$set']['listing_fingerprint'] = listing_fingerprint
+                    
+                    # Coordinates of a venue added to (or moved in) the gazetteer
+                    for field in ('geo', 'geohash'):
+                        if field in event and event[field] != existing.get(field):
+                            update['$set'][field] = event[field]
+                    
+                    # Backfilling a missing fingerprint is not a visible change
+                    if not existing.get('is_active', True) or (content_changed and existing.get('content_fingerprint')):
+                        count_change(self.changes, event['source'], 'updated')
+                    elif event['event_hash'] in pending:
+                        # May have been inserted by the interrupted run without being counted
+                        count_change(self.changes, event['source'], 'updated')
+                    
+                    events_collection.update_one({'_id': existing['_id']}, update)
                     updated += 1
                 else:
-                    # Insert new event
-                    events_collection.insert_one(event)
-                    inserted += 1
-                    
+                    # Insert new event, unless another writer got there first
+                    event['content_fingerprint'] = fingerprint
+                    result = events_collection.update_one(
+                        {'event_hash': event['event_hash']},
+                        {'$setOnInsert': to_document(event)},
+                        upsert=True
+                    )
+                    if result.upserted_id is not None:
+                        inserted += 1
+                        count_change(self.changes, event['source'], 'inserted')
+                    else:
+                        updated += 1
+                
+                written.append(event['event_hash'])
+            
             except Exception as e:
                 print(f"Error saving event: {event.get('title')} - {e}")
                 skipped += 1
         
+        if self.checkpoint is not None and events:
+            self.checkpoint.mark_saved(written, self.changes)
+        
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage='db_write')
+        EVENTS_SAVED.inc(inserted, result='inserted')
+        EVENTS_SAVED.inc(updated, result='updated')
+        EVENTS_SAVED.inc(skipped, result='skipped')
+        QUEUE_DEPTH.set(0, queue='events')
+        
         print(f"[OK] Inserted: {inserted}")
         print(f"[OK] Updated: {updated}")
         print(f"[SKIP] Skipped: {skipped}\n")
     
+    def record_crawls(self):
+        """
+        Count the runs in which each scraped source stopped paginating early.
+        Such sources are not diffed, so once their count reaches
+        FULL_CRAWL_EVERY - 1 the next run crawls them fully.
+        """
+        if self.db is None or self.reparsing:
+            return
+        
+        complete = [source for source in self.seen_hashes if source not in self.partial_sources]
+        partial = [source for source in self.seen_hashes if source in self.partial_sources]
+        try:
+            record_crawls(self.db, complete, partial)
+        except Exception as e:
+            print(f"[ERROR] Failed to record crawl state: {e}")
+    
+    def deactivate_vanished_events(self, grace_runs=None):
+        """
+        Deactivate stored events that their source stopped listing for
+        grace_runs consecutive runs. Sources that failed this run are left alone.
+        
+        Args:
+            grace_runs (int, optional): Missed runs before deactivation
+        """
+        if self.db is None or not self.seen_hashes:
+            return
+        
+        if grace_runs is None:
+            grace_runs = int(os.getenv('VANISH_GRACE_RUNS', DEFAULT_GRACE_RUNS))
+        
+        print("-" * 70)
+        print("DIFFING AGAINST STORED EVENTS")
+        print("-" * 70)
+        
+        try:
+            self.diff_report = diff_run(self.db.events, self.seen_hashes, grace_runs,
+                                        partial_sources=self.partial_sources)
+        except Exception as e:
+            print(f"[ERROR] Failed to diff run: {e}\n")
+            return
+        
+        for source, result in self.diff_report.items():
+            if 'skipped' in result:
+                print(f"[SKIP] {source}: {result['skipped']}")
+                continue
+            count_change(self.changes, source, 'deactivated', result['deactivated'])
+            print(f"[OK] {source}: {result['missed']} missing, {result['deactivated']} deactivated, "
+                  f"{result['restored']} back")
+        print()
+    
+    def refresh_event_details(self, budget=None):
+        """
+        Refresh the detail pages of the stored events most likely to have changed.
+        Near-term events and events with a history of changes are refreshed first.
+        
+        Args:
+            budget (int, optional): Maximum number of detail pages to fetch
+        """
+        if self.db is None:
+            return
+        
+        if budget is None:
+            budget = int(os.getenv('RECRAWL_BUDGET', DEFAULT_FETCH_BUDGET))
+        
+        print("-" * 70)
+        print("REFRESHING EVENT DETAILS")
+        print("-" * 70)
+        
+        events_collection = self.db.events
+        scrapers = {
+            scraper.source_name: scraper
+            for scraper in self.scrapers
+            if scraper.has_detail_pages
+        }
+        if not scrapers:
+            print("[SKIP] No sources with detail pages\n")
+            return
+        
+        try:
+            candidates = list(events_collection.find(
+                {
+                    'is_active': True,
+                    'date': {'$gte': datetime.now()},
+                    'source': {'$in': list(scrapers)}
+                },
+                {
+                    'date': 1, 'source': 1, 'ticket_url': 1, 'last_checked': 1,
+                    'change_count': 1, 'check_count': 1,
+                    **{field: 1 for field in self.CONTENT_FIELDS}
+                }
+            ))
+        except Exception as e:
+            print(f"[ERROR] Failed to load events for refresh: {e}\n")
+            return
+        
+        plan = plan_recrawl(candidates, budget)
+        changed = 0
+        refreshed_count = 0
+        QUEUE_DEPTH.set(len(plan), queue='recrawl')
+        
+        for event in plan:
+            # Events left stale keep their place at the front of the next plan
+            if self.deadline.expired():
+                self.skipped_report['recrawl'] = len(plan) - refreshed_count
+                print(f"[SKIP] Time budget reached, {len(plan) - refreshed_count} refreshes left")
+                break
+            refreshed_count += 1
+            
+            try:
+                with STAGE_SECONDS.time(stage='recrawl', source=event['source']):
+                    refreshed = scrapers[event['source']].fetch_event_detail(event)
+            except Exception as e:
+                print(f"Error refreshing event: {event.get('ticket_url')} - {e}")
+                continue
+            
+            if refreshed is None:
+                continue
+            
+            changes = {
+                field: value
+                for field, value in refreshed.items()
+                if field in self.CONTENT_FIELDS and event.get(field) != value
+            }
+            if changes:
+                changes['content_fingerprint'] = generate_content_fingerprint({**event, **changes})
+                changed += 1
+                count_change(self.changes, event['source'], 'updated')
+            
+            record_refresh(events_collection, event, changes)
+        
+        QUEUE_DEPTH.set(0, queue='recrawl')
+        print(f"[OK] Refreshed: {refreshed_count} (budget {budget})")
+        print(f"[OK] Changed: {changed}\n")
+    
+    def update_catalog_version(self):
+        """
+        Bump the catalog version when this run inserted, updated or deactivated events.
+        """
+        if self.db is None:
+            return
+        
+        try:
+            version = bump_catalog_version(self.db, self.changes)
+        except Exception as e:
+            print(f"[ERROR] Failed to update catalog version: {e}")
+            return
+        
+        if total_changes(self.changes):
+            print(f"[OK] Catalog version: {version['version']} ({total_changes(self.changes)} changes)")
+        else:
+            print(f"[SKIP] Catalog unchanged at version {version['version'] if version else 0}")
+    
+    def export_snapshot(self):
+        """
+        Export active upcoming events to a local snapshot file, so date range
+        queries can be served without the database.
+        """
+        snapshot_dir = city_path(os.getenv('SNAPSHOT_DIR', 'snapshots'), self.city)
+        if self.db is None or not snapshot_dir:
+            return
+        
+        try:
+            events = list(self.db.events.find(
+                {'is_active': True, 'date': {'$gte': datetime.now()}},
+                {'_id': 0, 'title': 1, 'date': 1, 'location': 1, 'description': 1,
+                 'image_url': 1, 'ticket_url': 1, 'source': 1, 'event_hash': 1}
+            ).sort('date', 1))
+        except Exception as e:
+            print(f"[ERROR] Failed to load events for snapshot: {e}")
+            return
+        
+        path = write_snapshot(events, snapshot_dir)
+        collect_garbage(snapshot_dir, keep=int(os.getenv('SNAPSHOT_KEEP', 3)))
+        print(f"[OK] Snapshot: {path} ({len(events)} events)")
+    
+    def publish_api_payloads(self):
+        """
+        Write the pre-compressed payloads of the API list endpoints to API_CACHE_DIR.
+        """
+        cache_dir = city_path(os.getenv('API_CACHE_DIR'), self.city)
+        if self.db is None or not cache_dir:
+            return
+        
+        try:
+            manifests = publish_api_payloads(self.db, cache_dir)
+        except Exception as e:
+            print(f"[ERROR] Failed to publish API payloads: {e}")
+            return
+        
+        for name, manifest in manifests.items():
+            print(f"[OK] API payload '{name}': {manifest['count']} events, ETag {manifest['etag']}")
+    
     def print_events(self):
         """
         Print scraped events to console.
@@ -163,18 +791,101 @@ class ScraperRunner:
             print(f"   Source: {event['source']}")
             print(f"   Ticket URL: {event['ticket_url']}")
     
-    def run(self):
+    def publish_catalog(self):
+        """
+        Publish the catalogue once its events are written: bump its version if
+        anything changed, export the snapshot and precompute the API payloads.
+        """
+        # Signal downstream caches only if something changed
+        self._run_once('catalog', self.update_catalog_version)
+        
+        # Export the catalogue for local reads
+        self._run_once('snapshot', self.export_snapshot)
+        
+        # Precompute the list endpoint payloads for the API
+        self._run_once('api_payloads', self.publish_api_payloads)
+    
+    def finalize(self, seen_hashes, partial_sources=(), changes=None):
+        """
+        Run the stages over the whole catalogue once for the results of
+        separate per-source runs (see worker.py): the vanished-event diff of
+        every source, then publish_catalog().
+        
+        Args:
+            seen_hashes (dict): Source name to the event hashes its run returned
+            partial_sources (iterable): Sources whose crawl stopped before its last page
+            changes (dict, optional): Per-source inserted/updated counts of those runs
+        
+        Returns:
+            dict: Diff report and the change counts, deactivations included
+        """
+        self.seen_hashes = {source: set(hashes) for source, hashes in seen_hashes.items()}
+        self.partial_sources = set(partial_sources)
+        self.changes = {source: dict(counts) for source, counts in (changes or {}).items()}
+        
+        self.deactivate_vanished_events()
+        self.publish_catalog()
+        return {'diff': self.diff_report, 'changes': self.changes}
+    
+    def run(self, finalize=True):
         """
         Main execution method.
+        
+        Args:
+            finalize (bool): Also run the stages over the whole catalogue (vanished-event
+                diff, catalog version, snapshot, API payloads); False for a worker's
+                per-source task, after which one finalize task runs them for all sources
         """
+        started_at = datetime.now()
+        metrics_before = REGISTRY.snapshot()
+        
+        # Responses are shared between scrapers within a run, never across runs
+        RESPONSES.clear()
+        
+        self.open_checkpoint()
+        
+        # Stop taking new work once the time budget runs low
+        self.deadline = Deadline(self.time_budget)
+        for scraper in self.scrapers:
+            scraper.deadline = self.deadline
+        
         # Run all scrapers
         self.run_all_scrapers()
         
         # Process events
-        self.process_events()
+        with self._stage('process'):
+            self.process_events()
+        
+        # Fetch detail pages of new and changed events
+        with self._stage('details'):
+            self.fetch_listing_details()
+        
+        # Hold back events the backend model would reject
+        with self._stage('validate'):
+            self.validate_events()
+        
+        # Locate events at known venues for nearby queries
+        with self._stage('geocode'):
+            self.geocode_events()
         
         # Save to database
-        self.save_to_database()
+        with self._stage('db_write'):
+            self.save_to_database()
+        
+        # Queue what the time budget left out, and crawls that stopped early, for the next run
+        self.record_skipped_work()
+        self.record_crawls()
+        
+        # Retire events that disappeared from their source
+        if finalize and not self.reparsing:
+            self._run_once('diff', self.deactivate_vanished_events)
+        
+        # Refresh near-term and frequently changing events (live pages, so not when replaying)
+        if not self.reparsing:
+            self._run_once('recrawl', self.refresh_event_details)
+        
+        if finalize:
+            self.publish_catalog()
         
         # Print summary
         print("=" * 70)
@@ -182,14 +893,248 @@ class ScraperRunner:
         print("=" * 70)
         print(f"Total unique events: {len(self.all_events)}")
         print(f"Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        if self.archive is not None:
+            self.archive.close()
+        RESPONSES.clear()
+        
+        RUNS.inc()
+        report_path = write_run_report(
+            city_path(os.getenv('RUN_REPORT_DIR', 'run_reports'), self.city),
+            started_at,
+            metrics_before,
+            run_id=self.run_id,
+            extra={
+                'run_id': self.run_id,
+                'city': self.city,
+                'resumed': self.checkpoint is not None and self.checkpoint.resumed,
+                'sources': [scraper.source_name for scraper in self.scrapers],
+                'unique_events': len(self.all_events),
+                'changes': self.changes,
+                'crawl': {
+                    scraper.source_name: scraper.crawl_stats
+                    for scraper in self.scrapers
+                    if scraper.crawl_stats
+                },
+                'diff': self.diff_report,
+                'details': self.detail_report,
+                'validation': self.validation_report,
+                'geocode': self.geocode_report,
+                'deadline': {
+                    'budget': self.deadline.budget,
+                    'elapsed': round(self.deadline.elapsed(), 3),
+                    'skipped': self.skipped_report
+                },
+                'hosts': HOSTS.snapshot()
+            }
+        )
+        print(f"Run report: {report_path}")
         print("=" * 70 + "\n")
+        
+        # Finished: nothing left to resume
+        if self.checkpoint is not None:
+            self.checkpoint.complete()
+
+
+def run_profiled(profile_dir, mode='auto', **runner_kwargs):
+    """
+    Run the scraper once with per-stage profiling and allocation tracing.
+    
+    Args:
+        profile_dir (str): Directory holding all profiled runs
+        mode (str): Profiler mode passed to RunProfiler
+        **runner_kwargs: Arguments for ScraperRunner
+    
+    Returns:
+        str: Directory the profiles were written to
+    """
+    run_dir = make_run_dir(profile_dir)
+    
+    with RunProfiler(run_dir, mode=mode) as profiler:
+        ScraperRunner(profiler=profiler, **runner_kwargs).run()
+    
+    print(f"[OK] Profiles written to: {run_dir}")
+    return run_dir
+
+
+def run_city(city, resume=False, **runner_kwargs):
+    """
+    Run the pipeline for one city; the entry point of each shard process.
+    
+    Args:
+        city (str): City slug
+        resume (bool): Resume the city's latest interrupted run, if any
+        **runner_kwargs: Arguments for ScraperRunner
+    
+    Returns:
+        dict: City, run id, unique events, changes and the shard's exported metrics
+    """
+    if resume:
+        checkpoint_dir = city_path(os.getenv('CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR), city)
+        runner_kwargs['run_id'] = find_unfinished_run(checkpoint_dir) if checkpoint_dir else None
+    
+    # A shard process may run several cities in turn: report this one's metrics only
+    metrics_before = REGISTRY.export()
+    runner = ScraperRunner(city=city, **runner_kwargs)
+    runner.run()
+    
+    return {
+        'city': city,
+        'run_id': runner.run_id,
+        'unique_events': len(runner.all_events),
+        'changes': runner.changes,
+        'metrics': REGISTRY.export(since=metrics_before)
+    }
+
+
+def run_sharded(cities, processes=None, resume=False, **runner_kwargs):
+    """
+    Run several cities at once, one process per city. Each shard has its own
+    host rate limits, database and run directories; its metrics are merged
+    into this process's registry with a city label.
+    
+    Args:
+        cities (list): City slugs
+        processes (int, optional): Most cities run at once; one per city up to the CPU count if omitted
+        resume (bool): Resume each city's latest interrupted run
+        **runner_kwargs: Arguments for every city's ScraperRunner
+    
+    Returns:
+        dict: City to run_city() result without metrics, or to its error
+    """
+    processes = processes or min(len(cities), os.cpu_count() or 1)
+    results = {}
+    
+    # Spawned, not forked: shards must not inherit the parent's threads and locks
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        futures = {pool.submit(run_city, city, resume, **runner_kwargs): city for city in cities}
+        for future in as_completed(futures):
+            city = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[ERROR] City {city} failed: {e}")
+                results[city] = {'city': city, 'error': str(e)}
+                continue
+            
+            REGISTRY.merge(result.pop('metrics'), city=city)
+            results[city] = result
+            print(f"[OK] {city}: {result['unique_events']} events, {total_changes(result['changes'])} changes "
+                  f"(run {result['run_id']})")
+    
+    return results
+
+
+def check_sources(specs):
+    """
+    Check that each source's site answers, without scraping or touching the database.
+    
+    Args:
+        specs (list): Source specs from select_sources()
+    
+    Returns:
+        bool: True if every source is healthy
+    """
+    healthy = True
+    for scraper in create_scrapers(specs):
+        result = scraper.check_health()
+        if result['ok']:
+            print(f"[OK] {result['source']}: HTTP {result['status']} in {result['seconds']:.2f}s")
+        else:
+            print(f"[ERROR] {result['source']}: {result['error']}")
+            healthy = False
+    return healthy
 
 
 def main():
     """
     Main entry point.
     """
-    runner = ScraperRunner()
+    parser = argparse.ArgumentParser(description='Run all event scrapers')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the run per source and stage, with an allocation report')
+    parser.add_argument('--profile-dir', default=os.getenv('PROFILE_DIR', 'profiles'),
+                        help='Directory for profiling output')
+    parser.add_argument('--profile-mode', choices=['auto', 'cprofile', 'sampling'], default='auto',
+                        help='Profiler to use; auto prefers a sampling profiler when installed')
+    parser.add_argument('--archive-dir', default=os.getenv('PAGE_ARCHIVE_DIR'),
+                        help='Archive raw fetched pages to this directory')
+    parser.add_argument('--reparse', metavar='RUN_ID',
+                        help="Replay an archived run (or 'latest') through the pipeline without fetching")
+    parser.add_argument('--full-crawl', action='store_true',
+                        help='Crawl every page instead of stopping at pages with only known events')
+    parser.add_argument('--run-id',
+                        help="Resume an interrupted run from its checkpoint (or 'latest')")
+    parser.add_argument('--source', action='append', dest='sources', metavar='NAME',
+                        help='Run only this source (repeatable)')
+    parser.add_argument('--tag', action='append', dest='tags', metavar='TAG',
+                        help='Run only sources with this tag (repeatable)')
+    parser.add_argument('--city', action='append', dest='cities', metavar='CITY',
+                        help='City to scrape (repeatable; several cities run in parallel processes)')
+    parser.add_argument('--all-cities', action='store_true',
+                        help='Scrape every configured city in parallel processes')
+    parser.add_argument('--processes', type=int,
+                        help='Most cities scraped at once (default: one per city up to the CPU count)')
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS',
+                        help='Stop taking new work after this long and write what was scraped '
+                             '(default: RUN_TIME_BUDGET, 0 for no limit)')
+    parser.add_argument('--list', action='store_true',
+                        help='List the selected sources and exit')
+    parser.add_argument('--check', action='store_true',
+                        help='Check that the selected sources respond and exit')
+    args = parser.parse_args()
+    
+    known_cities = load_cities()
+    unknown = set(args.cities or ()) - set(known_cities)
+    if unknown:
+        parser.error(f"Unknown city: {', '.join(sorted(unknown))}")
+    cities = list(known_cities) if args.all_cities else args.cities
+    
+    try:
+        specs = select_sources(args.sources, args.tags, cities)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.list:
+        for spec in specs:
+            print(f"{spec['name']:<35} {spec['city'] or '-':<12} {', '.join(spec['tags'])}")
+        return
+    
+    if args.check:
+        sys.exit(0 if check_sources(specs) else 1)
+    
+    runner_kwargs = {
+        'archive_dir': args.archive_dir,
+        'reparse_run': args.reparse,
+        'incremental': not args.full_crawl,
+        'sources': args.sources,
+        'tags': args.tags,
+        'time_budget': args.time_budget
+    }
+    
+    if not cities:
+        # Named sources run in their own cities, anything else in the default city
+        cities = sorted({spec['city'] for spec in specs}) if args.sources else [DEFAULT_CITY]
+    if len(cities) > 1:
+        if args.profile or args.run_id not in (None, 'latest'):
+            parser.error("--profile and --run-id <id> apply to a single city")
+        run_sharded(cities, args.processes, resume=args.run_id == 'latest', **runner_kwargs)
+        return
+    
+    city = runner_kwargs['city'] = cities[0]
+    run_id = args.run_id
+    if run_id == 'latest':
+        run_id = find_unfinished_run(city_path(os.getenv('CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR), city))
+        if run_id is None:
+            print("[SKIP] No interrupted run to resume, starting a new one")
+    runner_kwargs['run_id'] = run_id
+    
+    if args.profile:
+        run_profiled(args.profile_dir, args.profile_mode, **runner_kwargs)
+        return
+    
+    runner = ScraperRunner(**runner_kwargs)
     runner.run()
 
 
@@ -13,8 +13,11 @@ import os
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from run_scraper import ScraperRunner
+from run_scraper import ScraperRunner, run_profiled, run_sharded
 from cleanup_db import mark_expired_events
+from utils.metrics import start_metrics_server
+from utils.checkpoint import find_unfinished_run, DEFAULT_CHECKPOINT_DIR
+from sources.registry import city_path, DEFAULT_CITY
 
 # Configure logging
 logging.basicConfig(
@@ -29,24 +32,62 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Profile one scheduled run in every PROFILE_EVERY runs (0 disables profiling)
+PROFILE_EVERY = int(os.getenv('PROFILE_EVERY', 0))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+
+# Cities scraped each run; several cities run in parallel, one process each
+SCRAPE_CITIES = [city.strip() for city in os.getenv('SCRAPE_CITIES', '').split(',') if city.strip()]
+
+# Hours between scheduled runs; each run stops taking new work after
+# RUN_TIME_BUDGET seconds (most of the interval by default), so it writes what
+# it scraped and finishes before the next one is due
+RUN_INTERVAL_HOURS = 6
+RUN_TIME_BUDGET = float(os.getenv('RUN_TIME_BUDGET', RUN_INTERVAL_HOURS * 3600 * 0.9))
+
+run_count = 0
+
+
 def run_scraper_job():
     """
     Job function to run the scraper.
     """
+    global run_count
+    run_count += 1
+    
     logger.info("=" * 70)
     logger.info("SCHEDULED SCRAPER RUN")
     logger.info("=" * 70)
     
     try:
-        # Run the scraper
-        runner = ScraperRunner()
-        runner.run()
+        if len(SCRAPE_CITIES) > 1:
+            # One process per city, each resuming its own interrupted run if any
+            results = run_sharded(SCRAPE_CITIES, resume=True, time_budget=RUN_TIME_BUDGET)
+            failed = [city for city, result in results.items() if 'error' in result]
+            if failed:
+                logger.error(f"[ERROR] Cities failed: {', '.join(failed)}")
+        else:
+            city = SCRAPE_CITIES[0] if SCRAPE_CITIES else DEFAULT_CITY
+            
+            # Finish a run that a crash or restart interrupted before starting a new one
+            run_id = find_unfinished_run(city_path(os.getenv('CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR), city))
+            if run_id:
+                logger.info(f"Resuming interrupted run {run_id}")
+            
+            # Run the scraper, profiling one run in PROFILE_EVERY
+            if PROFILE_EVERY and run_count % PROFILE_EVERY == 0:
+                run_dir = run_profiled(PROFILE_DIR, run_id=run_id, city=city, time_budget=RUN_TIME_BUDGET)
+                logger.info(f"[OK] Profiled run written to {run_dir}")
+            else:
+                runner = ScraperRunner(run_id=run_id, city=city, time_budget=RUN_TIME_BUDGET)
+                runner.run()
         
         logger.info("[OK] Scraper job completed successfully")
         
         # Mark expired events
         logger.info("Running cleanup...")
-        mark_expired_events()
+        for city in SCRAPE_CITIES or [None]:
+            mark_expired_events(city)
         
         logger.info("=" * 70)
         logger.info("JOB COMPLETED")
@@ -64,7 +105,8 @@ def run_cleanup_job():
     """
     logger.info("Running scheduled cleanup...")
     try:
-        mark_expired_events()
+        for city in SCRAPE_CITIES or [None]:
+            mark_expired_events(city)
         logger.info("[OK] Cleanup job completed")
     except Exception as e:
         logger.error(f"[ERROR] Cleanup job failed: {e}")
@@ -78,11 +120,19 @@ def main():
     logger.info("SCRAPER SCHEDULER STARTED")
     logger.info("=" * 70)
     logger.info(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info("Schedule: Every 6 hours")
+    logger.info(f"Schedule: Every {RUN_INTERVAL_HOURS} hours (time budget {RUN_TIME_BUDGET:.0f}s)")
     logger.info("=" * 70)
     
-    # Schedule scraper to run every 6 hours
-    schedule.every(6).hours.do(run_scraper_job)
+    # Expose Prometheus metrics for the lifetime of the scheduler
+    metrics_port = int(os.getenv('METRICS_PORT', 9108))
+    try:
+        start_metrics_server(metrics_port)
+        logger.info(f"Metrics: http://127.0.0.1:{metrics_port}/metrics")
+    except OSError as e:
+        logger.error(f"[ERROR] Could not start metrics server: {e}")
+    
+    # Schedule scraper to run every RUN_INTERVAL_HOURS hours
+    schedule.every(RUN_INTERVAL_HOURS).hours.do(run_scraper_job)
     
     # Schedule cleanup to run daily at 2 AM
     schedule.every().day.at("02:00").do(run_cleanup_job)
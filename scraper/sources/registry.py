@@ -0,0 +1,177 @@
+"""
+Source Registry
+Scraper sources listed in a config file, with their city and tags, so a run
+imports only the modules of the sources it selects
+
+A source entry names one city ("city", DEFAULT_CITY if omitted) or several
+("cities"). A multi-city entry becomes one source per city: "{city}" in its
+name is replaced by the city, and its scraper class is created with a city
+argument.
+
+Each city's events live in their own namespace: the config's "cities" section
+names a database per city, and a city's run files go to a subdirectory named
+after it. The default city uses the database of MONGODB_URI and the
+top-level directories themselves.
+"""
+
+import importlib
+import json
+import os
+
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sources.json')
+
+DEFAULT_CITY = os.getenv('DEFAULT_CITY', 'sydney')
+
+
+def _read_config(path=None):
+    path = path or os.getenv('SOURCES_CONFIG') or DEFAULT_CONFIG
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_registry(path=None):
+    """
+    Read the enabled sources from the registry config, one per city.
+    
+    Args:
+        path (str, optional): Config file; SOURCES_CONFIG or the bundled sources.json if omitted
+    
+    Returns:
+        list: Source specs with name, class ('module:Class'), city, tags and
+            the keyword arguments of the scraper class
+    """
+    specs = []
+    for entry in _read_config(path)['sources']:
+        if not entry.get('enabled', True):
+            continue
+        
+        if 'cities' in entry:
+            cities = [(city, {'city': city}) for city in entry['cities']]
+        else:
+            cities = [(entry.get('city', DEFAULT_CITY), {})]
+        
+        for city, params in cities:
+            specs.append({
+                'name': entry['name'].format(city=city),
+                'class': entry['class'],
+                'city': city,
+                'tags': list(entry.get('tags', [])),
+                'params': params
+            })
+    return specs
+
+
+def load_cities(path=None):
+    """
+    Read the cities of the registry config.
+    
+    Args:
+        path (str, optional): Config file passed to load_registry()
+    
+    Returns:
+        dict: City slug to its settings: display name and, optionally, database
+    """
+    config = _read_config(path)
+    cities = {city: dict(settings) for city, settings in config.get('cities', {}).items()}
+    
+    # Cities that sources name but the cities section leaves out
+    for spec in load_registry(path):
+        if spec['city'] and spec['city'] not in cities:
+            cities[spec['city']] = {}
+    for city, settings in cities.items():
+        settings.setdefault('name', city.replace('-', ' ').title())
+    return cities
+
+
+def city_path(path, city):
+    """
+    Place a run directory in a city's namespace.
+    
+    Args:
+        path (str): Top-level directory, e.g. 'snapshots'
+        city (str): City slug
+    
+    Returns:
+        str: The directory itself for the default city, else its city subdirectory
+    """
+    if not path or city in (None, DEFAULT_CITY):
+        return path
+    return os.path.join(path, city)
+
+
+def select_sources(names=None, tags=None, cities=None, path=None):
+    """
+    Select sources from the registry. A source must match every filter given;
+    within a filter, any of the values.
+    
+    Args:
+        names (list, optional): Source names; all sources if None
+        tags (list, optional): Tags, any of which a source must have
+        cities (list, optional): Cities
+        path (str, optional): Config file passed to load_registry()
+    
+    Returns:
+        list: Selected source specs, in registry order
+    
+    Raises:
+        ValueError: If a name is not in the registry
+    """
+    specs = load_registry(path)
+    
+    if names is not None:
+        unknown = set(names) - {spec['name'] for spec in specs}
+        if unknown:
+            raise ValueError(f"Unknown source(s): {', '.join(sorted(unknown))}")
+    
+    return [
+        spec for spec in specs
+        if (names is None or spec['name'] in names)
+        and (not tags or set(tags) & set(spec['tags']))
+        and (not cities or spec['city'] in cities)
+    ]
+
+
+def load_scraper_class(spec):
+    """
+    Import a source's scraper class.
+    
+    Args:
+        spec (dict): Source spec
+    
+    Returns:
+        type: BaseScraper subclass
+    """
+    module_name, _, class_name = spec['class'].partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_scrapers(specs):
+    """
+    Import and instantiate the scrapers of the given sources.
+    
+    Args:
+        specs (list): Source specs from select_sources()
+    
+    Returns:
+        list: Scraper instances
+    """
+    return [load_scraper_class(spec)(**spec.get('params', {})) for spec in specs]
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import sys
+    
+    # Add parent directory to path
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    for spec in select_sources():
+        print(f"{spec['name']:<35} {spec['city']:<10} {', '.join(spec['tags'])}")
+    print(f"\nCities: {load_cities()}")
+    
+    selected = select_sources(tags=['council'])
+    print(f"\nTag 'council': {[spec['name'] for spec in selected]}")
+    print(f"Parser stack loaded before creating: {'bs4' in sys.modules}")
+    scrapers = create_scrapers(selected)
+    print(f"Created: {[type(scraper).__name__ for scraper in scrapers]}, bs4 loaded: {'bs4' in sys.modules}")
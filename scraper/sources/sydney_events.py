@@ -85,21 +85,30 @@ class TimeOutScraper(BaseScraper):
         ]
 
 
-class EventbriteSydneyScraper(BaseScraper):
+class EventbriteScraper(BaseScraper):
     """
-    Scraper for Eventbrite Sydney events.
+    Scraper for Eventbrite events in one city.
     Note: This is a demo scraper with placeholder logic.
     """
     
-    def __init__(self):
+    # Festival venue of the demo events per city
+    DEMO_VENUES = {'sydney': 'Darling Harbour', 'melbourne': 'Federation Square'}
+    
+    def __init__(self, city='sydney'):
+        """
+        Args:
+            city (str): City slug, e.g. 'sydney'
+        """
         super().__init__(
-            source_name='eventbrite.com.au/sydney',
+            source_name=f'eventbrite.com.au/{city}',
             base_url='https://www.eventbrite.com.au'
         )
+        self.city = city
+        self.city_name = city.replace('-', ' ').title()
     
     def scrape(self):
         """
-        Scrape events from Eventbrite Sydney.
+        Scrape events from Eventbrite for the city.
         
         Returns:
             list: List of scraped events
@@ -128,22 +137,32 @@ class EventbriteSydneyScraper(BaseScraper):
         """Create demo events for testing."""
         return [
             {
-                'title': 'Sydney Tech Meetup',
+                'title': f'{self.city_name} Tech Meetup',
                 'date': datetime.now() + timedelta(days=7),
-                'location': 'Stone & Chalk, Sydney',
-                'description': 'Monthly meetup for tech enthusiasts and startups in Sydney.',
+                'location': f'Stone & Chalk, {self.city_name}',
+                'description': f'Monthly meetup for tech enthusiasts and startups in {self.city_name}.',
                 'image_url': 'https://example.com/tech-meetup.jpg',
-                'ticket_url': 'https://www.eventbrite.com.au/tech-meetup'
+                'ticket_url': self._demo_url('tech-meetup')
             },
             {
                 'title': 'Food & Wine Festival',
                 'date': datetime.now() + timedelta(days=20),
-                'location': 'Darling Harbour',
-                'description': 'Sample the best of Sydney\'s culinary scene with local chefs and wineries.',
+                'location': self.DEMO_VENUES.get(self.city, f'{self.city_name} Showgrounds'),
+                'description': f'Sample the best of {self.city_name}\'s culinary scene with local chefs and wineries.',
                 'image_url': 'https://example.com/food-wine.jpg',
-                'ticket_url': 'https://www.eventbrite.com.au/food-wine'
+                'ticket_url': self._demo_url('food-wine')
             }
         ]
+    
+    def _demo_url(self, slug):
+        # Sydney's demo events predate the other cities and keep their URLs
+        if self.city == 'sydney':
+            return f'https://www.eventbrite.com.au/{slug}'
+        return f'https://www.eventbrite.com.au/{self.city}/{slug}'
+
+
+# Earlier name of the Sydney-only scraper
+EventbriteSydneyScraper = EventbriteScraper
 
 
 class WhatsonScraper(BaseScraper):
@@ -206,7 +225,7 @@ if __name__ == "__main__":
     # Create scrapers
     scrapers = [
         TimeOutScraper(),
-        EventbriteSydneyScraper(),
+        EventbriteScraper(),
         WhatsonScraper()
     ]
     
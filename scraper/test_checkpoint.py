@@ -0,0 +1,157 @@
+"""
+Test Run Checkpoints
+Checks that a crawl interrupted part-way resumes from its checkpoint without
+losing or repeating events, and that the checkpoint only appends what is new
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import utils.base_scraper as base_scraper
+from utils.checkpoint import RunCheckpoint, find_unfinished_run, JOURNAL_FILE, RUN_FILE
+
+# Listing pages of the fake source, two events each
+PAGES = 8
+
+
+def chain(last):
+    """
+    Links of a listing paginated one page at a time up to page last.
+    
+    Returns:
+        callable: Page number to the page numbers it links to
+    """
+    return lambda page: [page + 1] if page < last else []
+
+
+def make_events(source, count):
+    """
+    Create events of a fake source.
+    
+    Returns:
+        list: count events
+    """
+    return [source.create_event(f"Event {i}", None, 'The Rocks', '', '', f"/e/{i}") for i in range(count)]
+
+
+def test_interrupted_crawl_resumes(listing_source, tmp_path, monkeypatch):
+    """
+    A crawl that crashes after a checkpoint picks up from the saved frontier:
+    every event is found once, and pages before the checkpoint are not fetched again.
+    """
+    monkeypatch.setattr(base_scraper, 'CRAWL_CHECKPOINT_PAGES', 3)
+    
+    source = listing_source(chain(PAGES), events_per_page=2, crash_at=5)
+    source.checkpoint = RunCheckpoint('run-1', str(tmp_path))
+    with pytest.raises(KeyboardInterrupt):
+        source.crawl(['/listing?page=1'])
+    
+    resumed = listing_source(chain(PAGES), events_per_page=2)
+    resumed.checkpoint = RunCheckpoint('run-1', str(tmp_path))
+    assert resumed.checkpoint.resumed
+    events = resumed.crawl(['/listing?page=1'])
+    
+    titles = [event['title'] for event in events]
+    assert len(titles) == PAGES * 2
+    assert len(set(titles)) == len(titles)
+    assert resumed.fetched[0].endswith('page=4')
+    assert resumed.crawl_complete
+
+
+def test_checkpoint_survives_reopen(listing_source, tmp_path):
+    """
+    Saved crawl progress, finished sources and written events are read back
+    by the next run under the same id, and a completed run leaves nothing behind.
+    """
+    events = make_events(listing_source(chain(1)), 3)
+    
+    checkpoint = RunCheckpoint('run-2', str(tmp_path))
+    checkpoint.save_crawl('a', {'queue': []}, events[:2], False)
+    checkpoint.save_crawl('a', {'queue': []}, events, True, [['/listing?page=9', 'pagination', 1]])
+    checkpoint.finish_source('b', events[:1], crawl_complete=False)
+    checkpoint.mark_saved([events[0]['event_hash']], {'b': {'inserted': 1}})
+    assert find_unfinished_run(str(tmp_path)) == 'run-2'
+    
+    reopened = RunCheckpoint('run-2', str(tmp_path))
+    crawl = reopened.crawl_state('a')
+    assert [event['event_hash'] for event in crawl['events']] == [event['event_hash'] for event in events]
+    assert crawl['stopped_early'] and crawl['failed_pages'] == [['/listing?page=9', 'pagination', 1]]
+    assert reopened.source_done('b') and not reopened.source_done('a')
+    restored, crawl_complete = reopened.source_events('b')
+    assert [event['event_hash'] for event in restored] == [events[0]['event_hash']]
+    assert not crawl_complete
+    assert reopened.is_saved(events[0]['event_hash'])
+    assert reopened.changes == {'b': {'inserted': 1}}
+    
+    reopened.complete()
+    assert find_unfinished_run(str(tmp_path)) is None
+    assert not RunCheckpoint('run-2', str(tmp_path)).resumed
+
+
+def test_writes_append_only_what_is_new(listing_source, tmp_path):
+    """
+    Crawl progress appends only the events found since the last save, each
+    write to the database journals only its own hashes, and the run state
+    holds no events at all.
+    """
+    events = make_events(listing_source(chain(1)), 4)
+    checkpoint = RunCheckpoint('run-3', str(tmp_path))
+    run_dir = tmp_path / 'run-3'
+    
+    checkpoint.save_crawl('a', {'queue': []}, events[:2], False)
+    checkpoint.save_crawl('a', {'queue': []}, events, False)
+    assert len((run_dir / 'crawl-0.jsonl').read_text().splitlines()) == 4
+    
+    checkpoint.finish_source('a', events)
+    assert not (run_dir / 'crawl-0.jsonl').exists()
+    assert 'Event' not in (run_dir / RUN_FILE).read_text()
+    
+    hashes = [event['event_hash'] for event in events]
+    checkpoint.begin_batch(hashes[:2])
+    checkpoint.mark_saved(hashes[:2], {'a': {'inserted': 2}})
+    checkpoint.begin_batch(hashes[2:])
+    checkpoint.mark_saved(hashes[2:], {'a': {'inserted': 4}})
+    
+    journal = (run_dir / JOURNAL_FILE).read_text().splitlines()
+    assert len(journal) == 4
+    assert hashes[0] not in journal[3]
+
+
+def test_records_cut_short_by_a_crash_are_dropped(listing_source, tmp_path):
+    """
+    A half-written journal line and crawl events appended after the last
+    run state are ignored on resume, and later appends land on clean lines.
+    """
+    events = make_events(listing_source(chain(1)), 3)
+    hashes = [event['event_hash'] for event in events]
+    run_dir = tmp_path / 'run-4'
+    
+    checkpoint = RunCheckpoint('run-4', str(tmp_path))
+    checkpoint.save_crawl('a', {'queue': []}, events[:2], False)
+    checkpoint.mark_saved(hashes[:1], {'a': {'inserted': 1}})
+    checkpoint.begin_batch(hashes[1:])
+    
+    # The crash: a crawl save appended its events but not the run state, and
+    # the journal record of the batch's write was cut off
+    with open(run_dir / 'crawl-0.jsonl', 'a') as f:
+        f.write('{"title":"Event 2"}\n')
+    with open(run_dir / JOURNAL_FILE, 'a') as f:
+        f.write('{"saved":["' + hashes[1])
+    
+    resumed = RunCheckpoint('run-4', str(tmp_path))
+    assert len(resumed.crawl_state('a')['events']) == 2
+    assert resumed.pending_hashes() == set(hashes[1:])
+    assert resumed.is_saved(hashes[0]) and not resumed.is_saved(hashes[1])
+    
+    resumed.save_crawl('a', {'queue': []}, events, False)
+    resumed.mark_saved(hashes[1:], {'a': {'inserted': 3}})
+    
+    reopened = RunCheckpoint('run-4', str(tmp_path))
+    assert [event['event_hash'] for event in reopened.crawl_state('a')['events']] == hashes
+    assert all(reopened.is_saved(event_hash) for event_hash in hashes)
+    assert reopened.pending_hashes() == set()
@@ -0,0 +1,129 @@
+"""
+Test Crawl Frontier
+Checks that a crawl fetches each page once, stops paginating at known events,
+and that pages it failed to fetch leave it incomplete and go to the backlog
+"""
+
+import os
+import sys
+import uuid
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from run_scraper import ScraperRunner
+from utils.deadline import load_backlog
+from utils.frontier import PAGINATION
+
+
+def chain(last):
+    """
+    Links of a listing paginated one page at a time up to page last.
+    
+    Returns:
+        callable: Page number to the page numbers it links to
+    """
+    return lambda page: [page + 1] if page < last else []
+
+
+def test_pages_are_fetched_once(listing_source):
+    """
+    Pages linked several times are fetched once, and a crawl that visits
+    every page is complete.
+    """
+    source = listing_source(lambda page: [page + 1, page + 2] if page < 6 else [], events_per_page=1)
+    events = source.crawl(['/listing?page=1'])
+    
+    assert sorted(source.page_number(url) for url in source.fetched) == [1, 2, 3, 4, 5, 6, 7]
+    assert len(events) == 7
+    assert source.crawl_stats['duplicates'] > 0
+    assert source.crawl_complete
+
+
+def test_incremental_crawl_stops_at_known_page(listing_source):
+    """
+    A page whose events are all known ends its pagination chain, and the
+    crawl is incomplete.
+    """
+    first = listing_source(chain(5), events_per_page=2)
+    first.crawl(['/listing?page=1'])
+    known = {event['event_hash'] for event in first.events if not event['title'].startswith('Event 1-')}
+    
+    source = listing_source(chain(5), events_per_page=2)
+    source.known_hashes = known
+    source.crawl(['/listing?page=1'])
+    
+    assert [source.page_number(url) for url in source.fetched] == [1, 2]
+    assert source.crawl_stats['stopped_early']
+    assert not source.crawl_complete
+
+
+def test_failed_page_is_retried_by_next_run(listing_source):
+    """
+    A page that still fails after its retries makes the crawl incomplete and
+    is left in failed_pages; the next run fetches it ahead of its own pagination.
+    """
+    source = listing_source(chain(5), events_per_page=1, status={3: 503})
+    source.crawl(['/listing?page=1'])
+    
+    url = 'https://test.example/listing?page=3'
+    assert source.fetched.count(url) == 3
+    assert source.failed_pages == [[url, PAGINATION, 2]]
+    assert source.crawl_stats['failed'] == 1
+    assert not source.crawl_complete
+    
+    next_run = listing_source(chain(5), events_per_page=1)
+    next_run.backlog_pages = source.failed_pages
+    next_run.crawl(['/listing?page=1'])
+    
+    assert [next_run.page_number(url) for url in next_run.fetched] == [1, 3, 2, 4, 5]
+    assert next_run.failed_pages == []
+    assert next_run.crawl_complete
+
+
+def test_gone_page_is_not_retried(listing_source):
+    """
+    A page that answers 404 is dropped: it is not kept for the next run and
+    the crawl still counts as complete.
+    """
+    source = listing_source(chain(5), events_per_page=1, status={3: 404})
+    source.crawl(['/listing?page=1'])
+    
+    assert source.failed_pages == []
+    assert source.crawl_complete
+
+
+def test_open_circuit_fails_the_remaining_pages(listing_source):
+    """
+    Once a failing host's circuit opens, the pages not fetched because of it
+    are failed pages too.
+    """
+    status = {page: 503 for page in range(2, 9)}
+    source = listing_source(lambda page: list(range(2, 9)) if page == 1 else [], status=status)
+    source.crawl(['/listing?page=1'])
+    
+    assert any(error.startswith('Circuit open') for error in source.errors)
+    assert sorted(source.page_number(url) for url, _, _ in source.failed_pages) == list(range(2, 9))
+    assert not source.crawl_complete
+
+
+def test_runner_queues_failed_pages(listing_source, monkeypatch):
+    """
+    The runner stores a source's failed pages as its backlog, apart from the
+    pages the time budget left out.
+    """
+    monkeypatch.setenv('MONGODB_URI', f"memory://crawl-{uuid.uuid4().hex[:8]}")
+    runner = ScraperRunner(sources=['timeout.com/sydney'])
+    source = listing_source(chain(5), status={3: 503})
+    runner.scrapers = [source]
+    source.crawl(['/listing?page=1'])
+    
+    runner.record_skipped_work()
+    
+    assert runner.skipped_report['failed_pages'] == 1
+    assert runner.skipped_report['pages'] == 0
+    backlog = load_backlog(runner.db, [source.source_name])
+    assert backlog == {'sources': [], 'pages': {source.source_name: source.failed_pages}}
+    
+    runner.load_backlog()
+    assert source.backlog_pages == [['https://test.example/listing?page=3', PAGINATION, 2]]
@@ -0,0 +1,105 @@
+"""
+Test Run Deadline
+Checks that work the time budget leaves out is skipped, kept per source and
+goes first in the next run
+"""
+
+import os
+import sys
+import uuid
+
+import requests
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.deadline import Deadline, load_backlog, save_backlog
+from utils.frontier import LISTING
+from utils.host_control import HOSTS
+from utils.storage import connect_database
+
+
+class ExpiringDeadline(Deadline):
+    """
+    Deadline that expires after a number of checks instead of seconds. The
+    crawl and fetch_page each check it once per page.
+    """
+    
+    def __init__(self, checks):
+        super().__init__()
+        self.checks = checks
+    
+    def expired(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+def links(page):
+    """
+    Links of a listing whose pages each link to the next two, up to page 6.
+    
+    Returns:
+        list: Linked page numbers
+    """
+    return [page + 1, page + 2] if page < 6 else []
+
+
+def test_crawl_stops_at_deadline_and_resumes_from_backlog(listing_source):
+    """
+    Pages still queued when the deadline expires are left in skipped_pages,
+    and the next run fetches them right after its start page, ahead of the
+    pagination it finds.
+    """
+    source = listing_source(links)
+    source.deadline = ExpiringDeadline(4)
+    source.crawl(['/listing?page=1'])
+    
+    assert len(source.fetched) == 2
+    assert not source.crawl_complete
+    skipped = [url for url, _, _ in source.skipped_pages]
+    assert skipped and not set(skipped) & set(source.fetched)
+    
+    next_run = listing_source(links)
+    next_run.backlog_pages = source.skipped_pages
+    next_run.crawl(['/listing?page=1'])
+    
+    assert next_run.fetched[1:len(skipped) + 1] == skipped
+    assert next_run.crawl_complete
+
+
+def test_retry_after_past_deadline_skips_fetch(listing_source):
+    """
+    A page whose host asks to wait beyond the deadline is not fetched and is
+    recorded as skipped, without counting as a failure.
+    """
+    source = listing_source(links)
+    # Replays ignore Retry-After; this source stands for a live fetch
+    source.replaying = False
+    url = 'https://test.example/listing?page=1'
+    host = HOSTS.get(url)
+    host.acquire()
+    response = requests.Response()
+    response.status_code = 429
+    response.headers['Retry-After'] = '120'
+    host.release(response, 0.01)
+    
+    source.deadline = Deadline(5)
+    assert source.fetch_page(url) is None
+    assert source.fetched == []
+    assert url in source.skipped_urls
+    assert not source.errors
+
+
+def test_backlog_is_kept_per_source():
+    """
+    Saving the backlog of one source leaves the other sources' backlog alone,
+    and a source that finished has its backlog cleared.
+    """
+    db = connect_database(f"memory://backlog-{uuid.uuid4().hex[:8]}")
+    page = ['https://a.example/listing?page=3', LISTING, 1]
+    
+    save_backlog(db, ['a', 'b'], ['a'], {'b': [page]})
+    assert load_backlog(db, ['a', 'b']) == {'sources': ['a'], 'pages': {'b': [page]}}
+    
+    save_backlog(db, ['a'], [], {})
+    assert load_backlog(db, ['a', 'b']) == {'sources': [], 'pages': {'b': [page]}}
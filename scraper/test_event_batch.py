@@ -0,0 +1,128 @@
+"""
+Test Event Batch
+Checks that the NumPy and pure-Python paths of EventBatch agree, and the
+deduplication and date filtering rules both follow
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import event_batch
+from utils.event_batch import EventBatch
+from utils.event_record import Event
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def make_events():
+    """
+    Build events covering duplicates, past and undated events and several sources.
+    
+    Returns:
+        list: Event records and plain dictionaries, mixed
+    """
+    return [
+        Event('Vivid Sydney', NOW + timedelta(days=5), 'Circular Quay', 'Lights.', None, '/a/1', 'a'),
+        {'title': 'vivid sydney', 'date': NOW + timedelta(days=5), 'location': 'Circular Quay', 'source': 'b'},
+        Event('Old Market', NOW - timedelta(days=2), 'The Rocks', '', None, '/a/2', 'a'),
+        {'title': 'Jazz Night', 'date': NOW + timedelta(days=1), 'location': 'The Basement', 'source': 'b'},
+        {'title': 'Open Studio', 'date': None, 'location': 'Redfern', 'source': 'c'},
+        Event('Open Studio', None, 'Redfern', 'Again.', None, '/a/3', 'a'),
+        {'title': 'Late Show', 'date': NOW, 'location': 'Enmore', 'source': 'c'},
+    ]
+
+
+def summarize(batch):
+    """
+    Reduce a batch to plain values comparable across both paths.
+    
+    Args:
+        batch (EventBatch): Batch to summarize
+    
+    Returns:
+        tuple: Titles, sources, hashes and per-source counts
+    """
+    return (
+        list(batch.titles),
+        [str(source) for source in batch.sources],
+        batch.hash_list(),
+        batch.source_counts()
+    )
+
+
+def run_pipeline(numpy_enabled, monkeypatch):
+    """
+    Run deduplication, filtering and grouping with NumPy on or off.
+    
+    Args:
+        numpy_enabled (bool): Whether the NumPy path is used
+        monkeypatch: pytest monkeypatch fixture
+    
+    Returns:
+        dict: Summaries of each stage
+    """
+    monkeypatch.setattr(event_batch, 'NUMPY_AVAILABLE', numpy_enabled)
+    batch = EventBatch.from_events(make_events())
+    unique = batch.deduplicate()
+    upcoming = unique.filter_upcoming(NOW)
+    return {
+        'initial': summarize(batch),
+        'unique': summarize(unique),
+        'upcoming': summarize(upcoming),
+        'groups': {source: summarize(group) for source, group in upcoming.group_by_source().items()},
+        'documents': upcoming.to_documents()
+    }
+
+
+def test_numpy_and_python_paths_agree(monkeypatch):
+    """
+    Both paths give the same rows, in the same order, at every stage.
+    """
+    if not event_batch.NUMPY_AVAILABLE:
+        pytest.skip("NumPy not installed")
+    
+    assert run_pipeline(True, monkeypatch) == run_pipeline(False, monkeypatch)
+
+
+@pytest.mark.parametrize('numpy_enabled', [True, False])
+def test_deduplicate_keeps_first(numpy_enabled, monkeypatch):
+    """
+    Of events sharing a hash, the first one is kept, and order is preserved.
+    """
+    if numpy_enabled and not event_batch.NUMPY_AVAILABLE:
+        pytest.skip("NumPy not installed")
+    monkeypatch.setattr(event_batch, 'NUMPY_AVAILABLE', numpy_enabled)
+    
+    events = make_events()
+    unique = EventBatch.from_events(events).deduplicate()
+    
+    assert [record['title'] for record in unique.records] == [
+        'Vivid Sydney', 'Old Market', 'Jazz Night', 'Open Studio', 'Late Show'
+    ]
+    assert unique.records[0] is events[0]
+    assert unique.records[3] is events[4]
+    assert len(set(unique.hash_list())) == len(unique)
+
+
+@pytest.mark.parametrize('numpy_enabled', [True, False])
+def test_filter_upcoming_keeps_undated(numpy_enabled, monkeypatch):
+    """
+    Past events are dropped; undated events and events at the reference time stay.
+    """
+    if numpy_enabled and not event_batch.NUMPY_AVAILABLE:
+        pytest.skip("NumPy not installed")
+    monkeypatch.setattr(event_batch, 'NUMPY_AVAILABLE', numpy_enabled)
+    
+    upcoming = EventBatch.from_events(make_events()).filter_upcoming(NOW)
+    
+    titles = [record['title'] for record in upcoming.records]
+    assert 'Old Market' not in titles
+    assert titles.count('Open Studio') == 2
+    assert 'Late Show' in titles
+    assert len(upcoming) == 6
@@ -0,0 +1,134 @@
+"""
+Test Event Record
+Checks that Event keeps the dict behaviour the pipeline relies on, and that
+its cached hash and fingerprint follow field changes
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.deduplicate import generate_event_hash, generate_content_fingerprint
+from utils.event_record import Event, to_document
+
+
+def make_event():
+    """
+    Build a complete event.
+    
+    Returns:
+        Event: Event of a fixed source
+    """
+    return Event(
+        title='Jazz Night',
+        date=datetime(2026, 3, 1, 20, 0),
+        location='The Basement, Circular Quay',
+        description='Live jazz.',
+        image_url='https://test.example/jazz.jpg',
+        ticket_url='https://test.example/jazz',
+        source='test.example',
+        last_updated=datetime(2026, 2, 1, 9, 0)
+    )
+
+
+def test_dict_access():
+    """
+    get, setdefault, update, `in`, iteration and len behave as on an event dictionary.
+    """
+    event = make_event()
+    
+    assert event['title'] == event.get('title') == 'Jazz Night'
+    assert event.get('_id') is None and event.get('_id', 'x') == 'x'
+    assert 'title' in event and 'event_hash' in event and '_id' not in event
+    with pytest.raises(KeyError):
+        event['_id']
+    
+    assert event.setdefault('title', 'Other') == 'Jazz Night'
+    assert event.setdefault('_id', 'abc') == 'abc'
+    assert '_id' in event
+    
+    event.update({'description': 'Late jazz.', 'geohash': 'r3gx2'}, is_active=False)
+    assert event['description'] == 'Late jazz.'
+    assert event['geohash'] == 'r3gx2'
+    assert event['is_active'] is False
+    
+    assert len(event) == len(list(event)) == len(Event.FIELDS) + 4
+    assert dict(event)['_id'] == 'abc'
+
+
+def test_delete_fields():
+    """
+    Extra fields are removed, standard fields are cleared to None, and
+    deleting the hash makes it be computed again.
+    """
+    event = make_event()
+    event['_id'] = 'abc'
+    
+    del event['_id']
+    assert '_id' not in event
+    with pytest.raises(KeyError):
+        del event['_id']
+    
+    assert event.pop('image_url') == 'https://test.example/jazz.jpg'
+    assert event['image_url'] is None and 'image_url' in event
+    del event['description']
+    assert event['description'] is None
+    
+    event['event_hash'] = 'stale'
+    del event['event_hash']
+    assert event['event_hash'] == generate_event_hash(event['title'], event['date'], event['location'])
+
+
+def test_cached_hash_and_fingerprint_follow_fields():
+    """
+    Reassigning a field recomputes the hash and fingerprint that depend on it, and only those.
+    """
+    event = make_event()
+    event_hash = event['event_hash']
+    fingerprint = event['content_fingerprint']
+    
+    event['description'] = 'Now with a late session.'
+    assert event['event_hash'] == event_hash
+    assert event['content_fingerprint'] != fingerprint
+    assert event['content_fingerprint'] == generate_content_fingerprint(dict(event))
+    
+    event['title'] = 'Jazz Night (Late)'
+    assert event['event_hash'] != event_hash
+    assert event['event_hash'] == generate_event_hash('Jazz Night (Late)', event['date'], event['location'])
+    
+    # The scraper may set the hash itself; a later change to its inputs replaces it
+    event['event_hash'] = 'given'
+    assert event['event_hash'] == 'given'
+    event['location'] = 'The Basement'
+    assert event['event_hash'] != 'given'
+
+
+def test_document_round_trip():
+    """
+    An event converted to a document and back is equal to the original,
+    extras and cached values included.
+    """
+    event = make_event()
+    event['_id'] = 'abc'
+    
+    document = to_document(event)
+    assert document['event_hash'] == event['event_hash']
+    assert document['content_fingerprint'] == event['content_fingerprint']
+    assert document['_id'] == 'abc'
+    
+    restored = Event.from_dict(document)
+    assert dict(restored) == dict(event)
+    assert to_document(restored) == document
+    
+    # Plain dictionaries pass through unchanged
+    plain = {'title': 'Jazz Night'}
+    assert to_document(plain) is plain
+    
+    # Sources are interned, so every event of a source shares one string
+    built = Event.from_dict(dict(document, source=''.join(['test', '.example'])))
+    assert built['source'] is event['source']
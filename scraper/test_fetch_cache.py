@@ -0,0 +1,183 @@
+"""
+Test Fetch Cache
+Checks that concurrent fetches of a page share one call, its result or its
+exception, and that the response cache evicts by entries and by bytes
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.fetch_cache import ResponseCache, SingleFlight, fetch_key
+
+WAITERS = 4
+
+
+def fake_response(size):
+    """
+    Build a response with a body of size bytes.
+    
+    Returns:
+        requests.Response: Response with its body loaded
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'x' * size
+    return response
+
+
+def run_concurrently(flights, func):
+    """
+    Call flights.do with func from a leader and WAITERS waiters that join
+    while the leader's call is in flight.
+    
+    Args:
+        flights (SingleFlight): Coalescer under test
+        func (callable): Leader's function; it runs until the waiters have joined
+    
+    Returns:
+        list: (result, shared) or the exception raised, per caller, leader first
+    """
+    started = threading.Event()
+    outcomes = [None] * (WAITERS + 1)
+    calls = []
+    
+    def leader_call():
+        started.wait(5)
+        # Let the waiters reach flights.do before finishing
+        time.sleep(0.1)
+        return func()
+    
+    def call(i, target):
+        try:
+            outcomes[i] = flights.do('https://test.example/page', target)
+        except Exception as e:
+            outcomes[i] = e
+    
+    def waiter_call():
+        calls.append('waiter')
+        return func()
+    
+    leader = threading.Thread(target=call, args=(0, leader_call))
+    leader.start()
+    while not flights._flights:
+        time.sleep(0.001)
+    
+    waiters = [threading.Thread(target=call, args=(i, waiter_call)) for i in range(1, WAITERS + 1)]
+    for waiter in waiters:
+        waiter.start()
+    # Every waiter is started before the leader may finish
+    started.set()
+    for thread in [leader] + waiters:
+        thread.join(5)
+    
+    assert calls == []
+    return outcomes
+
+
+def test_waiters_share_the_leaders_result():
+    """
+    One call runs; every concurrent caller gets its result, flagged as shared.
+    """
+    flights = SingleFlight()
+    body = object()
+    outcomes = run_concurrently(flights, lambda: body)
+    
+    assert outcomes[0] == (body, False)
+    assert all(outcome == (body, True) for outcome in outcomes[1:])
+    
+    # Nothing is kept once the call finished
+    assert flights._flights == {}
+    assert flights.do('https://test.example/page', lambda: 'again') == ('again', False)
+
+
+def test_waiters_share_the_leaders_exception():
+    """
+    An exception of the leader's call is raised to every waiter too, and the
+    next call runs afresh.
+    """
+    flights = SingleFlight()
+    error = ConnectionError('reset by peer')
+    
+    def fail():
+        raise error
+    
+    outcomes = run_concurrently(flights, fail)
+    assert all(outcome is error for outcome in outcomes)
+    
+    assert flights.do('https://test.example/page', lambda: 'recovered') == ('recovered', False)
+
+
+def test_keys_do_not_wait_on_each_other():
+    """
+    Calls with different keys run independently.
+    """
+    flights = SingleFlight()
+    assert flights.do('a', lambda: flights.do('b', lambda: 1)) == ((1, False), False)
+
+
+def test_lru_evicts_by_entries():
+    """
+    Over max_entries, the least recently used responses are evicted; a get
+    counts as a use.
+    """
+    cache = ResponseCache(max_entries=2)
+    first, second, third = fake_response(1), fake_response(1), fake_response(1)
+    cache.put('a', first)
+    cache.put('b', second)
+    assert cache.get('a') is first
+    
+    cache.put('c', third)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') is first and cache.get('c') is third
+
+
+def test_lru_evicts_by_bytes():
+    """
+    Over max_bytes, the least recently used responses are evicted; a response
+    larger than the whole cache is not kept, and replacing a key frees its bytes.
+    """
+    cache = ResponseCache(max_entries=10, max_bytes=100)
+    cache.put('a', fake_response(40))
+    cache.put('b', fake_response(40))
+    cache.put('c', fake_response(40))
+    assert cache.get('a') is None and len(cache) == 2
+    
+    cache.put('big', fake_response(101))
+    assert cache.get('big') is None and len(cache) == 2
+    
+    cache.put('b', fake_response(10))
+    cache.put('d', fake_response(50))
+    assert cache.get('c') is not None and cache.get('b') is not None
+    assert cache._bytes == 100
+    
+    cache.clear()
+    assert len(cache) == 0 and cache._bytes == 0
+
+
+def test_disabled_cache_keeps_nothing():
+    """
+    max_entries of 0 turns the cache off.
+    """
+    cache = ResponseCache(max_entries=0)
+    cache.put('a', fake_response(1))
+    assert cache.get('a') is None
+
+
+@pytest.mark.parametrize('url', [
+    'https://Test.example/e/1?utm_source=mail',
+    'https://test.example/e/1#tickets',
+])
+def test_fetch_key_is_canonical(url):
+    """
+    Links to the same page in different forms share a key.
+    """
+    assert fetch_key(url) == fetch_key('https://test.example/e/1')
@@ -0,0 +1,66 @@
+"""
+Test Offline Geocoding
+Checks that free-text locations resolve to gazetteer venues, and that the
+cache answers repeated lookups
+"""
+
+import os
+import sys
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.geocode import Gazetteer, GeocodeCache, geocode_events, encode_geohash
+
+GAZETTEER = Gazetteer()
+
+
+def test_venue_wins_over_locality():
+    """
+    A location naming a venue and its suburb resolves to the venue, whatever
+    the order and case of its parts.
+    """
+    for location in ('The Basement, Circular Quay', 'circular quay - the basement', 'THE BASEMENT'):
+        result = GAZETTEER.resolve(location, 'sydney')
+        assert result['venue'] == 'The Basement', location
+        assert result['kind'] == 'venue'
+    
+    result = GAZETTEER.resolve('Opera House, Bennelong Point, Sydney NSW', 'sydney')
+    assert result['venue'] == 'Sydney Opera House'
+    assert result['geohash'] == encode_geohash(result['lat'], result['lon'])
+
+
+def test_locality_and_unknown_locations():
+    """
+    A location with only a known suburb resolves to the suburb; an unknown
+    one, or one in another city's gazetteer, does not resolve.
+    """
+    assert GAZETTEER.resolve('Shop 3, 12 Crown Street, Surry Hills', 'sydney')['venue'] == 'Surry Hills'
+    assert GAZETTEER.resolve('Somewhere Else Entirely', 'sydney') is None
+    assert GAZETTEER.resolve('Federation Square', 'sydney') is None
+    assert GAZETTEER.resolve('Federation Square', 'melbourne')['kind'] == 'locality'
+    assert GAZETTEER.resolve('', 'sydney') is None
+
+
+def test_cache_persists_results_and_misses(tmp_path):
+    """
+    Events get GeoJSON points; a location is looked up once per batch, and a
+    new cache over the same directory answers from disk, misses included.
+    """
+    events = [
+        {'title': 'A', 'location': 'The Basement, Circular Quay'},
+        {'title': 'B', 'location': 'The Basement, Circular Quay'},
+        {'title': 'C', 'location': 'Somewhere Else Entirely'}
+    ]
+    cache = GeocodeCache(GAZETTEER, str(tmp_path))
+    
+    report = geocode_events(events, cache, 'sydney')
+    assert report == {'resolved': 2, 'cached': 0, 'unresolved': 1}
+    # GeoJSON puts longitude first
+    assert events[0]['geo'] == {'type': 'Point', 'coordinates': [151.2105, -33.8624]}
+    assert 'geo' not in events[2]
+    cache.save()
+    
+    reloaded = GeocodeCache(GAZETTEER, str(tmp_path))
+    assert reloaded.resolve('the basement, circular quay', 'sydney')[1]
+    assert reloaded.resolve('Somewhere Else Entirely', 'sydney') == (None, True)
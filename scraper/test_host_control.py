@@ -0,0 +1,250 @@
+"""
+Test Host Control
+Checks the per-host concurrency limit, Retry-After backoff and circuit
+breaker by driving acquire and release with fake responses
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.host_control import HostRegistry, HostState, parse_retry_after, CLOSED, HALF_OPEN, OPEN
+
+
+def fake_response(status, headers=None):
+    """
+    Build a response with a status and headers.
+    
+    Returns:
+        requests.Response: Response with no body
+    """
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return response
+
+
+def request(host, status, elapsed=0.05, headers=None):
+    """
+    Make one request through a host: acquire, then release with the outcome.
+    
+    Args:
+        host (HostState): Host
+        status (int): Response status, or None for a failed request
+        elapsed (float): Seconds the request took
+    """
+    assert host.acquire()
+    host.release(fake_response(status, headers) if status else None, elapsed)
+
+
+def open_circuit(host):
+    """
+    Fail requests until the host's circuit opens.
+    """
+    while host.state != OPEN:
+        request(host, None)
+
+
+def test_additive_increase_multiplicative_decrease():
+    """
+    Successes raise the limit by about one per round up to max_limit; an
+    error or latency spike halves it, once per round trip.
+    """
+    host = HostState('aimd.test', initial_limit=2, max_limit=4)
+    for _ in range(2):
+        request(host, 200, elapsed=1.0)
+    assert 2.5 < host.limit < 3
+    
+    for _ in range(20):
+        request(host, 200, elapsed=1.0)
+    assert host.limit == 4
+    
+    request(host, 503, elapsed=1.0)
+    assert host.limit == 2
+    # The same burst of errors, within one round trip, counts once
+    request(host, 429, elapsed=1.0)
+    assert host.limit == 2
+    assert host.failures == 1 and host.state == CLOSED
+    
+    host.last_decrease -= 5
+    request(host, 200, elapsed=10.0)
+    assert host.limit == 1
+    
+    # Never below one request at a time
+    host.last_decrease -= 20
+    request(host, None, elapsed=1.0)
+    assert host.limit == 1
+
+
+def test_limit_caps_requests_in_flight():
+    """
+    Requests beyond the limit wait for a slot, and give up at their timeout.
+    """
+    host = HostState('limit.test', initial_limit=1)
+    assert host.acquire()
+    
+    started = time.monotonic()
+    assert not host.acquire(timeout=0.05)
+    assert 0.04 < time.monotonic() - started < 1
+    assert host.in_flight == 1
+    
+    # A slot freed while waiting is taken
+    releaser = threading.Timer(0.05, host.release, (fake_response(200), 0.05))
+    releaser.start()
+    assert host.acquire(timeout=5)
+    releaser.join()
+    assert host.in_flight == 1
+
+
+def test_retry_after_holds_requests():
+    """
+    A Retry-After on a 429 or 503 holds back the host's next requests, unless
+    they ignore it (replays) or their deadline ends first.
+    """
+    host = HostState('retry.test')
+    request(host, 429, headers={'Retry-After': '120'})
+    assert host.not_before - time.monotonic() > 100
+    
+    # Waiting past the deadline is not attempted at all
+    started = time.monotonic()
+    assert not host.acquire(timeout=5)
+    assert time.monotonic() - started < 1
+    assert host.in_flight == 0
+    
+    assert host.acquire(wait=False)
+    host.release(fake_response(200), 0.05)
+    
+    host.not_before = time.monotonic() + 0.1
+    started = time.monotonic()
+    assert host.acquire(timeout=5)
+    assert time.monotonic() - started >= 0.09
+    host.release(fake_response(200), 0.05)
+    
+    # A Retry-After on other statuses is ignored, and long ones are capped
+    host.not_before = 0.0
+    request(host, 500, headers={'Retry-After': '120'})
+    assert host.not_before == 0.0
+    request(host, 503, headers={'Retry-After': '100000'})
+    assert host.not_before - time.monotonic() <= 300
+
+
+def test_parse_retry_after():
+    """
+    Retry-After is read as seconds or as an HTTP date.
+    """
+    now = datetime(2015, 10, 21, 7, 27, 0, tzinfo=timezone.utc)
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now) == 60
+    assert parse_retry_after('Wed, 21 Oct 2015 07:20:00 GMT', now) == 0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_circuit_opens_and_a_single_probe_closes_it():
+    """
+    Consecutive failures open the circuit; after the cooldown one probe is
+    let through at a time, and its outcome closes or reopens the circuit.
+    """
+    host = HostState('circuit.test', failure_threshold=3, cooldown=0.05)
+    request(host, None)
+    request(host, 200)
+    request(host, None)
+    request(host, 502)
+    assert host.state == CLOSED
+    
+    request(host, None)
+    assert host.state == OPEN
+    assert not host.acquire()
+    assert not host.circuit_closed()
+    
+    # A failed probe reopens the circuit at once
+    time.sleep(0.06)
+    assert host.acquire()
+    assert host.state == HALF_OPEN and not host.acquire()
+    host.release(None, 0.05)
+    assert host.state == OPEN and not host.acquire()
+    
+    time.sleep(0.06)
+    assert host.acquire()
+    host.release(fake_response(200), 0.05)
+    assert host.state == CLOSED and host.failures == 0
+    assert host.circuit_closed()
+
+
+def test_probe_racing_an_in_flight_request():
+    """
+    A request made before the circuit opened and released during the probe
+    does not end the probe, so no second probe is let through.
+    """
+    host = HostState('race.test', initial_limit=4, failure_threshold=2, cooldown=0.05)
+    started = threading.Event()
+    finish = threading.Event()
+    
+    def slow_request():
+        assert host.acquire()
+        started.set()
+        finish.wait(5)
+        host.release(None, 1.0)
+    
+    in_flight = threading.Thread(target=slow_request)
+    in_flight.start()
+    started.wait(5)
+    
+    open_circuit(host)
+    time.sleep(0.06)
+    assert host.acquire()
+    assert host.probe_thread == threading.get_ident()
+    
+    # The old request fails while the probe is out: the circuit reopens, the probe stays
+    finish.set()
+    in_flight.join()
+    assert host.state == OPEN and host.probing
+    time.sleep(0.06)
+    allowed = []
+    other = threading.Thread(target=lambda: allowed.append(host.acquire()))
+    other.start()
+    other.join()
+    assert allowed == [False]
+    
+    host.release(fake_response(200), 0.05)
+    assert host.state == CLOSED and not host.probing
+    assert host.acquire()
+
+
+def test_probe_that_cannot_start_in_time_is_given_back():
+    """
+    A probe whose acquire times out frees the probe for the next request.
+    """
+    host = HostState('deadline.test', failure_threshold=1, cooldown=0.05)
+    open_circuit(host)
+    time.sleep(0.06)
+    
+    host.not_before = time.monotonic() + 60
+    assert not host.acquire(timeout=0.5)
+    assert not host.probing and host.probe_thread is None
+    
+    assert host.acquire(wait=False)
+    assert host.probing
+
+
+def test_registry_shares_hosts():
+    """
+    URLs on the same host share one state; reset forgets them all.
+    """
+    hosts = HostRegistry(initial_limit=1)
+    host = hosts.get('https://Shared.test/a')
+    assert hosts.get('https://shared.test/b?page=2') is host
+    assert hosts.get('https://other.test/') is not host
+    assert host.limit == 1
+    
+    hosts.reset(initial_limit=3)
+    assert hosts.get('https://shared.test/a') is not host
+    assert hosts.get('https://shared.test/a').limit == 3
+    assert set(hosts.snapshot()) == {'shared.test'}
@@ -12,16 +12,15 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from run_scraper import ScraperRunner
 from utils.deduplicate import generate_event_hash
+from utils.storage import connect_database
 
 # MongoDB connection
 try:
-    from pymongo import MongoClient
     from dotenv import load_dotenv
     load_dotenv()
     
     mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/sydney-events')
-    client = MongoClient(mongodb_uri)
-    db = client.get_database()
+    db = connect_database(mongodb_uri)
     MONGODB_AVAILABLE = True
 except Exception as e:
     print(f"[ERROR] MongoDB not available: {e}")
@@ -0,0 +1,124 @@
+"""
+Test Lease Queue
+Checks that tasks held by dead workers are handed out again, and parked once
+they have used up their attempts
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.lease_queue import LeaseQueue
+from utils.storage import connect_database
+
+
+def make_queue(max_attempts=3):
+    """
+    Create a queue on its own in-memory collection.
+    
+    Args:
+        max_attempts (int): Attempts before a task is parked
+    
+    Returns:
+        LeaseQueue: Empty queue
+    """
+    db = connect_database(f"memory://lease-{uuid.uuid4().hex[:8]}")
+    queue = LeaseQueue(db.tasks, lease_seconds=60, max_attempts=max_attempts)
+    queue.ensure_indexes()
+    return queue
+
+
+def expire_lease(queue, task):
+    """
+    Make a task's lease run out, as if its worker died.
+    """
+    queue.collection.update_one(
+        {'_id': task['_id']},
+        {'$set': {'lease_expires': datetime.now() - timedelta(seconds=1)}}
+    )
+
+
+def test_expired_lease_is_reclaimed():
+    """
+    A task whose lease expired goes to the next worker, and the dead worker
+    can no longer complete it.
+    """
+    queue = make_queue()
+    queue.enqueue('source:a', 'source', {'source': 'a'})
+    
+    task = queue.claim('worker-1')
+    assert task['attempts'] == 1
+    assert queue.claim('worker-2') is None
+    
+    expire_lease(queue, task)
+    reclaimed = queue.claim('worker-2')
+    assert reclaimed['_id'] == 'source:a'
+    assert reclaimed['worker'] == 'worker-2'
+    assert reclaimed['attempts'] == 2
+    
+    assert not queue.heartbeat(task, 'worker-1')
+    assert not queue.complete(task, 'worker-1')
+    assert queue.complete(reclaimed, 'worker-2', {'events': 3})
+    assert queue.stats().get('done') == 1
+
+
+def test_lease_expired_on_last_attempt_is_parked():
+    """
+    A task whose lease expires on its last attempt is not claimable again
+    and is parked as failed instead of staying leased forever.
+    """
+    queue = make_queue(max_attempts=2)
+    queue.enqueue('source:a', 'source', {'source': 'a'})
+    
+    for worker_id in ('worker-1', 'worker-2'):
+        task = queue.claim(worker_id)
+        expire_lease(queue, task)
+    
+    assert queue.claim('worker-3') is None
+    
+    parked = queue.park_expired()
+    assert [task['_id'] for task in parked] == ['source:a']
+    assert parked[0]['status'] == 'failed'
+    assert parked[0]['error']
+    assert queue.park_expired() == []
+    assert queue.stats().get('failed') == 1
+
+
+def test_live_lease_is_not_parked():
+    """
+    Parking leaves tasks alone while their lease still runs.
+    """
+    queue = make_queue(max_attempts=1)
+    queue.enqueue('source:a', 'source', {'source': 'a'})
+    task = queue.claim('worker-1')
+    
+    assert queue.park_expired() == []
+    assert queue.complete(task, 'worker-1')
+
+
+def test_worker_does_not_count_a_lost_lease(monkeypatch):
+    """
+    A worker whose lease ran out while it worked leaves the task to the
+    worker that reclaimed it and does not count it as completed.
+    """
+    import worker
+    
+    queue = make_queue()
+    queue.enqueue('bench:a', 'bench', {})
+    
+    def slow_task(queue, task):
+        # Stalls past its lease: another worker takes the task meanwhile
+        expire_lease(queue, task)
+        assert queue.claim('worker-2')['_id'] == 'bench:a'
+        return {}
+    
+    monkeypatch.setattr(worker, 'get_queue', lambda lease_seconds: queue)
+    monkeypatch.setattr(worker, 'run_task', slow_task)
+    
+    assert worker.work() == 0
+    task = queue.collection.find_one({'_id': 'bench:a'})
+    assert task['status'] == 'leased' and task['worker'] == 'worker-2'
@@ -0,0 +1,158 @@
+"""
+Test Run Diff
+Checks that events missing from their source are deactivated only after the
+grace runs, that returning events are restored, that empty and partial
+sources are never diffed, and that early-stopping sources get full crawls
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from run_scraper import ScraperRunner
+from utils.run_diff import diff_run, due_full_crawl, record_crawls, sorted_difference
+from utils.storage import connect_database
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def make_db(events):
+    """
+    Create an in-memory database holding active upcoming events.
+    
+    Args:
+        events (list): (source, event_hash) pairs
+    
+    Returns:
+        Database: MemoryDatabase with the events stored
+    """
+    db = connect_database(f"memory://diff-{uuid.uuid4().hex[:8]}")
+    db.events.insert_many([
+        {'source': source, 'event_hash': event_hash, 'is_active': True, 'date': NOW + timedelta(days=1)}
+        for source, event_hash in events
+    ])
+    return db
+
+
+def state(db, event_hash):
+    """
+    Get the diff state of a stored event.
+    
+    Returns:
+        tuple: is_active and missed_runs
+    """
+    event = db.events.find_one({'event_hash': event_hash})
+    return event['is_active'], event.get('missed_runs', 0)
+
+
+def test_sorted_difference():
+    """
+    Items of the left list missing from the right one, in order.
+    """
+    assert sorted_difference(['a', 'b', 'c', 'e'], ['b', 'd', 'e']) == ['a', 'c']
+    assert sorted_difference(['a', 'b'], []) == ['a', 'b']
+    assert sorted_difference([], ['a']) == []
+
+
+def test_grace_runs_then_restore():
+    """
+    A missing event is counted for grace_runs - 1 runs, deactivated on the
+    grace_runs-th, and an event seen again has its count reset.
+    """
+    db = make_db([('a', 'h1'), ('a', 'h2'), ('a', 'h3')])
+    
+    report = diff_run(db.events, {'a': {'h1'}}, grace_runs=3, now=NOW)
+    assert report['a']['missed'] == 2 and report['a']['deactivated'] == 0
+    assert state(db, 'h2') == (True, 1)
+    
+    # h3 is back: its count is reset, h2 is still missing
+    report = diff_run(db.events, {'a': {'h1', 'h3'}}, grace_runs=3, now=NOW)
+    assert report['a']['restored'] == 1
+    assert state(db, 'h2') == (True, 2) and state(db, 'h3') == (True, 0)
+    
+    report = diff_run(db.events, {'a': {'h1', 'h3'}}, grace_runs=3, now=NOW)
+    assert report['a']['deactivated_hashes'] == ['h2']
+    assert state(db, 'h2') == (False, 3)
+    assert db.events.find_one({'event_hash': 'h2'})['deactivated_reason'] == 'vanished'
+    
+    # Deactivated and past events are no longer diffed
+    db.events.update_one({'event_hash': 'h3'}, {'$set': {'date': NOW - timedelta(days=1)}})
+    report = diff_run(db.events, {'a': {'h1'}}, grace_runs=3, now=NOW)
+    assert report['a'] == {'stored': 1, 'missed': 0, 'deactivated': 0, 'restored': 0,
+                           'deactivated_hashes': []}
+
+
+def test_event_moved_to_another_source_is_seen():
+    """
+    An event listed by another source this run counts as seen.
+    """
+    db = make_db([('a', 'h1'), ('a', 'h2'), ('b', 'h3')])
+    
+    report = diff_run(db.events, {'a': {'h1'}, 'b': {'h2', 'h3'}}, grace_runs=1, now=NOW)
+    assert report['a']['deactivated'] == 0
+    assert state(db, 'h2') == (True, 0)
+
+
+def test_empty_and_partial_sources_are_skipped():
+    """
+    Sources that returned nothing or stopped before their last page keep
+    every stored event untouched.
+    """
+    db = make_db([('a', 'h1'), ('b', 'h2'), ('b', 'h3'), ('c', 'h4')])
+    
+    report = diff_run(db.events, {'a': set(), 'b': {'h2'}, 'c': {'h4'}}, grace_runs=1, now=NOW,
+                      partial_sources={'b'})
+    assert report['a'] == {'skipped': 'no events scraped'}
+    assert report['b'] == {'skipped': 'partial crawl'}
+    assert report['c']['stored'] == 1
+    assert all(state(db, event_hash) == (True, 0) for event_hash in ('h1', 'h2', 'h3', 'h4'))
+
+
+def test_partial_sources_become_due_for_a_full_crawl():
+    """
+    A source whose crawls stopped early every - 1 runs in a row is due for a
+    full crawl, and a complete crawl starts the count again.
+    """
+    db = connect_database(f"memory://diff-{uuid.uuid4().hex[:8]}")
+    sources = ['a', 'b']
+    
+    assert due_full_crawl(db, sources, every=3) == set()
+    assert due_full_crawl(db, sources, every=1) == {'a', 'b'}
+    
+    record_crawls(db, ['b'], ['a'])
+    assert due_full_crawl(db, sources, every=3) == set()
+    record_crawls(db, ['b'], ['a'])
+    assert due_full_crawl(db, sources, every=3) == {'a'}
+    assert due_full_crawl(db, sources, every=0) == set()
+    
+    # The full crawl reached the last page
+    record_crawls(db, ['a'], [])
+    assert due_full_crawl(db, sources, every=3) == set()
+    assert db.crawl_state.count_documents({}) == 0
+
+
+def test_runner_crawls_due_sources_fully(monkeypatch):
+    """
+    The runner gives no known hashes to a source due for a full crawl, and
+    counts the runs its sources stopped early.
+    """
+    monkeypatch.setenv('MONGODB_URI', f"memory://diff-{uuid.uuid4().hex[:8]}")
+    runner = ScraperRunner(sources=['timeout.com/sydney'])
+    scraper = runner.scrapers[0]
+    runner.db.events.insert_one({'source': scraper.source_name, 'event_hash': 'h1', 'is_active': True})
+    
+    runner.load_known_hashes()
+    assert scraper.known_hashes == {'h1'}
+    
+    runner.seen_hashes = {scraper.source_name: {'h1'}}
+    runner.partial_sources = {scraper.source_name}
+    for _ in range(3):
+        runner.record_crawls()
+    
+    scraper.known_hashes = None
+    runner.load_known_hashes()
+    assert scraper.known_hashes is None
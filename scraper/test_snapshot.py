@@ -0,0 +1,115 @@
+"""
+Test Catalogue Snapshot
+Checks that snapshots read back what was written, that date and source scans
+return the right rows, and that LATEST and garbage collection stay consistent
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.snapshot import (BLOCK_ROWS, SnapshotReader, collect_garbage, latest_snapshot,
+                            list_snapshots, snapshot_path, write_snapshot)
+
+START = datetime(2026, 3, 1, 9, 0)
+
+
+def make_events(count):
+    """
+    Build events an hour apart, alternating over three sources, in reverse date order.
+    
+    Args:
+        count (int): Events to build
+    
+    Returns:
+        list: Event dictionaries
+    """
+    return [
+        {'title': f'Event {i}', 'date': START + timedelta(hours=i, microseconds=i),
+         'location': 'Sydney', 'description': 'Café ☕' if i % 7 == 0 else '', 'image_url': None,
+         'ticket_url': f'https://test.example/{i}', 'source': 'abc'[i % 3], 'event_hash': f'{i:032x}'}
+        for i in reversed(range(count))
+    ]
+
+
+def test_round_trip(tmp_path):
+    """
+    Every dated event reads back unchanged, across several blocks, in date order.
+    """
+    count = BLOCK_ROWS * 2 + 10
+    events = make_events(count)
+    undated = {'title': 'Undated', 'date': None, 'location': 'Sydney', 'source': 'a'}
+    write_snapshot(events + [undated], str(tmp_path))
+    
+    with SnapshotReader(str(tmp_path)) as reader:
+        assert len(reader) == count
+        assert reader.version == 1
+        assert sorted(reader.sources) == ['a', 'b', 'c']
+        records = list(reader.range_scan())
+    
+    expected = sorted(events, key=lambda e: e['date'])
+    assert records == expected
+
+
+def test_range_scan(tmp_path):
+    """
+    Date scans are start-inclusive and end-exclusive, with or without a source.
+    """
+    write_snapshot(make_events(600), str(tmp_path))
+    start = START + timedelta(hours=250)
+    end = START + timedelta(hours=300)
+    
+    with SnapshotReader(str(tmp_path)) as reader:
+        window = [e['title'] for e in reader.range_scan(start, end)]
+        assert window == [f'Event {i}' for i in range(250, 300)]
+        
+        # Bounds fall between rows, and open bounds run to either end
+        window = list(reader.range_scan(start + timedelta(minutes=1)))
+        assert window[0]['title'] == 'Event 251' and len(window) == 349
+        window = list(reader.range_scan(end=START + timedelta(hours=3)))
+        assert [e['title'] for e in window] == ['Event 0', 'Event 1', 'Event 2']
+        
+        # The per-source index gives the same rows as filtering the full scan
+        for source in 'abc':
+            by_index = list(reader.range_scan(start, end, source=source))
+            by_filter = [e for e in reader.range_scan(start, end) if e['source'] == source]
+            assert by_index == by_filter and by_index
+        assert len(list(reader.range_scan(source='b'))) == 200
+        assert list(reader.range_scan(start, end, source='missing')) == []
+        assert list(reader.range_scan(end, start)) == []
+
+
+def test_latest_and_garbage_collection(tmp_path):
+    """
+    LATEST points at the last written snapshot, and garbage collection keeps
+    the newest versions and whatever LATEST points at.
+    """
+    directory = str(tmp_path)
+    assert latest_snapshot(directory) is None
+    assert collect_garbage(directory) == []
+    
+    for count in (10, 20, 30, 40):
+        write_snapshot(make_events(count), directory)
+    assert list_snapshots(directory) == [1, 2, 3, 4]
+    assert latest_snapshot(directory) == snapshot_path(directory, 4)
+    
+    # Rewriting an old version moves LATEST back to it
+    write_snapshot(make_events(5), directory, version=2)
+    with SnapshotReader(directory) as reader:
+        assert reader.version == 2 and len(reader) == 5
+    
+    assert collect_garbage(directory, keep=1) == [1, 3]
+    assert list_snapshots(directory) == [2, 4]
+    
+    # A reader keeps working after its file is collected
+    reader = SnapshotReader(snapshot_path(directory, 4))
+    write_snapshot(make_events(1), directory)
+    assert collect_garbage(directory, keep=1) == [2, 4]
+    assert len(list(reader.range_scan())) == 40
+    reader.close()
+    
+    assert list_snapshots(directory) == [5]
+    assert [name for name in os.listdir(directory) if name.startswith('.tmp-')] == []
@@ -0,0 +1,78 @@
+"""
+Test Scraper Startup
+Keeps runner startup within its import budget: parser stacks and source
+modules load only for the sources a run selects
+"""
+
+import os
+import subprocess
+import sys
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Seconds importing the runner may take (cumulative, from python -X importtime)
+IMPORT_BUDGET = float(os.getenv('IMPORT_BUDGET', 1.0))
+
+# Loaded by the sources themselves, never by the runner
+SOURCE_MODULES = ('bs4', 'lxml', 'dateutil', 'utils.base_scraper', 'sources.sydney_events')
+
+
+def import_times(code):
+    """
+    Run code in a fresh interpreter and time every import it makes.
+    
+    Args:
+        code (str): Python source to run from the scraper directory
+    
+    Returns:
+        dict: Module name to cumulative import seconds
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=SCRAPER_DIR, capture_output=True, text=True, check=True
+    )
+    
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_runner_import_budget():
+    """
+    Importing the runner loads no source and stays within IMPORT_BUDGET.
+    """
+    times = import_times('import run_scraper')
+    
+    loaded = [module for module in SOURCE_MODULES if module in times]
+    assert not loaded, f"run_scraper imports source modules: {loaded}"
+    assert times['run_scraper'] <= IMPORT_BUDGET, \
+        f"run_scraper took {times['run_scraper']:.3f}s to import (budget {IMPORT_BUDGET}s)"
+
+
+def test_source_selection_is_lazy():
+    """
+    Listing and selecting sources imports none of them.
+    """
+    times = import_times(
+        "from sources.registry import select_sources; "
+        "select_sources(['timeout.com/sydney']); select_sources(tags=['demo'], cities=['sydney'])"
+    )
+    
+    loaded = [module for module in SOURCE_MODULES if module in times]
+    assert not loaded, f"selecting sources imports: {loaded}"
+    assert 'requests' not in times
+
+
+if __name__ == "__main__":
+    for name, code in [('run_scraper', 'import run_scraper'),
+                       ('sources.registry', 'import sources.registry')]:
+        times = import_times(code)
+        slowest = sorted((item for item in times.items() if item[0] != name),
+                         key=lambda item: item[1], reverse=True)[:4]
+        print(f"{name}: {times[name]:.3f}s")
+        for module, seconds in slowest:
+            print(f"  {module:<40} {seconds:.3f}s")
@@ -0,0 +1,220 @@
+"""
+Test Storage Backends
+Runs the database operations of the scraper against the in-memory store, and
+against MongoDB when STORAGE_TEST_URI names one, so both give the same results
+
+    STORAGE_TEST_URI=mongodb://localhost:27017 python -m pytest test_storage.py
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.geocode import find_nearby, geo_point
+from utils.storage import (connect_database, BulkWriteError, DuplicateKeyError, GEOSPHERE,
+                           InsertOne, MONGODB_AVAILABLE, UpdateOne)
+
+MONGODB_TEST_URI = os.getenv('STORAGE_TEST_URI')
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+@pytest.fixture(params=['memory', 'mongodb'])
+def db(request):
+    """
+    Empty database on each backend; MongoDB only when STORAGE_TEST_URI is set.
+    """
+    name = f"storage-test-{uuid.uuid4().hex[:8]}"
+    if request.param == 'memory':
+        yield connect_database(f"memory://{name}")
+        return
+    
+    if not (MONGODB_TEST_URI and MONGODB_AVAILABLE):
+        pytest.skip("STORAGE_TEST_URI not set")
+    database = connect_database(MONGODB_TEST_URI, name)
+    yield database
+    database.client.drop_database(name)
+
+
+def make_event(event_hash, source='a', days=1, **fields):
+    """
+    Build a stored event document.
+    
+    Args:
+        event_hash (str): Event hash
+        source (str): Source name
+        days (int): Days from NOW to the event date
+    
+    Returns:
+        dict: Event document
+    """
+    return {'event_hash': event_hash, 'source': source, 'date': NOW + timedelta(days=days),
+            'is_active': True, 'title': f'Event {event_hash}', **fields}
+
+
+def test_upsert_with_set_on_insert(db):
+    """
+    An upsert inserts once; later ones match without changing the stored event.
+    """
+    events = db.events
+    
+    result = events.update_one({'event_hash': 'h1'}, {'$setOnInsert': make_event('h1')}, upsert=True)
+    assert result.upserted_id is not None and result.matched_count == 0
+    
+    result = events.update_one({'event_hash': 'h1'}, {'$setOnInsert': make_event('h1', title='Other')},
+                               upsert=True)
+    assert result.upserted_id is None
+    assert result.matched_count == 1 and result.modified_count == 0
+    assert events.find_one({'event_hash': 'h1'})['title'] == 'Event h1'
+    
+    # Counters start from the upsert's filter, as in crawl_state and run_backlog
+    for _ in range(2):
+        db.crawl_state.update_one({'_id': 'a'}, {'$inc': {'partial_runs': 1}, '$set': {'updated_at': NOW}},
+                                  upsert=True)
+    assert db.crawl_state.find_one({'_id': 'a'}) == {'_id': 'a', 'partial_runs': 2, 'updated_at': NOW}
+
+
+def test_bulk_write_counts(db):
+    """
+    bulk_write reports upserts, matches and modifications, and unordered
+    writes carry on past a duplicate key.
+    """
+    quarantine = db.quarantine
+    quarantine.create_index('event_hash', unique=True)
+    quarantine.insert_one({'event_hash': 'h1', 'rules': []})
+    
+    result = quarantine.bulk_write([
+        UpdateOne({'event_hash': 'h1'}, {'$set': {'rules': ['title']}}, upsert=True),
+        UpdateOne({'event_hash': 'h1'}, {'$set': {'rules': ['title']}}, upsert=True),
+        UpdateOne({'event_hash': 'h2'}, {'$set': {'rules': ['date']}}, upsert=True),
+    ], ordered=False)
+    assert (result.upserted_count, result.matched_count, result.modified_count) == (1, 2, 1)
+    
+    with pytest.raises(BulkWriteError) as error:
+        quarantine.bulk_write([
+            InsertOne({'event_hash': 'h2'}),
+            InsertOne({'event_hash': 'h3'}),
+        ], ordered=False)
+    details = error.value.details
+    assert [(e['index'], e['code']) for e in details['writeErrors']] == [(0, 11000)]
+    assert details['nInserted'] == 1
+    assert quarantine.count_documents({}) == 3
+
+
+def test_update_many_by_date(db):
+    """
+    Expired events are matched by date and deactivated in one update.
+    """
+    events = db.events
+    events.insert_many([make_event('h1', days=-2), make_event('h2', days=-1), make_event('h3', days=1),
+                        make_event('h4', days=-1, is_active=False), make_event('h5', date=None)])
+    
+    expired = {'date': {'$lt': NOW}, 'is_active': True}
+    result = events.update_many(expired, {'$set': {'is_active': False, 'last_updated': NOW}})
+    assert result.matched_count == result.modified_count == 2
+    assert sorted(events.distinct('event_hash', {'is_active': True})) == ['h3', 'h5']
+    
+    # Missed-run counts move by hash list, as in the vanished-event diff
+    result = events.update_many({'event_hash': {'$in': ['h3', 'h5', 'missing']}}, {'$inc': {'missed_runs': 1}})
+    assert result.modified_count == 2
+    assert events.count_documents({'missed_runs': {'$gte': 1}}) == 2
+
+
+def test_group_and_sort(db):
+    """
+    Per-source counts come from $group, and sorted, limited and projected finds
+    return the same documents in the same order.
+    """
+    events = db.events
+    events.insert_many([make_event('h1', 'a', 3), make_event('h2', 'b', 1), make_event('h3', 'a', 2),
+                        make_event('h4', 'c', 5, is_active=False), make_event('h5', 'a', 4)])
+    
+    counts = list(events.aggregate([
+        {'$match': {'is_active': True}},
+        {'$group': {'_id': '$source', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1}}
+    ]))
+    assert counts == [{'_id': 'a', 'count': 3}, {'_id': 'b', 'count': 1}]
+    
+    upcoming = list(events.find({'is_active': True}, {'_id': 0, 'event_hash': 1, 'date': 1})
+                    .sort('date', 1).limit(3))
+    assert [e['event_hash'] for e in upcoming] == ['h2', 'h3', 'h1']
+    assert set(upcoming[0]) == {'event_hash', 'date'}
+    
+    latest = events.find_one({'source': 'a'}, sort=[('date', -1)])
+    assert latest['event_hash'] == 'h5'
+    
+    # Missing values sort first, as in MongoDB
+    events.insert_one({'event_hash': 'h0', 'source': 'a'})
+    first = list(events.find({'source': 'a'}).sort([('date', 1), ('event_hash', 1)]).limit(1))
+    assert first[0]['event_hash'] == 'h0'
+
+
+def test_unique_index_rejects_duplicates(db):
+    """
+    A unique index rejects a second insert, and an update that would take a
+    value already held.
+    """
+    events = db.events
+    events.create_index('event_hash', unique=True)
+    events.insert_one(make_event('h1'))
+    events.insert_one(make_event('h2'))
+    
+    with pytest.raises(DuplicateKeyError):
+        events.insert_one(make_event('h1'))
+    with pytest.raises(DuplicateKeyError):
+        events.update_one({'event_hash': 'h2'}, {'$set': {'event_hash': 'h1'}})
+    
+    assert events.count_documents({}) == 2
+    assert events.find_one({'event_hash': 'h2'}) is not None
+
+
+def test_near_sphere(db):
+    """
+    Nearby queries return events within the radius, nearest first, and
+    combine with other conditions.
+    """
+    events = db.events
+    events.create_index([('geo', GEOSPHERE)])
+    events.insert_many([
+        make_event('quay', geo=geo_point(-33.8610, 151.2108)),
+        make_event('opera', geo=geo_point(-33.8568, 151.2153)),
+        make_event('bondi', geo=geo_point(-33.8908, 151.2743)),
+        make_event('parramatta', geo=geo_point(-33.8150, 151.0011)),
+        make_event('nowhere'),
+        make_event('rocks', geo=geo_point(-33.8599, 151.2090), is_active=False),
+    ])
+    
+    nearby = find_nearby(events, -33.8600, 151.2100, radius_km=10)
+    assert [e['event_hash'] for e in nearby] == ['rocks', 'quay', 'opera', 'bondi']
+    
+    nearby = find_nearby(events, -33.8600, 151.2100, radius_km=10, query={'is_active': True}, limit=2)
+    assert [e['event_hash'] for e in nearby] == ['quay', 'opera']
+
+
+def test_unsupported_operators_raise():
+    """
+    The in-memory store raises ValueError on operators it does not implement,
+    instead of silently matching nothing.
+    """
+    events = connect_database(f"memory://storage-test-{uuid.uuid4().hex[:8]}").events
+    events.insert_one(make_event('h1', tags=['music', 'free']))
+    
+    with pytest.raises(ValueError):
+        list(events.find({'tags': {'$size': 2}}))
+    with pytest.raises(ValueError):
+        events.update_one({'event_hash': 'h1'}, {'$pull': {'tags': 'free'}})
+    with pytest.raises(ValueError):
+        list(events.aggregate([{'$unwind': '$tags'}]))
+    with pytest.raises(ValueError):
+        events.update_one({'event_hash': 'h1'}, make_event('h1'))
+    with pytest.raises(ValueError):
+        list(events.find({'geo': {'$nearSphere': {'$geometry': geo_point(-33.86, 151.21)}}}))
+    
+    assert events.find_one({'event_hash': 'h1'})['tags'] == ['music', 'free']
@@ -0,0 +1,75 @@
+"""
+Test Text Normalization
+Checks the display form of scraped text, the title and location keys, and
+that hash keys give the same event hash as generate_event_hash()
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.deduplicate import generate_event_hash, hash_event_keys
+from utils.text_normalize import clean_text, hash_key, location_key, normalize_field, title_key
+
+
+@pytest.mark.parametrize('raw, display', [
+    ('  Jazz &amp; Blues\n\tNight  ', 'Jazz & Blues Night'),
+    ('Rock &#x26; Roll &quot;Live&quot;', 'Rock & Roll "Live"'),
+    ('ＳＹＤ Festival ①', 'SYD Festival 1'),
+    ('Cafe\u0301 Sydney', 'Café Sydney'),
+    ('Roof\u200btop\u00a0Ses\u00adsions\ufeff', 'Rooftop Sessions'),
+    ('', ''),
+    (None, ''),
+])
+def test_clean_text(raw, display):
+    """
+    Entities are decoded, text is NFKC-normalized, invisible characters are
+    dropped and whitespace of any kind is collapsed.
+    """
+    assert clean_text(raw) == display
+
+
+def test_title_key_drops_case_and_punctuation():
+    """
+    Titles differing only in case and punctuation share a key.
+    """
+    assert title_key("Jazz: Blues Night!") == title_key("jazz blues night") == 'jazz blues night'
+
+
+@pytest.mark.parametrize('location, key', [
+    ('123 George Street, Sydney NSW', '123 george st, syd nsw'),
+    ('5 Oxford Road, Australia', '5 oxford rd, aus'),
+    # Only whole words are abbreviated
+    ('Broadway Roadhouse', 'broadway roadhouse'),
+    ('Streetwise Avenues', 'streetwise avenues'),
+])
+def test_location_key_abbreviates_whole_words(location, key):
+    """
+    Street, road and the like are abbreviated, but not inside other words.
+    """
+    assert location_key(clean_text(location)) == key
+
+
+@pytest.mark.parametrize('title, location', [
+    ('  Jazz &amp; Blues\n\tNight  ', '123 George Street,\u00a0Sydney'),
+    ('ＳＹＤ Festival ①', 'Café  Sydney'),
+    ('Plain Title', 'The Rocks'),
+])
+def test_hash_keys_match_generate_event_hash(title, location):
+    """
+    The hash built from normalize_field()'s keys is the one
+    generate_event_hash() gives for the display fields, so events stored
+    before and after the keys were split out keep their hash.
+    """
+    date = datetime(2026, 3, 1, 20)
+    title_display, title_hash_key = normalize_field(title)
+    location_display, location_hash_key = normalize_field(location)
+    
+    assert title_hash_key == hash_key(title_display)
+    assert hash_event_keys(title_hash_key, date, location_hash_key) == \
+        generate_event_hash(title_display, date, location_display)
@@ -0,0 +1,86 @@
+"""
+Test Event Validation
+Checks that over-long fields are truncated the way the backend model counts
+them, and that events the model would reject are split off
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.validation import EventValidator, ELLIPSIS, truncate, utf16_length
+
+
+def make_event(**fields):
+    """
+    Build an event that passes EVENT_SCHEMA, with some fields replaced.
+    
+    Returns:
+        dict: Event
+    """
+    event = {
+        'title': 'Jazz Night',
+        'date': datetime(2026, 3, 1, 20, 0),
+        'location': 'The Basement, Circular Quay',
+        'description': 'Live jazz.',
+        'image_url': 'https://test.example/jazz.jpg',
+        'ticket_url': 'https://test.example/jazz',
+        'source': 'test.example',
+        'event_hash': 'h1'
+    }
+    event.update(fields)
+    return event
+
+
+def test_long_title_is_truncated_in_utf16_units():
+    """
+    A title over its maxlength is cut to at most maxlength UTF-16 code units,
+    ending in an ellipsis, and the event keeps its hash.
+    """
+    # Emoji count twice in JavaScript, so 150 of them are 300 code units
+    title = 'Party ' + '🎉' * 150
+    event = make_event(title=title)
+    
+    result = EventValidator().validate([event])
+    
+    assert result['valid'] == [event]
+    assert result['normalized'] == {'title:maxlength': 1}
+    assert event['title'].endswith(ELLIPSIS)
+    assert utf16_length(event['title']) <= 200
+    assert event['event_hash'] == 'h1'
+
+
+def test_truncate_never_splits_surrogate_pairs():
+    """
+    Cutting in the middle of a character outside the BMP drops the whole character.
+    """
+    text = 'a' + '🎉' * 10
+    
+    for limit in range(2, 12):
+        cut = truncate(text, limit)
+        assert utf16_length(cut) <= limit
+        assert cut.encode('utf-16-le').decode('utf-16-le') == cut
+        assert cut.endswith(ELLIPSIS)
+
+
+def test_invalid_events_are_rejected_and_optional_fields_cleared():
+    """
+    Missing required fields and bad ticket URLs reject an event; a bad image
+    URL is only cleared.
+    """
+    events = [
+        make_event(),
+        make_event(title='   ', event_hash='h2'),
+        make_event(ticket_url='not a url', event_hash='h3'),
+        make_event(image_url='/relative.jpg', event_hash='h4')
+    ]
+    
+    result = EventValidator().validate(events)
+    
+    assert [event['event_hash'] for event in result['valid']] == ['h1', 'h4']
+    assert result['valid'][1]['image_url'] == ''
+    assert result['rejections'] == {'title:required': 1, 'ticket_url:match': 1}
+    assert result['normalized'] == {'image_url:match': 1}
@@ -0,0 +1,202 @@
+"""
+Precomputed API Payloads
+Builds the JSON bodies of the hot events endpoints once per run, pre-compressed
+
+For each endpoint the exact body the backend would send is rendered, then
+stored as identity, gzip and (when the brotli package is installed) brotli
+files named after the content hash. A small manifest per endpoint points at
+the current files and carries the ETag, so the API can answer with static
+bytes or a 304 instead of querying and serializing on every request.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+# Endpoint name -> (Mongo filter builder, whether the payload expires with the first event)
+ENDPOINTS = {
+    'events': (lambda now: {'is_active': True}, False),
+    'upcoming': (lambda now: {'is_active': True, 'date': {'$gte': now}}, True),
+}
+
+
+def _utc_now():
+    """Current time as a naive UTC datetime, the way pymongo returns stored dates."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _js_date(value):
+    """Format a datetime like JavaScript's Date.prototype.toISOString."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime('%Y-%m-%dT%H:%M:%S') + f".{value.microsecond // 1000:03d}Z"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return _js_date(value)
+    # ObjectId and any other BSON scalar serialize as their string form
+    return str(value)
+
+
+def render_payload(events):
+    """
+    Render the response body of a list endpoint, byte for byte as Express
+    res.json would for the same documents.
+    
+    Args:
+        events (list): Documents in response order
+    
+    Returns:
+        bytes: UTF-8 JSON body
+    """
+    body = {'success': True, 'count': len(events), 'data': events}
+    return json.dumps(body, ensure_ascii=False, separators=(',', ':'),
+                      default=_json_default).encode('utf-8')
+
+
+def compute_etag(body):
+    """
+    Build a weak ETag from the identity body, valid for every encoding of it.
+    
+    Args:
+        body (bytes): Uncompressed body
+    
+    Returns:
+        str: ETag header value
+    """
+    return 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _atomic_write(path, data):
+    """Write a file via a temporary file and rename, so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_payload(cache_dir, name, events, expires_at=None):
+    """
+    Write one endpoint's payload in every encoding and swap its manifest.
+    
+    Args:
+        cache_dir (str): Shared payload directory
+        name (str): Endpoint name, e.g. 'events'
+        events (list): Documents in response order
+        expires_at (datetime, optional): Time (UTC) after which the payload is stale
+    
+    Returns:
+        dict: The manifest written
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    body = render_payload(events)
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    
+    variants = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if BROTLI_AVAILABLE:
+        variants['br'] = brotli.compress(body, quality=11)
+    
+    suffixes = {'identity': '.json', 'gzip': '.json.gz', 'br': '.json.br'}
+    files = {}
+    for encoding, data in variants.items():
+        filename = f"{name}-{digest}{suffixes[encoding]}"
+        path = os.path.join(cache_dir, filename)
+        # Same content hash means the file already holds these bytes
+        if not os.path.exists(path):
+            _atomic_write(path, data)
+        files[encoding] = {'file': filename, 'length': len(data)}
+    
+    manifest = {
+        'etag': compute_etag(body),
+        'count': len(events),
+        'generated_at': _js_date(_utc_now()),
+        'expires_at': _js_date(expires_at) if expires_at else None,
+        'files': files
+    }
+    
+    # The manifest goes last, so it only ever points at complete files
+    _atomic_write(os.path.join(cache_dir, f"{name}.meta.json"), json.dumps(manifest, indent=2).encode('utf-8'))
+    _remove_unreferenced(cache_dir, name, {entry['file'] for entry in files.values()})
+    
+    return manifest
+
+
+def _remove_unreferenced(cache_dir, name, keep):
+    """Delete earlier payload files of an endpoint."""
+    prefix = f"{name}-"
+    for filename in os.listdir(cache_dir):
+        if filename.startswith(prefix) and '.json' in filename and filename not in keep:
+            try:
+                os.remove(os.path.join(cache_dir, filename))
+            except OSError:
+                pass
+
+
+def publish_api_payloads(db, cache_dir=None):
+    """
+    Render and publish the payloads of all precomputed endpoints.
+    
+    Args:
+        db: MongoDB database
+        cache_dir (str, optional): Shared payload directory; API_CACHE_DIR if omitted
+    
+    Returns:
+        dict: Manifest per endpoint, empty when publishing is disabled
+    """
+    cache_dir = cache_dir or os.getenv('API_CACHE_DIR')
+    if not cache_dir or db is None:
+        return {}
+    
+    # The backend compares against new Date(), which is UTC
+    now = _utc_now()
+    manifests = {}
+    
+    for name, (build_filter, expires) in ENDPOINTS.items():
+        # Same filter and sort as Event.getActiveEvents / Event.getUpcomingEvents
+        events = list(db.events.find(build_filter(now)).sort('date', 1))
+        
+        # An upcoming list is exact only until its first event starts
+        expires_at = events[0]['date'] if expires and events else None
+        manifests[name] = write_payload(cache_dir, name, events, expires_at)
+    
+    return manifests
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import shutil
+    from datetime import timedelta
+    
+    directory = tempfile.mkdtemp()
+    events = [
+        {'_id': 'a1', 'title': 'Vivid Sydney', 'date': datetime(2026, 5, 23, 8, 0), 'source': 'demo'},
+        {'_id': 'a2', 'title': 'Jazz Night', 'date': datetime(2026, 6, 1, 10, 30), 'source': 'demo'},
+    ]
+    
+    manifest = write_payload(directory, 'events', events, expires_at=_utc_now() + timedelta(hours=1))
+    print(f"Brotli available: {BROTLI_AVAILABLE}")
+    print(json.dumps(manifest, indent=2))
+    with open(os.path.join(directory, manifest['files']['identity']['file']), 'rb') as f:
+        print(f.read().decode('utf-8'))
+    
+    shutil.rmtree(directory)
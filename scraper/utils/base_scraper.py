@@ -8,6 +8,22 @@ from bs4 import BeautifulSoup
 from datetime import datetime
 import time
 import random
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.event_record import Event
+from utils.page_archive import RecordingAdapter, ArchiveReplayAdapter
+from utils.frontier import CrawlFrontier, LISTING, PAGINATION
+from utils.host_control import HOSTS
+from utils.fetch_cache import RESPONSES, FLIGHTS, SHARED_ADAPTER, fetch_key
+from utils.deduplicate import add_hash_to_event, hash_event_keys
+from utils.text_normalize import clean_text, normalize_field
+from utils.deadline import Deadline
+from utils.checkpoint import CRAWL_CHECKPOINT_PAGES
+from utils.metrics import STAGE_SECONDS, PAGES_FETCHED, BYTES_FETCHED, FETCH_RETRIES, FETCH_FAILURES, CACHE_HITS
 
 
 class BaseScraper:
@@ -16,6 +32,13 @@ class BaseScraper:
     Provides common methods for HTTP requests, parsing, and error handling.
     """
     
+    # Sources that implement parse_detail() set this so their events get refreshed
+    has_detail_pages = False
+    
+    # Crawl budgets for sources that paginate with crawl()
+    max_crawl_depth = 20
+    max_crawl_pages = 50
+    
     def __init__(self, source_name, base_url):
         """
         Initialize the scraper.
@@ -27,6 +50,9 @@ class BaseScraper:
         self.source_name = source_name
         self.base_url = base_url
         self.session = requests.Session()
+        # Connection pools are per host and shared with every other scraper
+        self.session.mount('http://', SHARED_ADAPTER)
+        self.session.mount('https://', SHARED_ADAPTER)
         
         # Set user agent to avoid being blocked
         self.session.headers.update({
@@ -35,26 +61,115 @@ class BaseScraper:
         
         self.events = []
         self.errors = []
+        
+        # Raw page archiving (see utils.page_archive), off unless a runner sets it
+        self.archive = None
+        self.run_id = None
+        # Serving pages from a local transport: no politeness or retry delays
+        self.replaying = False
+        
+        # Seconds to wait after each page (random in range) and before each retry
+        self.politeness_delay = (0.5, 1.5)
+        self.retry_delay = 1
+        
+        # Hashes of events already stored for this source; set by the runner
+        # for incremental crawls, which stop paginating at already-known pages
+        self.known_hashes = None
+        # False once a crawl stopped before visiting every page it found
+        self.crawl_complete = True
+        self.crawl_stats = {}
+        # Run checkpoint (see utils.checkpoint); crawls save their frontier to it every few pages
+        self.checkpoint = None
+        
+        # Run deadline (see utils.deadline): no new page is fetched once it expires
+        self.deadline = Deadline()
+        # Pages the last run left unfetched, queued ahead of this crawl's own pages
+        self.backlog_pages = []
+        # Pages this crawl left unfetched when the deadline expired
+        self.skipped_pages = []
+        # URLs not fetched because the deadline expired, or would have while waiting for their host
+        self.skipped_urls = set()
+        # Pages this crawl failed to fetch for a reason that may pass (server or
+        # network errors, an open circuit), retried first by the next run
+        self.failed_pages = []
+        # URLs whose last fetch failed that way
+        self.failed_urls = set()
     
-    def fetch_page(self, url, retries=3, delay=1):
+    def fetch_page(self, url, retries=3, delay=None):
         """
         Fetch a webpage with retry logic.
+        Pages already fetched this run by any scraper come from the shared
+        response cache, and concurrent requests for the same page share one
+        fetch (see utils.fetch_cache).
         
         Args:
             url (str): URL to fetch
             retries (int): Number of retries on failure
-            delay (int): Delay between retries in seconds
+            delay (int): Delay between retries in seconds (self.retry_delay if omitted)
             
         Returns:
             Response object or None on failure
         """
+        key = fetch_key(url)
+        response = RESPONSES.get(key)
+        if response is not None:
+            CACHE_HITS.inc(cache='response', source=self.source_name)
+            return response
+        
+        response, shared = FLIGHTS.do(key, lambda: self._fetch_page(url, retries, delay))
+        if shared:
+            CACHE_HITS.inc(cache='coalesced', source=self.source_name)
+        elif response is not None:
+            RESPONSES.put(key, response)
+        return response
+    
+    def _fetch_page(self, url, retries, delay):
+        """
+        Fetch a webpage from the network with retry logic.
+        Requests to a host share its adaptive concurrency limit, Retry-After
+        backoff and circuit breaker (see utils.host_control).
+        """
+        if delay is None:
+            delay = self.retry_delay
+        
         for attempt in range(retries):
+            if self.deadline.expired():
+                print(f"[SKIP] Time budget reached, not fetching {url}")
+                self.skipped_urls.add(url)
+                return None
+            
+            # Waits for a free slot on the host and for any Retry-After it sent, but not past the deadline
+            host = HOSTS.get(url)
+            if not host.acquire(wait=not self.replaying, timeout=self.deadline.remaining()):
+                if host.circuit_closed():
+                    print(f"[SKIP] Time budget reached waiting for {host.name}, not fetching {url}")
+                    self.skipped_urls.add(url)
+                    return None
+                error_msg = f"Circuit open for {host.name}, skipped {url}"
+                self.errors.append(error_msg)
+                FETCH_FAILURES.inc(source=self.source_name)
+                self.failed_urls.add(url)
+                return None
+            
             try:
-                response = self.session.get(url, timeout=10)
+                response = None
+                started = time.perf_counter()
+                try:
+                    with STAGE_SECONDS.time(stage='fetch', source=self.source_name):
+                        response = self.session.get(url, timeout=self.deadline.timeout(10))
+                finally:
+                    host.release(response, time.perf_counter() - started)
                 response.raise_for_status()
                 
+                PAGES_FETCHED.inc(source=self.source_name)
+                BYTES_FETCHED.inc(len(response.content), source=self.source_name)
+                
+                if self.archive is not None:
+                    self.archive.record(self.run_id, self.source_name, response)
+                
                 # Random delay to be polite
-                time.sleep(random.uniform(0.5, 1.5))
+                if self.politeness_delay and not self.replaying:
+                    time.sleep(random.uniform(*self.politeness_delay))
                 
                 return response
                 
@@ -64,10 +179,52 @@ class BaseScraper:
                 self.errors.append(error_msg)
                 
                 if attempt < retries - 1:
-                    time.sleep(delay * (attempt + 1))
+                    FETCH_RETRIES.inc(source=self.source_name)
+                    if not self.replaying:
+                        time.sleep(self.deadline.timeout(delay * (attempt + 1)))
                 else:
+                    FETCH_FAILURES.inc(source=self.source_name)
+                    # A page that is gone stays gone; server and network errors may pass
+                    status = getattr(e.response, 'status_code', None)
+                    if status is None or status >= 500 or status == 429:
+                        self.failed_urls.add(url)
                     return None
     
+    def use_transport(self, adapter, replaying=True):
+        """
+        Route this scraper's HTTP requests through a requests transport adapter,
+        e.g. to replay an archived run.
+        
+        Args:
+            adapter: requests.adapters.BaseAdapter serving the requests
+            replaying (bool): Skip politeness and retry delays
+        """
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.replaying = replaying
+        # Proxy and netrc lookups scan the environment on every request
+        self.session.trust_env = False
+    
+    def record_fixtures(self, archive, run_id):
+        """
+        Record every HTTP exchange of this scraper as a replayable archive run.
+        
+        Args:
+            archive (PageArchive): Archive to record into
+            run_id (str): Fixture run id
+        """
+        self.use_transport(RecordingAdapter(archive, run_id, source=self.source_name), replaying=False)
+    
+    def replay_fixtures(self, archive, run_id):
+        """
+        Serve this scraper's HTTP requests from a recorded archive run.
+        
+        Args:
+            archive (PageArchive): Archive holding the run
+            run_id (str): Fixture run id, or 'latest'
+        """
+        self.use_transport(ArchiveReplayAdapter(archive, run_id))
+    
     def parse_html(self, html_content):
         """
         Parse HTML content using BeautifulSoup.
@@ -78,7 +235,8 @@ class BaseScraper:
         Returns:
             BeautifulSoup object
         """
-        return BeautifulSoup(html_content, 'lxml')
+        with STAGE_SECONDS.time(stage='parse', source=self.source_name):
+            return BeautifulSoup(html_content, 'lxml')
     
     def extract_text(self, element):
         """
@@ -111,7 +269,8 @@ class BaseScraper:
     
     def clean_text(self, text):
         """
-        Clean and normalize text content.
+        Clean and normalize text content: HTML entities decoded, Unicode
+        NFKC-normalized and whitespace collapsed (see utils.text_normalize).
         
         Args:
             text (str): Text to clean
@@ -119,16 +278,7 @@ class BaseScraper:
         Returns:
             str: Cleaned text
         """
-        if not text:
-            return ""
-        
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        
-        # Remove special characters that might cause issues
-        text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-        
-        return text.strip()
+        return clean_text(text)
     
     def make_absolute_url(self, relative_url):
         """
@@ -152,7 +302,7 @@ class BaseScraper:
     
     def create_event(self, title, date, location, description, image_url, ticket_url):
         """
-        Create a standardized event dictionary.
+        Create a standardized event record.
         
         Args:
             title (str): Event title
@@ -163,19 +313,169 @@ class BaseScraper:
             ticket_url (str): Ticket purchase URL
             
         Returns:
-            dict: Standardized event dictionary
+            Event: Standardized event record (supports dict-style access)
         """
-        return {
-            'title': self.clean_text(title),
-            'date': date,
-            'location': self.clean_text(location),
-            'description': self.clean_text(description),
-            'image_url': self.make_absolute_url(image_url) if image_url else "",
-            'ticket_url': self.make_absolute_url(ticket_url) if ticket_url else "",
-            'source': self.source_name,
-            'is_active': True,
-            'last_updated': datetime.now()
-        }
+        # Title and location are keyed for the event hash as they are cleaned
+        title, title_key = normalize_field(title)
+        location, location_key = normalize_field(location)
+        
+        event = Event(
+            title=title,
+            date=date,
+            location=location,
+            description=self.clean_text(description),
+            image_url=self.make_absolute_url(image_url) if image_url else "",
+            ticket_url=self.make_absolute_url(ticket_url) if ticket_url else "",
+            source=self.source_name,
+            is_active=True,
+            last_updated=datetime.now()
+        )
+        event['event_hash'] = hash_event_keys(title_key, date, location_key)
+        return event
+    
+    def parse_detail(self, soup, event):
+        """
+        Extract up-to-date fields from an event's detail page.
+        Sources with detail pages override this; the default has nothing to refresh.
+        
+        Args:
+            soup: BeautifulSoup object of the detail page
+            event (dict): Stored event the page belongs to
+        
+        Returns:
+            dict: Refreshed field values, or None if nothing could be extracted
+        """
+        return None
+    
+    def parse_listing(self, soup, url):
+        """
+        Extract events and onward links from a listing page.
+        Sources that paginate with crawl() override this.
+        
+        Args:
+            soup: BeautifulSoup object of the page
+            url (str): URL of the page
+        
+        Returns:
+            tuple: (events, links) where links are (url, kind) pairs, kind being
+                   frontier.PAGINATION or frontier.LISTING
+        """
+        raise NotImplementedError("Subclasses that crawl must implement parse_listing()")
+    
+    def crawl(self, start_urls):
+        """
+        Crawl listing pages and their pagination through a crawl frontier.
+        
+        Pages are fetched once per canonical URL, within max_crawl_depth and
+        max_crawl_pages. When known_hashes is set, a pagination chain stops at
+        the first page whose events are all known: listings put new events
+        first, so the pages after it hold nothing new. With a checkpoint set,
+        the frontier is saved every CRAWL_CHECKPOINT_PAGES pages and an
+        interrupted crawl resumes from it. Once the deadline expires the
+        crawl stops, leaving its queued pages in skipped_pages; pages whose
+        fetch failed with a server or network error are left in failed_pages.
+        Either makes the crawl incomplete, and backlog_pages, the pages a
+        run left for the next, are queued ahead of the start pages.
+        
+        Args:
+            start_urls (list): Listing page URLs, relative or absolute
+        
+        Returns:
+            list: Events found, also added to self.events
+        """
+        frontier = CrawlFrontier(self.max_crawl_depth, self.max_crawl_pages)
+        found = []
+        stopped_early = False
+        
+        self.failed_pages = []
+        
+        # Pick up where an interrupted run of this crawl left off
+        saved = self.checkpoint.crawl_state(self.source_name) if self.checkpoint is not None else None
+        if saved is not None:
+            frontier.restore(saved['frontier'])
+            found = saved['events']
+            stopped_early = saved['stopped_early']
+            self.failed_pages = saved.get('failed_pages', [])
+            for event in found:
+                self.add_event(event)
+            print(f"[OK] Resuming crawl of {self.source_name}: {len(found)} events, {len(frontier)} pages queued")
+        else:
+            # Pages skipped by the last run go first
+            for url, _, depth in self.backlog_pages:
+                frontier.add(url, LISTING, depth)
+            for url in start_urls:
+                frontier.add(self.make_absolute_url(url), LISTING, 0)
+        
+        self.skipped_pages = []
+        unsaved_pages = 0
+        while True:
+            if self.deadline.expired():
+                self.skipped_pages += frontier.pending()
+                print(f"[SKIP] Time budget reached: {self.source_name} stops with "
+                      f"{len(self.skipped_pages)} pages left")
+                break
+            
+            item = frontier.pop()
+            if item is None:
+                break
+            url, kind, depth = item
+            
+            response = self.fetch_page(url)
+            if response is None:
+                # Left for the next run, like the pages still queued
+                if url in self.skipped_urls:
+                    self.skipped_pages.append([url, kind, depth])
+                elif url in self.failed_urls:
+                    self.failed_pages.append([url, kind, depth])
+                continue
+            
+            events, links = self.parse_listing(self.parse_html(response.text), url)
+            events = [event if event.get('event_hash') else add_hash_to_event(event) for event in events]
+            for event in events:
+                self.add_event(event)
+            found.extend(events)
+            
+            # Everything on this page is known: the rest of its pagination is too
+            all_known = self.known_hashes is not None and events and \
+                all(event['event_hash'] in self.known_hashes for event in events)
+            if all_known:
+                stopped_early = stopped_early or any(k == PAGINATION for _, k in links)
+            
+            for link, link_kind in links:
+                if not (all_known and link_kind == PAGINATION):
+                    frontier.add(self.make_absolute_url(link), link_kind, depth + 1)
+            
+            unsaved_pages += 1
+            if self.checkpoint is not None and unsaved_pages >= CRAWL_CHECKPOINT_PAGES:
+                self.checkpoint.save_crawl(self.source_name, frontier.get_state(), found, stopped_early,
+                                           self.failed_pages)
+                unsaved_pages = 0
+        
+        self.crawl_stats = dict(frontier.stats, stopped_early=stopped_early, skipped=len(self.skipped_pages),
+                                failed=len(self.failed_pages))
+        # Events on pages not fetched are not gone, so the run diff must not take this listing as whole
+        self.crawl_complete = frontier.exhausted and not stopped_early and not self.skipped_pages \
+            and not self.failed_pages
+        return found
+    
+    def fetch_event_detail(self, event):
+        """
+        Fetch and parse the detail page of a stored event.
+        
+        Args:
+            event (dict): Stored event with a ticket_url
+        
+        Returns:
+            dict: Refreshed field values, or None on failure
+        """
+        if not self.has_detail_pages or not event.get('ticket_url'):
+            return None
+        
+        response = self.fetch_page(event['ticket_url'])
+        if not response:
+            return None
+        
+        return self.parse_detail(self.parse_html(response.text), event)
     
     def add_event(self, event):
         """
@@ -196,6 +496,35 @@ class BaseScraper:
         """
         raise NotImplementedError("Subclasses must implement scrape() method")
     
+    def check_health(self, timeout=10):
+        """
+        Check that the source's site answers, without scraping it.
+        
+        Args:
+            timeout (float): Seconds to wait for the response
+        
+        Returns:
+            dict: Source, whether it is healthy, HTTP status, seconds taken and any error
+        """
+        status = None
+        error = None
+        started = time.perf_counter()
+        try:
+            response = self.session.get(self.base_url, timeout=timeout)
+            status = response.status_code
+            if not response.ok:
+                error = f"HTTP {status} {response.reason}"
+        except requests.exceptions.RequestException as e:
+            error = str(e)
+        
+        return {
+            'source': self.source_name,
+            'ok': error is None,
+            'status': status,
+            'seconds': round(time.perf_counter() - started, 3),
+            'error': error
+        }
+    
     def get_events(self):
         """
         Get the scraped events.
@@ -0,0 +1,121 @@
+"""
+Catalog Version
+Monotonic version document that changes only when the active event set does
+"""
+
+import hashlib
+from datetime import datetime
+
+from utils.storage import ReturnDocument
+
+
+VERSION_COLLECTION = 'catalog_version'
+VERSION_ID = 'events'
+
+CHANGE_KINDS = ('inserted', 'updated', 'deactivated')
+
+
+def count_change(changes, source, kind, amount=1):
+    """
+    Add to a per-source change count.
+    
+    Args:
+        changes (dict): Mapping of source name to {'inserted', 'updated', 'deactivated'} counts
+        source (str): Event source
+        kind (str): One of CHANGE_KINDS
+        amount (int): Number of events
+    """
+    if not amount:
+        return
+    counts = changes.setdefault(source, dict.fromkeys(CHANGE_KINDS, 0))
+    counts[kind] += amount
+
+
+def total_changes(changes):
+    """
+    Count all changes across sources.
+    
+    Args:
+        changes (dict): Mapping of source name to {'inserted', 'updated', 'deactivated'} counts
+    
+    Returns:
+        int: Total number of changed events
+    """
+    return sum(sum(counts.values()) for counts in changes.values())
+
+
+def active_set_digest(events_collection):
+    """
+    Digest the hashes of all active events, in hash order.
+    
+    Args:
+        events_collection: MongoDB events collection
+    
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    cursor = events_collection.find(
+        {'is_active': True}, {'_id': 0, 'event_hash': 1}
+    ).sort('event_hash', 1)
+    
+    for event in cursor:
+        digest.update((event.get('event_hash') or '').encode('ascii'))
+        digest.update(b'\n')
+    
+    return digest.hexdigest()
+
+
+def get_catalog_version(db):
+    """
+    Read the current catalog version with one point read.
+    
+    Args:
+        db: MongoDB database
+    
+    Returns:
+        dict: Version document, or None before the first bump
+    """
+    return db[VERSION_COLLECTION].find_one({'_id': VERSION_ID})
+
+
+def bump_catalog_version(db, changes):
+    """
+    Bump the catalog version if anything changed.
+    
+    Args:
+        db: MongoDB database
+        changes (dict): Per-source change counts of this run
+    
+    Returns:
+        dict: Version document after the call (unchanged when there were no changes)
+    """
+    if not total_changes(changes):
+        return get_catalog_version(db)
+    
+    return db[VERSION_COLLECTION].find_one_and_update(
+        {'_id': VERSION_ID},
+        {
+            '$inc': {'version': 1},
+            '$set': {
+                'active_digest': active_set_digest(db.events),
+                'changes': changes,
+                'updated_at': datetime.now()
+            }
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    changes = {}
+    count_change(changes, 'timeout.com/sydney', 'inserted', 3)
+    count_change(changes, 'timeout.com/sydney', 'updated')
+    count_change(changes, 'eventbrite.com.au/sydney', 'deactivated', 2)
+    count_change(changes, 'eventbrite.com.au/sydney', 'inserted', 0)
+    
+    print(f"Changes: {changes}")
+    print(f"Total: {total_changes(changes)}")
+    print(f"Empty run total: {total_changes({})}")
@@ -0,0 +1,385 @@
+"""
+Run Checkpoints
+Durable progress of a scraper run on local disk, so that a run interrupted by
+a crash or a restart resumes under the same run id instead of starting over
+
+A checkpoint is a directory per run:
+
+    run.json          sources scraped so far, the crawl frontier of a source
+                      whose crawl was cut off part-way, and the pipeline stages
+                      after the database write that already ran
+    events-N.jsonl    events of the Nth source, written once when it finishes
+    crawl-N.jsonl     events its crawl found so far, appended as pages are crawled
+    saved.jsonl       journal of database writes: each batch about to be written,
+                      then its hashes and the run's change counts once it was
+
+Only run.json, which holds no events, is replaced on update; events and saved
+hashes are appended, so a checkpoint costs the same late in a long run as at
+its start. A record that a crash cut short is dropped when the run resumes.
+
+Database writes are upserts keyed by event_hash, so events written after the
+last checkpoint and written again on resume are not duplicated.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.event_record import Event, to_document
+
+
+DEFAULT_CHECKPOINT_DIR = 'checkpoints'
+
+# Events written to the database between checkpoints
+CHECKPOINT_EVERY = int(os.getenv('CHECKPOINT_EVERY', 100))
+
+# Listing pages crawled between checkpoints of a crawl
+CRAWL_CHECKPOINT_PAGES = int(os.getenv('CRAWL_CHECKPOINT_PAGES', 10))
+
+RUN_FILE = 'run.json'
+JOURNAL_FILE = 'saved.jsonl'
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'$date': value.isoformat()}
+    # ObjectIds and anything else pymongo may have added
+    return str(value)
+
+
+def _decode(obj):
+    if len(obj) == 1 and '$date' in obj:
+        return datetime.fromisoformat(obj['$date'])
+    return obj
+
+
+def _dumps(value):
+    return json.dumps(value, default=_encode, separators=(',', ':'))
+
+
+def _replace(path, data):
+    """Write a file atomically: readers see the old or the new content, never part."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _append(path, records):
+    """
+    Append records to a JSON lines file and flush them to disk.
+    
+    Returns:
+        int: Bytes appended
+    """
+    data = ''.join(_dumps(record) + '\n' for record in records).encode('utf-8')
+    if data:
+        with open(path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    return len(data)
+
+
+def _read_lines(path, limit=None):
+    """
+    Read a JSON lines file up to its last complete record, and cut off what
+    follows it, such as a record a crash left half-written, so that later
+    appends start on a fresh line.
+    
+    Args:
+        path (str): File path
+        limit (int, optional): Records to read; any after them are cut off too
+    
+    Returns:
+        list: Records, empty if the file does not exist
+    """
+    records = []
+    end = 0
+    try:
+        with open(path, 'rb') as f:
+            for line in f:
+                if len(records) == limit or not line.endswith(b'\n'):
+                    break
+                try:
+                    records.append(json.loads(line, object_hook=_decode))
+                except ValueError:
+                    break
+                end += len(line)
+    except FileNotFoundError:
+        return records
+    
+    if os.path.getsize(path) > end:
+        os.truncate(path, end)
+    return records
+
+
+def encode_events(events):
+    """
+    Convert events to JSON-safe documents.
+    
+    Args:
+        events (list): Events or event dictionaries
+    
+    Returns:
+        list: Documents
+    """
+    return [dict(to_document(event)) for event in events]
+
+
+def decode_events(documents):
+    """
+    Rebuild events from checkpointed documents.
+    
+    Args:
+        documents (list): Documents from encode_events()
+    
+    Returns:
+        list: Event records
+    """
+    return [Event.from_dict(doc) for doc in documents]
+
+
+def find_unfinished_run(directory=None):
+    """
+    Find the newest run that left a checkpoint behind.
+    
+    Args:
+        directory (str, optional): Checkpoint directory; CHECKPOINT_DIR if omitted
+    
+    Returns:
+        str: Run id, or None if every run finished
+    """
+    directory = directory or os.getenv('CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR)
+    if not os.path.isdir(directory):
+        return None
+    
+    runs = sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+    return runs[-1] if runs else None
+
+
+class RunCheckpoint:
+    """
+    Checkpoint directory of one run. Events and saved hashes are only ever
+    appended or written once; the small run state is replaced atomically.
+    """
+    
+    def __init__(self, run_id, directory=None):
+        """
+        Open the checkpoint of a run, loading it if the run was interrupted before.
+        
+        Args:
+            run_id (str): Run id
+            directory (str, optional): Checkpoint directory; CHECKPOINT_DIR if omitted
+        """
+        self.run_id = run_id
+        self.directory = directory or os.getenv('CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR)
+        self.path = os.path.join(self.directory, run_id)
+        
+        self.resumed = os.path.isdir(self.path)
+        
+        try:
+            with open(self._file(RUN_FILE), encoding='utf-8') as f:
+                self.state = json.load(f, object_hook=_decode)
+        except FileNotFoundError:
+            self.state = {'run_id': run_id, 'sources': {}, 'stages': []}
+        
+        # Crawl events appended after run.json was last written are not counted
+        for entry in self.state['sources'].values():
+            if 'crawl' not in entry:
+                continue
+            crawl_file = self._file(f"crawl-{entry['number']}.jsonl")
+            if os.path.exists(crawl_file) and os.path.getsize(crawl_file) > entry['crawl']['bytes']:
+                os.truncate(crawl_file, entry['crawl']['bytes'])
+        
+        # Replay the journal of database writes
+        self.changes = {}
+        self._saved = set()
+        self._pending = set()
+        for record in _read_lines(self._file(JOURNAL_FILE)):
+            if 'pending' in record:
+                self._pending = set(record['pending'])
+            else:
+                self._saved.update(record['saved'])
+                self.changes = record['changes']
+                self._pending = set()
+    
+    def _file(self, name):
+        return os.path.join(self.path, name)
+    
+    def _entry(self, source):
+        """Run state of a source, numbering it the first time it is seen."""
+        sources = self.state['sources']
+        if source not in sources:
+            os.makedirs(self.path, exist_ok=True)
+            sources[source] = {'number': len(sources)}
+        return sources[source]
+    
+    def _write(self):
+        self.state['updated_at'] = datetime.now()
+        os.makedirs(self.path, exist_ok=True)
+        _replace(self._file(RUN_FILE), _dumps(self.state).encode('utf-8'))
+    
+    def source_done(self, source):
+        """True if the source was scraped completely before the interruption."""
+        return self.state['sources'].get(source, {}).get('done', False)
+    
+    def source_events(self, source):
+        """
+        Get the events a finished source produced.
+        
+        Returns:
+            tuple: (events, crawl_complete)
+        """
+        entry = self.state['sources'][source]
+        documents = _read_lines(self._file(f"events-{entry['number']}.jsonl"), entry['events'])
+        return decode_events(documents), entry.get('crawl_complete', True)
+    
+    def finish_source(self, source, events, crawl_complete=True):
+        """
+        Record that a source was scraped, with its events.
+        
+        Args:
+            source (str): Source name
+            events (list): Events the source produced
+            crawl_complete (bool): Whether the crawl visited every page it found
+        """
+        entry = self._entry(source)
+        data = ''.join(_dumps(doc) + '\n' for doc in encode_events(events)).encode('utf-8')
+        _replace(self._file(f"events-{entry['number']}.jsonl"), data)
+        
+        entry.pop('crawl', None)
+        entry.update(done=True, events=len(events), crawl_complete=crawl_complete)
+        self._write()
+        
+        # The crawl's progress is superseded by the source's events
+        crawl_file = self._file(f"crawl-{entry['number']}.jsonl")
+        if os.path.exists(crawl_file):
+            os.remove(crawl_file)
+    
+    def crawl_state(self, source):
+        """
+        Get the saved state of a crawl that was cut off.
+        
+        Returns:
+            dict: Frontier state, events found and flags, or None
+        """
+        entry = self.state['sources'].get(source, {})
+        crawl = entry.get('crawl')
+        if crawl is None:
+            return None
+        documents = _read_lines(self._file(f"crawl-{entry['number']}.jsonl"), crawl['events'])
+        return dict(crawl, events=decode_events(documents))
+    
+    def save_crawl(self, source, frontier_state, events, stopped_early, failed_pages=()):
+        """
+        Record crawl progress.
+        
+        Args:
+            source (str): Source name
+            frontier_state (dict): CrawlFrontier.get_state()
+            events (list): Events found so far
+            stopped_early (bool): Whether pagination was already cut short
+            failed_pages (list): [url, kind, depth] of pages whose fetch failed
+        """
+        entry = self._entry(source)
+        crawl = entry.get('crawl', {'events': 0, 'bytes': 0})
+        # A crawl only adds events: those saved before are not written again
+        appended = _append(self._file(f"crawl-{entry['number']}.jsonl"), encode_events(events[crawl['events']:]))
+        entry['crawl'] = {
+            'frontier': frontier_state,
+            'events': len(events),
+            'bytes': crawl['bytes'] + appended,
+            'stopped_early': stopped_early,
+            'failed_pages': list(failed_pages)
+        }
+        self._write()
+    
+    def begin_batch(self, event_hashes):
+        """
+        Record the events about to be written, before writing them.
+        
+        Args:
+            event_hashes (list): Hashes of the events in the batch
+        """
+        os.makedirs(self.path, exist_ok=True)
+        _append(self._file(JOURNAL_FILE), [{'pending': list(event_hashes)}])
+        self._pending = set(event_hashes)
+    
+    def pending_hashes(self):
+        """
+        Get the batch that was being written when the run was interrupted.
+        Some of its events may be stored already, so their changes went unrecorded.
+        
+        Returns:
+            set: Event hashes
+        """
+        return set(self._pending)
+    
+    def is_saved(self, event_hash):
+        """True if the event was written to the database before the interruption."""
+        return event_hash in self._saved
+    
+    def mark_saved(self, event_hashes, changes):
+        """
+        Record events written to the database.
+        
+        Args:
+            event_hashes (list): Hashes of the events written since the last call
+            changes (dict): Change counts of the run so far
+        """
+        event_hashes = list(event_hashes)
+        os.makedirs(self.path, exist_ok=True)
+        _append(self._file(JOURNAL_FILE), [{'saved': event_hashes, 'changes': changes}])
+        self._saved.update(event_hashes)
+        self.changes = changes
+        self._pending = set()
+    
+    def stage_done(self, stage):
+        """True if the stage already ran."""
+        return stage in self.state['stages']
+    
+    def finish_stage(self, stage):
+        """Record that a stage ran."""
+        self.state['stages'].append(stage)
+        self._write()
+    
+    def complete(self):
+        """Remove the checkpoint of a finished run."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        event = Event('Jazz Night', datetime(2026, 3, 1, 20), 'The Basement', 'Live jazz',
+                      '', 'https://example.com/jazz', 'example.com')
+        
+        checkpoint = RunCheckpoint('20260301-061500-1', directory)
+        checkpoint.finish_source('example.com', [event])
+        checkpoint.mark_saved([event['event_hash']], {'example.com': {'inserted': 1}})
+        
+        resumed = RunCheckpoint('20260301-061500-1', directory)
+        events, _ = resumed.source_events('example.com')
+        print(f"Resumed: {resumed.resumed}, unfinished run: {find_unfinished_run(directory)}")
+        print(f"Restored: {events[0]!r}, hash matches: {events[0]['event_hash'] == event['event_hash']}")
+        print(f"Already saved: {resumed.is_saved(event['event_hash'])}")
+        resumed.complete()
+        print(f"Unfinished after completion: {find_unfinished_run(directory)}")
+    finally:
+        shutil.rmtree(directory)
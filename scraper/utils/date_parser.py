@@ -6,6 +6,13 @@ Handles parsing and normalization of dates from various event websites
 from dateutil import parser
 from datetime import datetime, timedelta
 import re
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import STAGE_SECONDS
 
 
 def parse_event_date(date_string):
@@ -26,7 +33,8 @@ def parse_event_date(date_string):
         date_string = date_string.strip()
         
         # Try using dateutil parser first (handles most formats)
-        parsed_date = parser.parse(date_string, fuzzy=True)
+        with STAGE_SECONDS.time(stage='date_parse'):
+            parsed_date = parser.parse(date_string, fuzzy=True)
         return parsed_date
         
     except (ValueError, TypeError) as e:
@@ -0,0 +1,133 @@
+"""
+Run Deadline
+Time budget of a scraper run, passed down to its fetch, parse and write stages
+
+As the deadline approaches, stages stop taking new work: no new source is
+started, crawls stop popping pages, detail and refresh fetches are skipped.
+The last part of the budget is kept in reserve so that everything already
+parsed is still written. What was skipped is stored as a backlog, one
+document per source, and goes first in the next run of that source.
+"""
+
+import os
+import time
+from datetime import datetime
+
+
+DEFAULT_TIME_BUDGET = float(os.getenv('RUN_TIME_BUDGET', 0))
+
+# Share of the budget kept for writing what was scraped
+FLUSH_RESERVE = float(os.getenv('RUN_FLUSH_RESERVE', 0.1))
+
+
+class Deadline:
+    """
+    Point in time after which a run takes no new work.
+    """
+    
+    def __init__(self, budget=None, reserve=FLUSH_RESERVE):
+        """
+        Args:
+            budget (float, optional): Seconds the run may take; None or 0 for no limit
+            reserve (float): Share of the budget kept for writing results
+        """
+        self.budget = budget or None
+        self.started = time.monotonic()
+        self.stop_at = None if self.budget is None else self.started + self.budget * (1 - reserve)
+        self.end_at = None if self.budget is None else self.started + self.budget
+    
+    def remaining(self):
+        """
+        Seconds left for new work.
+        
+        Returns:
+            float: Seconds, or None without a budget
+        """
+        if self.stop_at is None:
+            return None
+        return max(0.0, self.stop_at - time.monotonic())
+    
+    def expired(self):
+        """True once no new work should be started."""
+        return self.stop_at is not None and time.monotonic() >= self.stop_at
+    
+    def timeout(self, default):
+        """
+        Cap a network timeout so that a request cannot outlive the deadline.
+        
+        Args:
+            default (float): Timeout without a deadline
+        
+        Returns:
+            float: Seconds
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(0.1, min(default, remaining))
+    
+    def elapsed(self):
+        """Seconds since the run started."""
+        return time.monotonic() - self.started
+
+
+def load_backlog(db, sources):
+    """
+    Get the work earlier runs of some sources skipped when they ran out of time.
+    
+    Args:
+        db: Database holding the run_backlog collection
+        sources (list): Source names
+    
+    Returns:
+        dict: Skipped 'sources' (list) and crawl 'pages' per source ([url, kind, depth] lists)
+    """
+    backlog = {'sources': [], 'pages': {}}
+    for doc in db.run_backlog.find({'_id': {'$in': list(sources)}}):
+        if doc.get('skipped'):
+            backlog['sources'].append(doc['_id'])
+        if doc.get('pages'):
+            backlog['pages'][doc['_id']] = doc['pages']
+    return backlog
+
+
+def save_backlog(db, sources, skipped, pages):
+    """
+    Store the work this run skipped, per source. Only the sources of this run
+    are touched, so a run of some sources keeps the backlog of the others;
+    those it finished are cleared.
+    
+    Args:
+        db: Database holding the run_backlog collection
+        sources (list): Sources of this run
+        skipped (list): Sources not scraped
+        pages (dict): Source name to the crawl pages left in its frontier
+    """
+    now = datetime.now()
+    finished = []
+    for source in sources:
+        if source in skipped or pages.get(source):
+            db.run_backlog.update_one(
+                {'_id': source},
+                {'$set': {'skipped': source in skipped, 'pages': pages.get(source, []), 'updated_at': now}},
+                upsert=True
+            )
+        else:
+            finished.append(source)
+    
+    if finished:
+        db.run_backlog.delete_many({'_id': {'$in': finished}})
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    deadline = Deadline(1.0, reserve=0.2)
+    print(f"Remaining: {deadline.remaining():.2f}s, timeout for a 10s request: {deadline.timeout(10):.2f}s")
+    
+    polled = 0
+    while not deadline.expired():
+        polled += 1
+        time.sleep(0.05)
+    print(f"Stopped new work after {deadline.elapsed():.2f}s ({polled} steps), "
+          f"{deadline.end_at - time.monotonic():.2f}s left to flush")
+    print(f"No budget: remaining {Deadline().remaining()}, expired {Deadline().expired()}")
@@ -5,6 +5,13 @@ Handles detection and prevention of duplicate events
 
 import hashlib
 import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text_normalize import clean_text, title_key, location_key
 
 
 def generate_event_hash(title, date, location):
@@ -20,24 +27,30 @@ def generate_event_hash(title, date, location):
     Returns:
         str: MD5 hash of the event
     """
-    # Normalize the inputs
-    normalized_title = str(title).lower().strip()
-    normalized_date = str(date).lower().strip()
-    normalized_location = str(location).lower().strip()
+    # Matched case-insensitively, ignoring all whitespace
+    title_hash_key = ''.join(str(title).lower().split())
+    location_hash_key = ''.join(str(location).lower().split())
     
-    # Remove extra whitespace
-    normalized_title = ' '.join(normalized_title.split())
-    normalized_location = ' '.join(normalized_location.split())
+    return hash_event_keys(title_hash_key, date, location_hash_key)
+
+
+def hash_event_keys(title_hash_key, date, location_hash_key):
+    """
+    Generate the event hash from title and location already reduced to
+    their hash keys (see utils.text_normalize.normalize_field).
     
-    # Create a composite string
-    composite = f"{normalized_title}{normalized_date}{normalized_location}"
+    Args:
+        title_hash_key (str): Hash key of the title
+        date (str/datetime): Event date
+        location_hash_key (str): Hash key of the location
     
-    # Remove all spaces for more aggressive matching
-    composite = composite.replace(' ', '')
+    Returns:
+        str: MD5 hash of the event, as generate_event_hash() computes it
+    """
+    normalized_date = str(date).lower().strip().replace(' ', '')
+    composite = f"{title_hash_key}{normalized_date}{location_hash_key}"
     
-    # Generate MD5 hash
-    hash_object = hashlib.md5(composite.encode())
-    return hash_object.hexdigest()
+    return hashlib.md5(composite.encode()).hexdigest()
 
 
 def normalize_title(title):
@@ -50,21 +63,7 @@ def normalize_title(title):
     Returns:
         str: Normalized title
     """
-    if not title:
-        return ""
-    
-    # Convert to lowercase
-    normalized = title.lower().strip()
-    
-    # Remove common punctuation
-    punctuation = [',', '.', '!', '?', ':', ';', '"', "'"]
-    for char in punctuation:
-        normalized = normalized.replace(char, '')
-    
-    # Replace multiple spaces with single space
-    normalized = ' '.join(normalized.split())
-    
-    return normalized
+    return title_key(clean_text(title))
 
 
 def normalize_location(location):
@@ -77,28 +76,7 @@ def normalize_location(location):
     Returns:
         str: Normalized location
     """
-    if not location:
-        return ""
-    
-    # Convert to lowercase
-    normalized = location.lower().strip()
-    
-    # Common location abbreviations
-    replacements = {
-        'street': 'st',
-        'avenue': 'ave',
-        'road': 'rd',
-        'sydney': 'syd',
-        'australia': 'aus'
-    }
-    
-    for full, abbr in replacements.items():
-        normalized = normalized.replace(full, abbr)
-    
-    # Remove extra spaces
-    normalized = ' '.join(normalized.split())
-    
-    return normalized
+    return location_key(clean_text(location))
 
 
 def are_events_duplicate(event1, event2):
@@ -207,6 +185,42 @@ def add_hash_to_event(event):
     return event
 
 
+def generate_content_fingerprint(event):
+    """
+    Generate a fingerprint of an event's mutable content.
+    Unlike the event hash (which identifies the event), the fingerprint
+    changes whenever a field shown to users changes, e.g. a new venue
+    or an updated description.
+    
+    Args:
+        event (dict): Event dictionary
+        
+    Returns:
+        str: MD5 hash of the event content
+    """
+    fields = ['title', 'date', 'location', 'description', 'image_url', 'ticket_url']
+    composite = '\x1f'.join(str(event.get(field, '') or '') for field in fields)
+    
+    return hashlib.md5(composite.encode()).hexdigest()
+
+
+def generate_listing_fingerprint(event):
+    """
+    Generate a fingerprint of the content a listing page shows for an event.
+    Leaves out the description, which sources with detail pages only publish
+    there, so an unchanged fingerprint means the detail page need not be fetched.
+    
+    Args:
+        event (dict): Event dictionary as scraped from a listing
+        
+    Returns:
+        str: MD5 hash of the listing content
+    """
+    fields = ['title', 'date', 'location', 'image_url', 'ticket_url']
+    composite = '\x1f'.join(str(event.get(field, '') or '') for field in fields)
+    
+    return hashlib.md5(composite.encode()).hexdigest()
+
 # Example usage and testing
 if __name__ == "__main__":
     # Test events
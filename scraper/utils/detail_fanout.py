@@ -0,0 +1,149 @@
+"""
+Detail Page Fan-out
+Completes listing events from their detail pages, fetching only the pages of
+events that are new or whose listing changed since they were stored
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.deduplicate import generate_listing_fingerprint
+from utils.metrics import CACHE_HITS, STAGE_SECONDS
+
+
+DEFAULT_WORKERS = 8
+
+# Stored events looked up per query
+LOOKUP_BATCH = 1000
+
+# Result of a detail fetch not started before the deadline
+SKIPPED = object()
+
+
+def load_stored_details(events_collection, ticket_urls):
+    """
+    Look up what is stored for a set of ticket URLs.
+    
+    Args:
+        events_collection: MongoDB events collection
+        ticket_urls (list): Ticket URLs of scraped events
+    
+    Returns:
+        dict: Ticket URL to stored listing_fingerprint and description
+    """
+    stored = {}
+    for i in range(0, len(ticket_urls), LOOKUP_BATCH):
+        for doc in events_collection.find(
+            {'ticket_url': {'$in': ticket_urls[i:i + LOOKUP_BATCH]}},
+            {'_id': 0, 'ticket_url': 1, 'listing_fingerprint': 1, 'description': 1}
+        ):
+            stored[doc['ticket_url']] = doc
+    return stored
+
+
+def merge_detail(event, detail):
+    """
+    Fill an event from its detail page: the description always, the image only
+    where the listing had none. Fields that identify the event are left alone.
+    
+    Args:
+        event (dict): Listing event, updated in place
+        detail (dict): Field values parsed from the detail page
+    """
+    if detail.get('description'):
+        event['description'] = detail['description']
+    if detail.get('image_url') and not event.get('image_url'):
+        event['image_url'] = detail['image_url']
+
+
+def fan_out_details(scraper, events, stored, workers=DEFAULT_WORKERS, deadline=None):
+    """
+    Complete a source's listing events from their detail pages.
+    
+    Events whose listing fingerprint matches the stored one reuse the stored
+    description; the detail pages of the rest are fetched concurrently.
+    Every event gets its listing_fingerprint set. Pages not yet fetched when
+    the deadline expires are skipped, and like failed pages retried next run.
+    
+    Args:
+        scraper (BaseScraper): Source the events came from
+        events (list): The source's listing events, updated in place
+        stored (dict): Result of load_stored_details()
+        workers (int): Concurrent detail fetches
+        deadline (Deadline, optional): Run deadline (see utils.deadline)
+    
+    Returns:
+        dict: Counts of reused, fetched, failed and skipped detail pages
+    """
+    to_fetch = []
+    reused = 0
+    
+    for event in events:
+        fingerprint = generate_listing_fingerprint(event)
+        event['listing_fingerprint'] = fingerprint
+        known = stored.get(event.get('ticket_url'))
+        if known and known.get('listing_fingerprint') == fingerprint:
+            if known.get('description'):
+                event['description'] = known['description']
+            reused += 1
+        elif event.get('ticket_url'):
+            to_fetch.append(event)
+    
+    CACHE_HITS.inc(reused, cache='detail', source=scraper.source_name)
+    
+    def fetch(event):
+        if deadline is not None and deadline.expired():
+            return SKIPPED
+        try:
+            return scraper.fetch_event_detail(event)
+        except Exception as e:
+            print(f"Error fetching detail page: {event.get('ticket_url')} - {e}")
+            return None
+    
+    failed = skipped = 0
+    with STAGE_SECONDS.time(stage='detail', source=scraper.source_name):
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for event, detail in zip(to_fetch, pool.map(fetch, to_fetch)):
+                if detail is None or detail is SKIPPED:
+                    if detail is None:
+                        failed += 1
+                    else:
+                        skipped += 1
+                    # Keep what is stored and retry the page next run
+                    known = stored.get(event['ticket_url'])
+                    if known and known.get('description'):
+                        event['description'] = known['description']
+                    event['listing_fingerprint'] = None
+                    continue
+                merge_detail(event, detail)
+    
+    return {'reused': reused, 'fetched': len(to_fetch) - failed - skipped, 'failed': failed, 'skipped': skipped}
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    class DemoScraper:
+        source_name = 'demo'
+        
+        def fetch_event_detail(self, event):
+            print(f"  fetching {event['ticket_url']}")
+            return {'description': f"Full description of {event['title']}"}
+    
+    events = [
+        {'title': 'Known', 'ticket_url': 'https://example.com/a', 'description': 'Short'},
+        {'title': 'Changed', 'ticket_url': 'https://example.com/b', 'description': 'Short'},
+        {'title': 'New', 'ticket_url': 'https://example.com/c', 'description': ''},
+    ]
+    stored = {
+        'https://example.com/a': {'listing_fingerprint': generate_listing_fingerprint(events[0]),
+                                  'description': 'Stored full description'},
+        'https://example.com/b': {'listing_fingerprint': 'stale', 'description': 'Old'},
+    }
+    
+    print(fan_out_details(DemoScraper(), events, stored))
+    for event in events:
+        print(f"{event['title']}: {event['description']}")
@@ -0,0 +1,222 @@
+"""
+Event Batch
+Columnar representation of many events for bulk processing
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.deduplicate import generate_event_hash
+from utils.event_record import to_document
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_datetime64(dates):
+    """
+    Convert naive datetimes to a datetime64[us] array, with None as NaT.
+    Going through integer offsets is several times faster than letting
+    NumPy convert datetime objects one by one.
+    """
+    nat = np.iinfo(np.int64).min
+    offsets = [(date - EPOCH) // MICROSECOND if date is not None else nat for date in dates]
+    return np.array(offsets, dtype=np.int64).view('datetime64[us]')
+
+
+class EventBatch:
+    """
+    A batch of events held as columns.
+    
+    The title, date, location, source and hash columns are built once, and
+    deduplication, date filtering and grouping run as whole-column passes
+    instead of per-record loops. With NumPy installed the date, source and
+    hash columns are arrays and date filtering and grouping are vectorized;
+    without it the same operations run over plain lists. The original records are kept
+    alongside the columns, so converting back to documents is lossless.
+    """
+    
+    def __init__(self, records, titles, dates, locations, sources, hashes):
+        self.records = records
+        self.titles = titles
+        self.dates = dates
+        self.locations = locations
+        self.sources = sources
+        self.hashes = hashes
+    
+    @classmethod
+    def from_events(cls, events):
+        """
+        Build a batch from event records or dictionaries.
+        
+        Args:
+            events (list): Events to include
+        
+        Returns:
+            EventBatch: Columnar batch
+        """
+        records = list(events)
+        titles = [e.get('title', '') for e in records]
+        dates = [e.get('date') for e in records]
+        locations = [e.get('location', '') for e in records]
+        sources = [e.get('source', '') for e in records]
+        
+        # Reuse hashes already computed by the scrapers
+        hashes = [
+            e.get('event_hash') or generate_event_hash(title, date, location)
+            for e, title, date, location in zip(records, titles, dates, locations)
+        ]
+        
+        if NUMPY_AVAILABLE:
+            dates = _to_datetime64(dates)
+            sources = np.array(sources, dtype=object)
+            hashes = np.array(hashes, dtype='U32')
+        
+        return cls(records, titles, dates, locations, sources, hashes)
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def take(self, indices):
+        """
+        Select rows by position.
+        
+        Args:
+            indices: Sequence (or NumPy array) of row positions
+        
+        Returns:
+            EventBatch: Batch holding the selected rows, in the given order
+        """
+        if NUMPY_AVAILABLE:
+            indices = np.asarray(indices, dtype=np.intp)
+            pick = indices.tolist()
+            return EventBatch(
+                [self.records[i] for i in pick],
+                [self.titles[i] for i in pick],
+                self.dates[indices],
+                [self.locations[i] for i in pick],
+                self.sources[indices],
+                self.hashes[indices]
+            )
+        
+        return EventBatch(
+            [self.records[i] for i in indices],
+            [self.titles[i] for i in indices],
+            [self.dates[i] for i in indices],
+            [self.locations[i] for i in indices],
+            [self.sources[i] for i in indices],
+            [self.hashes[i] for i in indices]
+        )
+    
+    def deduplicate(self):
+        """
+        Drop events whose hash was already seen, keeping the first occurrence.
+        
+        Returns:
+            EventBatch: Batch of unique events in their original order
+        """
+        # A hash table beats a sort-based unique here, with or without NumPy
+        first = {}
+        for i, event_hash in enumerate(self.hash_list()):
+            first.setdefault(event_hash, i)
+        
+        # Dicts keep insertion order, so positions are already ascending
+        return self.take(list(first.values()))
+    
+    def filter_upcoming(self, now=None):
+        """
+        Drop events whose date has passed. Events without a date are kept.
+        
+        Args:
+            now (datetime, optional): Reference time
+        
+        Returns:
+            EventBatch: Batch of upcoming events
+        """
+        now = now or datetime.now()
+        
+        if NUMPY_AVAILABLE:
+            keep = np.isnat(self.dates) | (self.dates >= np.datetime64(now, 'us'))
+            return self.take(np.flatnonzero(keep))
+        
+        return self.take([i for i, date in enumerate(self.dates) if not date or date >= now])
+    
+    def group_by_source(self):
+        """
+        Split the batch by source.
+        
+        Returns:
+            dict: Mapping of source name to EventBatch
+        """
+        if NUMPY_AVAILABLE:
+            names, codes = np.unique(self.sources.astype(str), return_inverse=True)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+            return {
+                name: self.take(order[bounds[i]:bounds[i + 1]])
+                for i, name in enumerate(names.tolist())
+            }
+        
+        groups = {}
+        for i, source in enumerate(self.sources):
+            groups.setdefault(source, []).append(i)
+        return {source: self.take(indices) for source, indices in groups.items()}
+    
+    def source_counts(self):
+        """
+        Count events per source.
+        
+        Returns:
+            dict: Mapping of source name to event count
+        """
+        return {source: len(batch) for source, batch in self.group_by_source().items()}
+    
+    def hash_list(self):
+        """
+        Get the hash column as a list of strings.
+        
+        Returns:
+            list: Event hashes in row order
+        """
+        return self.hashes.tolist() if NUMPY_AVAILABLE else list(self.hashes)
+    
+    def to_documents(self):
+        """
+        Convert the batch back to MongoDB documents.
+        
+        Returns:
+            list: Documents in row order
+        """
+        return [to_document(record) for record in self.records]
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    from datetime import timedelta
+    
+    now = datetime.now()
+    events = [
+        {'title': 'Vivid Sydney', 'date': now + timedelta(days=5), 'location': 'Circular Quay', 'source': 'a'},
+        {'title': 'vivid sydney', 'date': now + timedelta(days=5), 'location': 'Circular Quay', 'source': 'b'},
+        {'title': 'Old Market', 'date': now - timedelta(days=2), 'location': 'The Rocks', 'source': 'a'},
+        {'title': 'Jazz Night', 'date': now + timedelta(days=1), 'location': 'The Basement', 'source': 'b'},
+    ]
+    
+    batch = EventBatch.from_events(events)
+    print(f"NumPy available: {NUMPY_AVAILABLE}")
+    print(f"Initial: {len(batch)}")
+    batch = batch.deduplicate()
+    print(f"After deduplication: {len(batch)}")
+    batch = batch.filter_upcoming(now)
+    print(f"After filtering past events: {len(batch)}")
+    print(f"By source: {batch.source_counts()}")
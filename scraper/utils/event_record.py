@@ -0,0 +1,211 @@
+"""
+Event Record
+Compact slotted event type with dict-style access for existing callers
+"""
+
+import sys
+import os
+from collections.abc import MutableMapping
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.deduplicate import generate_event_hash, generate_content_fingerprint
+
+
+class Event(MutableMapping):
+    """
+    A scraped event stored in __slots__ instead of a per-event dict.
+    
+    Supports the dict operations the pipeline relies on (event['title'],
+    event.get(...), event['event_hash'] = ..., iteration, len), so it can be
+    passed anywhere an event dictionary was used before. The event hash and
+    content fingerprint are computed once and cached until a field they
+    depend on changes. Fields outside the standard schema (e.g. '_id' set by
+    pymongo) go into a small overflow dict that is only created when needed.
+    
+    Standard fields always exist: deleting one (or popping it) sets it to
+    None, and deleting the hash or fingerprint makes it be computed again.
+    """
+    
+    FIELDS = ('title', 'date', 'location', 'description', 'image_url', 'ticket_url',
+              'source', 'is_active', 'last_updated')
+    
+    # Fields that feed the cached hash and fingerprint
+    HASH_FIELDS = frozenset(('title', 'date', 'location'))
+    CONTENT_FIELDS = frozenset(('title', 'date', 'location', 'description', 'image_url', 'ticket_url'))
+    
+    __slots__ = FIELDS + ('_event_hash', '_fingerprint', '_extra')
+    
+    def __init__(self, title, date, location, description, image_url, ticket_url,
+                 source, is_active=True, last_updated=None):
+        self.title = title
+        self.date = date
+        self.location = location
+        self.description = description
+        self.image_url = image_url
+        self.ticket_url = ticket_url
+        # Every event of a source shares one source string
+        self.source = sys.intern(source) if source else source
+        self.is_active = is_active
+        self.last_updated = last_updated
+        self._event_hash = None
+        self._fingerprint = None
+        self._extra = None
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build an Event from an event dictionary.
+        
+        Args:
+            data (dict): Event dictionary, e.g. a stored document
+        
+        Returns:
+            Event: Event with any non-standard keys kept as extra fields
+        """
+        event = cls(*(data.get(field) for field in cls.FIELDS[:7]),
+                    is_active=data.get('is_active', True),
+                    last_updated=data.get('last_updated'))
+        for key, value in data.items():
+            if key not in cls.FIELDS:
+                event[key] = value
+        return event
+    
+    @property
+    def event_hash(self):
+        """Duplicate-detection hash of title, date and location (cached)."""
+        if self._event_hash is None:
+            self._event_hash = generate_event_hash(self.title, self.date, self.location)
+        return self._event_hash
+    
+    @property
+    def fingerprint(self):
+        """Fingerprint of the user-visible content (cached)."""
+        if self._fingerprint is None:
+            self._fingerprint = generate_content_fingerprint(self)
+        return self._fingerprint
+    
+    def to_document(self):
+        """
+        Convert to a MongoDB document.
+        
+        Returns:
+            dict: Plain dictionary with the standard fields, hash and extras
+        """
+        document = {
+            'title': self.title,
+            'date': self.date,
+            'location': self.location,
+            'description': self.description,
+            'image_url': self.image_url,
+            'ticket_url': self.ticket_url,
+            'source': self.source,
+            'is_active': self.is_active,
+            'last_updated': self.last_updated,
+            'event_hash': self.event_hash,
+            'content_fingerprint': self.fingerprint
+        }
+        if self._extra:
+            document.update(self._extra)
+        return document
+    
+    def __getitem__(self, key):
+        if key in Event.FIELDS:
+            return getattr(self, key)
+        if key == 'event_hash':
+            return self.event_hash
+        if key == 'content_fingerprint':
+            return self.fingerprint
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        if key in Event.FIELDS:
+            if key == 'source' and value:
+                value = sys.intern(value)
+            setattr(self, key, value)
+            if key in Event.HASH_FIELDS:
+                self._event_hash = None
+            if key in Event.CONTENT_FIELDS:
+                self._fingerprint = None
+        elif key == 'event_hash':
+            self._event_hash = value
+        elif key == 'content_fingerprint':
+            self._fingerprint = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+    
+    def __delitem__(self, key):
+        if key in Event.FIELDS:
+            self[key] = None
+        elif key == 'event_hash':
+            self._event_hash = None
+        elif key == 'content_fingerprint':
+            self._fingerprint = None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+    
+    def __iter__(self):
+        yield from Event.FIELDS
+        yield 'event_hash'
+        yield 'content_fingerprint'
+        if self._extra:
+            yield from self._extra
+    
+    def __len__(self):
+        return len(Event.FIELDS) + 2 + (len(self._extra) if self._extra else 0)
+    
+    def __contains__(self, key):
+        return (
+            key in Event.FIELDS
+            or key in ('event_hash', 'content_fingerprint')
+            or (self._extra is not None and key in self._extra)
+        )
+    
+    def __repr__(self):
+        return f"Event(title={self.title!r}, date={self.date!r}, source={self.source!r})"
+
+
+def to_document(event):
+    """
+    Convert an Event or event dictionary to a MongoDB document.
+    
+    Args:
+        event (Event/dict): Event to convert
+    
+    Returns:
+        dict: Document ready for insertion
+    """
+    if isinstance(event, Event):
+        return event.to_document()
+    return event
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    from datetime import datetime
+    
+    event = Event(
+        title='Jazz Night at The Basement',
+        date=datetime(2026, 3, 1, 20, 0),
+        location='The Basement, Circular Quay',
+        description='Live jazz performances.',
+        image_url='https://example.com/jazz.jpg',
+        ticket_url='https://www.timeout.com/sydney/jazz-night',
+        source='timeout.com/sydney',
+        last_updated=datetime.now()
+    )
+    
+    print(event)
+    print(f"Title: {event['title']}")
+    print(f"Hash: {event['event_hash']}")
+    print(f"Fingerprint: {event.fingerprint}")
+    event['description'] = 'Live jazz, now with a late session.'
+    print(f"Fingerprint after edit: {event.fingerprint}")
+    print(f"Document keys: {sorted(event.to_document())}")
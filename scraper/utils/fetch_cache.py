@@ -0,0 +1,198 @@
+"""
+Fetch Cache
+Process-wide request coalescing, an in-run response cache and shared
+connection pools for page fetches
+
+Scrapers and detail fan-outs often ask for the same page in one run. Requests
+are keyed by canonical URL: while one fetch of a URL is in flight, concurrent
+requests for it wait for that fetch instead of starting their own
+(single-flight), and successful responses stay in a small LRU cache until the
+run ends. All scraper sessions share one transport adapter, so connections to
+a host are pooled across scrapers.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from requests.adapters import HTTPAdapter
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.frontier import canonicalize_url
+from utils.host_control import MAX_LIMIT
+
+
+DEFAULT_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_ENTRIES', 512))
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of successful responses, bounded by entry count and body bytes.
+    """
+    
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            max_entries (int): Most responses kept; 0 disables the cache
+            max_bytes (int): Most body bytes kept
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """
+        Look up a response and mark it recently used.
+        
+        Args:
+            key (str): Canonical URL
+        
+        Returns:
+            requests.Response: Cached response, or None
+        """
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+    
+    def put(self, key, response):
+        """
+        Cache a response, evicting the least recently used ones over the bounds.
+        
+        Args:
+            key (str): Canonical URL
+            response (requests.Response): Response with its body loaded
+        """
+        size = len(response.content)
+        if not self.max_entries or size > self.max_bytes:
+            return
+        
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.content)
+            self._entries[key] = response
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.content)
+    
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs a function once per key at a time; concurrent callers with the same
+    key wait for that call and share its result.
+    """
+    
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key, func):
+        """
+        Call func, or wait for the call already in flight for key.
+        
+        Args:
+            key (str): Deduplication key
+            func (callable): Function producing the result
+        
+        Returns:
+            tuple: (result, shared) where shared is True if another caller's result was reused
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+        
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+
+def fetch_key(url):
+    """
+    Key under which fetches of a URL are coalesced and cached.
+    
+    Args:
+        url (str): Absolute URL
+    
+    Returns:
+        str: Canonical URL
+    """
+    return canonicalize_url(url)
+
+
+# Shared by every scraper in the process; cleared at the start of each run
+RESPONSES = ResponseCache()
+FLIGHTS = SingleFlight()
+
+# One connection pool per host, shared by all scraper sessions and sized for
+# the most concurrent requests host_control allows to one host
+SHARED_ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=MAX_LIMIT)
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    
+    flights = SingleFlight()
+    calls = []
+    
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'page body'
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: flights.do('https://example.com/venue', slow_fetch), range(8)))
+    
+    print(f"8 concurrent requests, {len(calls)} fetch, {sum(shared for _, shared in results)} shared")
+    
+    import requests
+    cache = ResponseCache(max_entries=2)
+    for i in range(3):
+        response = requests.Response()
+        response._content = b'x' * 10
+        cache.put(f'https://example.com/{i}', response)
+    print(f"LRU keeps {len(cache)} entries, oldest evicted: {cache.get('https://example.com/0') is None}")
+    print(f"Key: {fetch_key('https://Example.com/e/1?utm_source=x')}")
@@ -0,0 +1,200 @@
+"""
+Crawl Frontier
+Priority queue of pages to fetch for one source, with canonical-URL dedup
+and depth/page budgets
+"""
+
+import heapq
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# Page kinds, in the order they are fetched
+LISTING = 0
+PAGINATION = 1
+DETAIL = 2
+
+KIND_NAMES = {LISTING: 'listing', PAGINATION: 'pagination', DETAIL: 'detail'}
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', '_gl'}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url):
+    """
+    Reduce a URL to a canonical form so that links to the same page compare equal.
+    
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query and gives an empty path a '/'.
+    
+    Args:
+        url (str): Absolute URL
+    
+    Returns:
+        str: Canonical URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+class CrawlFrontier:
+    """
+    Pages waiting to be fetched for one source.
+    
+    Listing pages come out first, then pagination, then detail pages; within a
+    kind, shallower pages first and otherwise in the order they were found.
+    A URL is queued once per frontier, whatever form it was linked in.
+    """
+    
+    def __init__(self, max_depth=None, max_pages=None):
+        """
+        Args:
+            max_depth (int, optional): Deepest link distance from a start page to follow
+            max_pages (int, optional): Most pages to hand out
+        """
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self._heap = []
+        self._seen = set()
+        self._counter = 0
+        self.stats = {
+            'queued': 0, 'fetched': 0, 'duplicates': 0,
+            'over_depth': 0, 'over_budget': 0
+        }
+    
+    def add(self, url, kind=PAGINATION, depth=0):
+        """
+        Queue a page unless it was queued before or lies beyond the depth budget.
+        
+        Args:
+            url (str): Absolute URL
+            kind (int): LISTING, PAGINATION or DETAIL
+            depth (int): Links followed from a start page
+        
+        Returns:
+            bool: True if the page was queued
+        """
+        canonical = canonicalize_url(url)
+        if canonical in self._seen:
+            self.stats['duplicates'] += 1
+            return False
+        if self.max_depth is not None and depth > self.max_depth:
+            self.stats['over_depth'] += 1
+            return False
+        
+        self._seen.add(canonical)
+        heapq.heappush(self._heap, (kind, depth, self._counter, url))
+        self._counter += 1
+        self.stats['queued'] += 1
+        return True
+    
+    def pop(self):
+        """
+        Take the next page to fetch.
+        
+        Returns:
+            tuple: (url, kind, depth), or None when empty or out of page budget
+        """
+        if not self._heap:
+            return None
+        if self.max_pages is not None and self.stats['fetched'] >= self.max_pages:
+            self.stats['over_budget'] = len(self._heap)
+            return None
+        
+        kind, depth, _, url = heapq.heappop(self._heap)
+        self.stats['fetched'] += 1
+        return url, kind, depth
+    
+    def seen(self, url):
+        """
+        Check whether a URL was already queued.
+        
+        Args:
+            url (str): Absolute URL
+        
+        Returns:
+            bool: True if queued before
+        """
+        return canonicalize_url(url) in self._seen
+    
+    def pending(self):
+        """
+        Get the pages still queued, in the order they would be fetched.
+        
+        Returns:
+            list: [url, kind, depth] lists
+        """
+        return [[url, kind, depth] for kind, depth, _, url in sorted(self._heap)]
+    
+    def get_state(self):
+        """
+        Get the frontier's pages and counters, for a checkpoint.
+        
+        Returns:
+            dict: JSON-serializable state for restore()
+        """
+        return {
+            'heap': [list(entry) for entry in self._heap],
+            'seen': sorted(self._seen),
+            'counter': self._counter,
+            'stats': dict(self.stats)
+        }
+    
+    def restore(self, state):
+        """
+        Continue from a checkpointed state.
+        
+        Args:
+            state (dict): Result of get_state()
+        """
+        self._heap = [tuple(entry) for entry in state['heap']]
+        heapq.heapify(self._heap)
+        self._seen = set(state['seen'])
+        self._counter = state['counter']
+        self.stats = dict(state['stats'])
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    @property
+    def exhausted(self):
+        """True if every page found was fetched, with no depth or page budget cut."""
+        return not self._heap and not self.stats['over_depth']
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    for url in [
+        'HTTPS://Example.com:443/events?page=2&utm_source=x#top',
+        'https://example.com/events?b=2&a=1',
+        'http://example.com',
+    ]:
+        print(f"{url}\n  -> {canonicalize_url(url)}")
+    
+    frontier = CrawlFrontier(max_depth=2, max_pages=10)
+    frontier.add('https://example.com/e/1', DETAIL, 1)
+    frontier.add('https://example.com/events?page=2', PAGINATION, 1)
+    frontier.add('https://example.com/events', LISTING, 0)
+    frontier.add('https://example.com/events?page=2&utm_medium=email', PAGINATION, 1)
+    frontier.add('https://example.com/events?page=9', PAGINATION, 3)
+    
+    while True:
+        item = frontier.pop()
+        if item is None:
+            break
+        print(f"{KIND_NAMES[item[1]]:<10} depth {item[2]}  {item[0]}")
+    print(frontier.stats)
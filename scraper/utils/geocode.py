@@ -0,0 +1,325 @@
+"""
+Venue Geocoding
+Resolves free-text event locations to coordinates from a local gazetteer,
+with no network access, and queries events near a point
+
+A location is matched on its normalized form (see utils.text_normalize):
+the whole string first, then each comma-separated part, then any gazetteer
+name found in it as whole words. Venues win over localities (suburbs and
+landmarks). Results, misses included, are memoized in a cache file that is
+kept across runs and dropped when the gazetteer changes.
+
+Resolved events get a GeoJSON point in 'geo' ([lon, lat], for the 2dsphere
+index the writer creates) and a 'geohash'.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text_normalize import clean_text, location_key
+from utils.metrics import CACHE_HITS
+
+
+DEFAULT_GAZETTEER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sources', 'venues.json'
+)
+DEFAULT_CACHE_DIR = 'geocode_cache'
+CACHE_FILE = 'locations.json'
+
+GEOHASH_PRECISION = 9
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Radius of nearby-event queries
+DEFAULT_RADIUS_KM = float(os.getenv('NEARBY_RADIUS_KM', 2))
+
+# Preferred kind of match first
+KIND_ORDER = {'venue': 0, 'locality': 1}
+
+
+def encode_geohash(lat, lon, precision=GEOHASH_PRECISION):
+    """
+    Encode a point as a geohash.
+    
+    Args:
+        lat (float): Latitude
+        lon (float): Longitude
+        precision (int): Characters; 9 is a cell of about 5 m
+    
+    Returns:
+        str: Geohash
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    
+    while len(chars) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        bounds, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+    
+    return ''.join(chars)
+
+
+def geo_point(lat, lon):
+    """
+    GeoJSON point of a coordinate pair, as MongoDB 2dsphere indexes store them.
+    
+    Args:
+        lat (float): Latitude
+        lon (float): Longitude
+    
+    Returns:
+        dict: GeoJSON Point
+    """
+    return {'type': 'Point', 'coordinates': [lon, lat]}
+
+
+def _key(text):
+    return location_key(clean_text(text)).strip(' ,')
+
+
+class Gazetteer:
+    """
+    Known venues and localities per city, indexed by normalized name.
+    """
+    
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str, optional): Gazetteer file; GAZETTEER_PATH or the bundled venues.json if omitted
+        """
+        self.path = path or os.getenv('GAZETTEER_PATH') or DEFAULT_GAZETTEER
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        self.digest = hashlib.md5(data).hexdigest()
+        
+        # city -> normalized name -> entry, and a whole-word pattern of the names
+        self.names = {}
+        self.patterns = {}
+        for city, entries in json.loads(data)['cities'].items():
+            names = {}
+            for entry in sorted(entries, key=lambda e: KIND_ORDER.get(e.get('kind'), len(KIND_ORDER))):
+                for name in [entry['name']] + entry.get('aliases', []):
+                    names.setdefault(_key(name), entry)
+            self.names[city] = names
+            if not names:
+                continue
+            
+            # Longest names first, so 'sydney harbour' matches before 'syd'
+            alternatives = sorted(names, key=len, reverse=True)
+            self.patterns[city] = re.compile(
+                r'(?<!\w)(?:' + '|'.join(map(re.escape, alternatives)) + r')(?!\w)'
+            )
+    
+    def resolve(self, location, city):
+        """
+        Find a location in the city's gazetteer.
+        
+        Args:
+            location (str): Free-text location, e.g. 'The Basement, Circular Quay'
+            city (str): City slug
+        
+        Returns:
+            dict: Matched venue name, kind, lat, lon and geohash; None if not found
+        """
+        names = self.names.get(city)
+        if not names or not location:
+            return None
+        
+        key = _key(location)
+        candidates = [names.get(key)]
+        candidates += [names.get(part.strip()) for part in key.split(',')]
+        candidates += [names[match] for match in self.patterns[city].findall(key)]
+        candidates = [entry for entry in candidates if entry is not None]
+        if not candidates:
+            return None
+        
+        # The first match of the best kind: earlier rules and earlier parts are more specific
+        entry = min(candidates, key=lambda e: KIND_ORDER.get(e.get('kind'), len(KIND_ORDER)))
+        return {
+            'venue': entry['name'],
+            'kind': entry.get('kind', 'venue'),
+            'lat': entry['lat'],
+            'lon': entry['lon'],
+            'geohash': encode_geohash(entry['lat'], entry['lon'])
+        }
+
+
+class GeocodeCache:
+    """
+    Persistent memo of resolved locations per city, misses included.
+    """
+    
+    def __init__(self, gazetteer, directory=None):
+        """
+        Args:
+            gazetteer (Gazetteer): Gazetteer the cached results come from
+            directory (str, optional): Cache directory; GEOCODE_CACHE_DIR or
+                DEFAULT_CACHE_DIR if omitted, '' to keep the cache in memory only
+        """
+        self.gazetteer = gazetteer
+        directory = os.getenv('GEOCODE_CACHE_DIR', DEFAULT_CACHE_DIR) if directory is None else directory
+        self.path = os.path.join(directory, CACHE_FILE) if directory else None
+        self.entries = {}
+        self.dirty = False
+        
+        if self.path:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    state = json.load(f)
+                # Results from another version of the gazetteer may be wrong
+                if state.get('gazetteer') == gazetteer.digest:
+                    self.entries = state['entries']
+            except (FileNotFoundError, ValueError):
+                pass
+    
+    def resolve(self, location, city):
+        """
+        Resolve a location through the cache.
+        
+        Args:
+            location (str): Free-text location
+            city (str): City slug
+        
+        Returns:
+            tuple: (result of Gazetteer.resolve(), True if it came from the cache)
+        """
+        key = f"{city}|{_key(location or '')}"
+        if key in self.entries:
+            return self.entries[key], True
+        
+        result = self.gazetteer.resolve(location, city)
+        self.entries[key] = result
+        self.dirty = True
+        return result, False
+    
+    def save(self):
+        """
+        Write the cache file atomically, if anything was added.
+        """
+        if not self.path or not self.dirty:
+            return
+        
+        data = json.dumps({'gazetteer': self.gazetteer.digest, 'entries': self.entries},
+                          separators=(',', ':')).encode('utf-8')
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.dirty = False
+
+
+def geocode_events(events, cache, city):
+    """
+    Attach coordinates to the events whose location the gazetteer knows.
+    
+    Args:
+        events (list): Events, updated in place with 'geo' and 'geohash'
+        cache (GeocodeCache): Memoized resolver
+        city (str): City the events are in
+    
+    Returns:
+        dict: Counts of resolved, cached (of those looked up) and unresolved events
+    """
+    resolved = cached = unresolved = 0
+    # Many events share a venue: each location is looked up once per batch
+    seen = {}
+    
+    for event in events:
+        location = event.get('location') or ''
+        if location not in seen:
+            seen[location], hit = cache.resolve(location, city)
+            cached += hit
+        result = seen[location]
+        
+        if result is None:
+            unresolved += 1
+            continue
+        event['geo'] = geo_point(result['lat'], result['lon'])
+        event['geohash'] = result['geohash']
+        resolved += 1
+    
+    CACHE_HITS.inc(cached, cache='geocode')
+    return {'resolved': resolved, 'cached': cached, 'unresolved': unresolved}
+
+
+def find_nearby(collection, lat, lon, radius_km=None, query=None, limit=0):
+    """
+    Find events near a point, nearest first, through the 2dsphere index on 'geo'.
+    
+    Args:
+        collection: MongoDB events collection
+        lat (float): Latitude
+        lon (float): Longitude
+        radius_km (float, optional): Search radius; DEFAULT_RADIUS_KM if omitted
+        query (dict, optional): Further conditions, e.g. {'is_active': True}
+        limit (int): Most events to return; 0 for all
+    
+    Returns:
+        list: Matching events
+    """
+    radius_km = DEFAULT_RADIUS_KM if radius_km is None else radius_km
+    near = {'geo': {'$nearSphere': {
+        '$geometry': geo_point(lat, lon),
+        '$maxDistance': radius_km * 1000
+    }}}
+    return list(collection.find({**near, **(query or {})}).limit(limit))
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    from utils.storage import connect_database, GEOSPHERE
+    
+    gazetteer = Gazetteer()
+    cache = GeocodeCache(gazetteer, directory='')
+    for location, city in [
+        ('The Basement, Circular Quay', 'sydney'),
+        ('Stone & Chalk, Sydney', 'sydney'),
+        ('Stone & Chalk, Melbourne', 'melbourne'),
+        ('Level 2, 1 Macquarie Street, Sydney Harbour', 'sydney'),
+        ('A warehouse somewhere', 'sydney'),
+    ]:
+        result, _ = cache.resolve(location, city)
+        print(f"{location!r} ({city}) -> {result}")
+    
+    db = connect_database('memory://geocode-demo')
+    db.events.create_index([('geo', GEOSPHERE)])
+    events = [{'title': t, 'location': l} for t, l in [
+        ('Jazz Night', 'The Basement, Circular Quay'), ('Opera Gala', 'Sydney Opera House'),
+        ('Tech Meetup', 'Stone & Chalk, Sydney'), ('Cricket', 'SCG'), ('Pop-up', 'Somewhere')
+    ]]
+    print(geocode_events(events, cache, 'sydney'))
+    db.events.insert_many(events)
+    
+    nearby = find_nearby(db.events, -33.8610, 151.2100, radius_km=1)
+    print(f"Within 1 km of Circular Quay: {[e['title'] for e in nearby]}")
@@ -0,0 +1,331 @@
+"""
+Host Control
+Per-host adaptive concurrency (AIMD) and circuit breakers for page fetches
+
+Every host gets a concurrency limit that grows by one request per round of
+successful requests and halves on a 429, a 5xx, a connection failure or a
+latency spike. A Retry-After header on a 429 or 503 holds back all requests to
+the host until it expires. After a run of consecutive failures the host's circuit opens and
+fetches to it fail immediately until a cooldown has passed; then a single
+probe request decides whether it closes again.
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import HOST_CONCURRENCY, CIRCUIT_OPENS
+
+
+INITIAL_LIMIT = 2
+MIN_LIMIT = 1
+MAX_LIMIT = int(os.getenv('HOST_MAX_CONCURRENCY', 8))
+
+# A request this many times slower than the host's average counts as a spike
+LATENCY_SPIKE_FACTOR = 3.0
+# Weight of the latest request in the average latency
+LATENCY_SMOOTHING = 0.2
+
+# Longest Retry-After honoured, in seconds
+MAX_RETRY_AFTER = 300
+
+CIRCUIT_FAILURES = int(os.getenv('CIRCUIT_FAILURES', 5))
+CIRCUIT_COOLDOWN = float(os.getenv('CIRCUIT_COOLDOWN', 60))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header.
+    
+    Args:
+        value (str): Header value, delay seconds or an HTTP date
+        now (datetime, optional): Reference time for HTTP dates
+    
+    Returns:
+        float: Seconds to wait, or None if absent or invalid
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class HostState:
+    """
+    Concurrency limit, backoff and circuit breaker of one host.
+    """
+    
+    def __init__(self, name, initial_limit=INITIAL_LIMIT, max_limit=MAX_LIMIT,
+                 failure_threshold=CIRCUIT_FAILURES, cooldown=CIRCUIT_COOLDOWN):
+        """
+        Args:
+            name (str): Host name (with port, if any)
+            initial_limit (int): Concurrent requests allowed at first
+            max_limit (int): Most concurrent requests ever allowed
+            failure_threshold (int): Consecutive failures that open the circuit
+            cooldown (float): Seconds the circuit stays open before a probe
+        """
+        self.name = name
+        self.max_limit = max_limit
+        self.limit = float(min(initial_limit, max_limit))
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        
+        self.in_flight = 0
+        self.not_before = 0.0
+        self.latency = None
+        self.last_decrease = 0.0
+        
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        # Thread that made the probe; only its release ends probing
+        self.probe_thread = None
+        
+        self._cond = threading.Condition()
+        HOST_CONCURRENCY.set(int(self.limit), host=name)
+    
+    def acquire(self, wait=True, timeout=None):
+        """
+        Take a request slot, waiting for a free slot and for any Retry-After.
+        
+        Args:
+            wait (bool): Honour Retry-After; False when serving recorded pages
+            timeout (float, optional): Most seconds to wait, e.g. until the run
+                deadline; None to wait as long as it takes
+        
+        Returns:
+            bool: False if the circuit is open, or if the request could not
+                start within timeout, and it must not be made
+        """
+        with self._cond:
+            probe = False
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                # One probe at a time while deciding whether the host recovered
+                if self.probing:
+                    return False
+                self.probing = probe = True
+                self.probe_thread = threading.get_ident()
+            
+            give_up = None if timeout is None else time.monotonic() + timeout
+            while True:
+                now = time.monotonic()
+                delay = self.not_before - now if wait else 0
+                if delay <= 0 and self.in_flight < int(self.limit):
+                    break
+                
+                if give_up is not None and (now >= give_up or (delay > 0 and self.not_before > give_up)):
+                    # A Retry-After ending past the timeout is not waited out at all
+                    if probe:
+                        self.probing = False
+                        self.probe_thread = None
+                    return False
+                
+                if delay > 0:
+                    wait_for = delay
+                else:
+                    wait_for = None if give_up is None else give_up - now
+                self._cond.wait(wait_for)
+            
+            self.in_flight += 1
+            return True
+    
+    def circuit_closed(self):
+        """True unless the circuit is open or half open, refusing requests or allowing a single probe."""
+        with self._cond:
+            return self.state == CLOSED
+    
+    def release(self, response, elapsed):
+        """
+        Return a request slot and adapt to how the request went.
+        
+        Must be called from the thread that acquired the slot, so that the
+        probe of a half-open circuit is told apart from requests that were
+        already in flight when the circuit opened.
+        
+        Args:
+            response (requests.Response): Response, or None if the request failed
+            elapsed (float): Seconds the request took
+        """
+        status = response.status_code if response is not None else None
+        
+        with self._cond:
+            self.in_flight -= 1
+            if self.probing and self.probe_thread == threading.get_ident():
+                self.probing = False
+                self.probe_thread = None
+            
+            if status in (429, 503):
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after:
+                    self.not_before = max(self.not_before, time.monotonic() + min(retry_after, MAX_RETRY_AFTER))
+            
+            if status == 429:
+                self._decrease()
+            elif status is None or status >= 500:
+                self._decrease()
+                self._record_failure()
+            else:
+                spike = self.latency is not None and elapsed > self.latency * LATENCY_SPIKE_FACTOR
+                self.latency = elapsed if self.latency is None else \
+                    (1 - LATENCY_SMOOTHING) * self.latency + LATENCY_SMOOTHING * elapsed
+                self.failures = 0
+                self.state = CLOSED
+                if spike:
+                    self._decrease()
+                else:
+                    # Additive increase: about one more slot per limit's worth of successes
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            
+            HOST_CONCURRENCY.set(int(self.limit), host=self.name)
+            self._cond.notify_all()
+    
+    def _decrease(self):
+        # Halve at most once per round trip, so one burst of errors counts once
+        now = time.monotonic()
+        if now - self.last_decrease >= (self.latency or 0.1):
+            self.limit = max(MIN_LIMIT, self.limit / 2)
+            self.last_decrease = now
+    
+    def _record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            CIRCUIT_OPENS.inc(host=self.name)
+            print(f"[WARNING] Circuit open for {self.name} after {self.failures} failures, "
+                  f"pausing it for {self.cooldown:.0f}s")
+    
+    def snapshot(self):
+        """
+        Get the host's current control state.
+        
+        Returns:
+            dict: Limit, in-flight requests, circuit state and consecutive failures
+        """
+        with self._cond:
+            return {
+                'limit': round(self.limit, 2),
+                'in_flight': self.in_flight,
+                'state': self.state,
+                'failures': self.failures,
+                'latency': round(self.latency, 4) if self.latency is not None else None
+            }
+
+
+class HostRegistry:
+    """
+    Process-wide HostState per host, so all scrapers and threads fetching
+    from a host share its limit and circuit.
+    """
+    
+    def __init__(self, **host_options):
+        """
+        Args:
+            **host_options: Options for every new HostState
+        """
+        self.host_options = host_options
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    def get(self, url):
+        """
+        Get the state of a URL's host.
+        
+        Args:
+            url (str): Absolute URL
+        
+        Returns:
+            HostState: Shared state of the host
+        """
+        name = urlsplit(url).netloc.lower()
+        with self._lock:
+            host = self._hosts.get(name)
+            if host is None:
+                host = self._hosts[name] = HostState(name, **self.host_options)
+            return host
+    
+    def snapshot(self):
+        """
+        Get the control state of every host seen.
+        
+        Returns:
+            dict: Host name to HostState.snapshot()
+        """
+        with self._lock:
+            hosts = list(self._hosts.items())
+        return {name: host.snapshot() for name, host in sorted(hosts)}
+    
+    def reset(self, **host_options):
+        """
+        Forget all hosts, optionally with new options for the hosts created next.
+        """
+        with self._lock:
+            self._hosts = {}
+            if host_options:
+                self.host_options = host_options
+
+
+HOSTS = HostRegistry()
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import requests
+    
+    def fake_response(status, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers or {})
+        return response
+    
+    host = HostState('example.com', cooldown=0.5, failure_threshold=3)
+    for _ in range(20):
+        host.acquire()
+        host.release(fake_response(200), 0.05)
+    print(f"After 20 successes: {host.snapshot()}")
+    
+    time.sleep(0.1)
+    host.acquire()
+    host.release(fake_response(429, {'Retry-After': '1'}), 0.05)
+    print(f"After a 429: {host.snapshot()}")
+    started = time.monotonic()
+    host.acquire()
+    host.release(fake_response(200), 0.05)
+    print(f"Next request waited {time.monotonic() - started:.2f}s for Retry-After")
+    
+    for _ in range(3):
+        host.acquire()
+        host.release(None, 10)
+    print(f"After 3 failures: {host.snapshot()}, acquire allowed: {host.acquire()}")
+    time.sleep(0.6)
+    print(f"After cooldown, probe allowed: {host.acquire()}, second request allowed: {host.acquire()}")
+    host.release(fake_response(200), 0.05)
+    print(f"After a successful probe: {host.snapshot()}")
+    print(f"Retry-After as a date: {parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT')}")
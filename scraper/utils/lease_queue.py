@@ -0,0 +1,248 @@
+"""
+Lease Queue
+MongoDB-backed work queue that lets scraper workers on any node claim tasks
+"""
+
+import socket
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from utils.storage import ReturnDocument, ASCENDING, DESCENDING, DuplicateKeyError
+
+
+# How long a claimed task stays reserved without a heartbeat
+DEFAULT_LEASE_SECONDS = 300
+
+# Failed tasks are retried this many times before being parked
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def make_worker_id():
+    """
+    Build a worker id that is unique across processes and hosts.
+    
+    Returns:
+        str: Worker id of the form host:pid:suffix
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaseQueue:
+    """
+    Work queue stored in a MongoDB collection.
+    
+    Each task document moves through pending -> leased -> done (or failed).
+    Claims are a single atomic find_one_and_update, so any number of workers
+    can share one collection. A leased task whose lease expires without a
+    heartbeat is claimable again, which reassigns work from dead workers;
+    once it has used up its attempts it is parked as failed instead.
+    """
+    
+    def __init__(self, collection, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        Initialize the queue.
+        
+        Args:
+            collection: MongoDB collection holding the tasks
+            lease_seconds (int): Lease duration granted on claim and heartbeat
+            max_attempts (int): Attempts before a failing task is parked
+        """
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+    
+    def ensure_indexes(self):
+        """
+        Create the indexes used by claim().
+        """
+        self.collection.create_index([
+            ('status', ASCENDING),
+            ('priority', DESCENDING),
+            ('enqueued_at', ASCENDING)
+        ])
+        self.collection.create_index([('status', ASCENDING), ('lease_expires', ASCENDING)])
+    
+    def enqueue(self, task_id, kind, payload, priority=0, round_id=None):
+        """
+        Add a task, or re-open it if it already finished.
+        A task that is currently pending or leased is left untouched.
+        
+        Args:
+            task_id (str): Stable task id, e.g. "source:timeout.com/sydney"
+            kind (str): Task kind understood by the workers
+            payload (dict): Task arguments
+            priority (int): Higher priorities are claimed first
+            round_id (str, optional): Seeding round; a task that already
+                finished in this round is not re-opened
+        
+        Returns:
+            bool: True if the task was added or re-opened
+        """
+        # Upserting against a filter that excludes live tasks either re-opens a
+        # finished task or inserts a new one; a live task makes the insert
+        # collide on _id, which leaves it untouched
+        query = {'_id': task_id, 'status': {'$nin': ['pending', 'leased']}}
+        if round_id is not None:
+            query['round'] = {'$ne': round_id}
+        try:
+            self.collection.update_one(
+                query,
+                {'$set': {
+                    'kind': kind,
+                    'payload': payload,
+                    'priority': priority,
+                    'round': round_id,
+                    'status': 'pending',
+                    'attempts': 0,
+                    'enqueued_at': datetime.now(),
+                    'worker': None,
+                    'lease_expires': None,
+                    'error': None
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        
+        return True
+    
+    def claim(self, worker_id):
+        """
+        Atomically claim the next available task.
+        Pending tasks and leased tasks with an expired lease are both available,
+        unless the expired task has already crashed its workers max_attempts times.
+        
+        Args:
+            worker_id (str): Id of the claiming worker
+        
+        Returns:
+            dict: Claimed task document, or None if the queue is drained
+        """
+        now = datetime.now()
+        return self.collection.find_one_and_update(
+            {'$or': [
+                {'status': 'pending'},
+                {
+                    'status': 'leased',
+                    'lease_expires': {'$lt': now},
+                    'attempts': {'$lt': self.max_attempts}
+                }
+            ]},
+            {
+                '$set': {
+                    'status': 'leased',
+                    'worker': worker_id,
+                    'leased_at': now,
+                    'lease_expires': now + timedelta(seconds=self.lease_seconds)
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('priority', DESCENDING), ('enqueued_at', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    def heartbeat(self, task, worker_id):
+        """
+        Extend the lease on a task the worker still holds.
+        
+        Args:
+            task (dict): Claimed task document
+            worker_id (str): Id of the worker holding the lease
+        
+        Returns:
+            bool: False if the lease was lost to another worker
+        """
+        result = self.collection.update_one(
+            {'_id': task['_id'], 'status': 'leased', 'worker': worker_id},
+            {'$set': {'lease_expires': datetime.now() + timedelta(seconds=self.lease_seconds)}}
+        )
+        return result.matched_count == 1
+    
+    def complete(self, task, worker_id, result=None):
+        """
+        Mark a task as done.
+        
+        Args:
+            task (dict): Claimed task document
+            worker_id (str): Id of the worker holding the lease
+            result (dict, optional): Summary stored on the task
+        
+        Returns:
+            bool: False if the lease was lost before completion
+        """
+        update = self.collection.update_one(
+            {'_id': task['_id'], 'status': 'leased', 'worker': worker_id},
+            {'$set': {
+                'status': 'done',
+                'finished_at': datetime.now(),
+                'lease_expires': None,
+                'result': result
+            }}
+        )
+        return update.matched_count == 1
+    
+    def fail(self, task, worker_id, error):
+        """
+        Release a task after an error, parking it once it runs out of attempts.
+        
+        Args:
+            task (dict): Claimed task document
+            worker_id (str): Id of the worker holding the lease
+            error (str): Error message stored on the task
+        
+        Returns:
+            bool: False if the lease was lost before the failure was recorded
+        """
+        exhausted = task.get('attempts', 1) >= self.max_attempts
+        update = self.collection.update_one(
+            {'_id': task['_id'], 'status': 'leased', 'worker': worker_id},
+            {'$set': {
+                'status': 'failed' if exhausted else 'pending',
+                'worker': None,
+                'lease_expires': None,
+                'error': error
+            }}
+        )
+        return update.matched_count == 1
+    
+    def park_expired(self):
+        """
+        Park tasks whose lease expired on their last attempt: their worker died
+        and claim() no longer hands them out, so they would stay leased forever.
+        
+        Returns:
+            list: Parked task documents
+        """
+        parked = []
+        while True:
+            task = self.collection.find_one_and_update(
+                {
+                    'status': 'leased',
+                    'lease_expires': {'$lt': datetime.now()},
+                    'attempts': {'$gte': self.max_attempts}
+                },
+                {'$set': {
+                    'status': 'failed',
+                    'worker': None,
+                    'lease_expires': None,
+                    'error': 'Lease expired on the last attempt'
+                }},
+                return_document=ReturnDocument.AFTER
+            )
+            if task is None:
+                return parked
+            parked.append(task)
+    
+    def stats(self):
+        """
+        Count tasks by status.
+        
+        Returns:
+            dict: Mapping of status to task count
+        """
+        counts = self.collection.aggregate([
+            {'$group': {'_id': '$status', 'count': {'$sum': 1}}}
+        ])
+        return {row['_id']: row['count'] for row in counts}
@@ -0,0 +1,425 @@
+"""
+Metrics Utility
+Counters, gauges and stage timers with Prometheus and JSON export
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _label_key(labels):
+    """Turn a labels dict into a hashable, ordered key."""
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    """Render a label key in Prometheus text format."""
+    pairs = list(key) + (extra or [])
+    if not pairs:
+        return ''
+    rendered = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        )
+        for name, value in pairs
+    )
+    return '{' + rendered + '}'
+
+
+class Metric:
+    """
+    Base class for a named metric with optional labels.
+    """
+    
+    kind = 'untyped'
+    
+    def __init__(self, name, documentation, lock):
+        self.name = name
+        self.documentation = documentation
+        self._lock = lock
+        self._values = {}
+    
+    def render(self):
+        """
+        Render the metric in Prometheus text format.
+        
+        Returns:
+            list: Lines of the exposition
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}"
+        ]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+    
+    def snapshot(self):
+        """
+        Get the current values keyed by rendered labels.
+        
+        Returns:
+            dict: Mapping of label string to value
+        """
+        return {_format_labels(key): value for key, value in self._values.items()}
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing count, e.g. pages fetched.
+    """
+    
+    kind = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        """
+        Increase the counter.
+        
+        Args:
+            amount (float): Amount to add
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down, e.g. queue depth.
+    """
+    
+    kind = 'gauge'
+    
+    def set(self, value, **labels):
+        """
+        Set the gauge.
+        
+        Args:
+            value (float): New value
+            **labels: Label values
+        """
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values, e.g. stage durations in seconds.
+    """
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, lock, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, lock)
+        self.buckets = tuple(buckets)
+    
+    def observe(self, value, **labels):
+        """
+        Record an observation.
+        
+        Args:
+            value (float): Observed value
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {
+                    'buckets': [0] * len(self.buckets),
+                    'sum': 0.0,
+                    'count': 0
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+    
+    @contextmanager
+    def time(self, **labels):
+        """
+        Time a block of code and observe its duration in seconds.
+        
+        Args:
+            **labels: Label values
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}"
+        ]
+        for key, state in sorted(self._values.items()):
+            for bound, count in zip(self.buckets, state['buckets']):
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {state['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {state['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {state['count']}")
+        return lines
+    
+    def snapshot(self):
+        return {
+            _format_labels(key): {'sum': state['sum'], 'count': state['count']}
+            for key, state in self._values.items()
+        }
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics for one process.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+    
+    def _register(self, cls, name, documentation, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, documentation, self._lock, **kwargs)
+            return self._metrics[name]
+    
+    def counter(self, name, documentation):
+        """Get or create a counter."""
+        return self._register(Counter, name, documentation)
+    
+    def gauge(self, name, documentation):
+        """Get or create a gauge."""
+        return self._register(Gauge, name, documentation)
+    
+    def histogram(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        """Get or create a histogram."""
+        return self._register(Histogram, name, documentation, buckets=buckets)
+    
+    def render_prometheus(self):
+        """
+        Render all metrics in Prometheus text exposition format.
+        
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            lines = []
+            for metric in self._metrics.values():
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+    
+    def snapshot(self):
+        """
+        Get the current value of every metric.
+        
+        Returns:
+            dict: Mapping of metric name to its label values
+        """
+        with self._lock:
+            return {name: metric.snapshot() for name, metric in self._metrics.items()}
+    
+    def export(self, since=None):
+        """
+        Get the raw state of every metric, to merge into another process's registry.
+        
+        Args:
+            since (dict, optional): Earlier export; counters and histograms then
+                hold only what was recorded after it
+        
+        Returns:
+            dict: Mapping of metric name to its values by label key
+        """
+        since = since or {}
+        exported = {}
+        with self._lock:
+            for name, metric in self._metrics.items():
+                earlier = since.get(name, {})
+                values = exported[name] = {}
+                for key, value in metric._values.items():
+                    base = earlier.get(key)
+                    if isinstance(metric, Histogram):
+                        if base is None:
+                            values[key] = dict(value, buckets=list(value['buckets']))
+                        elif value['count'] > base['count']:
+                            values[key] = {
+                                'buckets': [a - b for a, b in zip(value['buckets'], base['buckets'])],
+                                'sum': value['sum'] - base['sum'],
+                                'count': value['count'] - base['count']
+                            }
+                    elif isinstance(metric, Counter):
+                        if value != (base or 0):
+                            values[key] = value - (base or 0)
+                    else:
+                        values[key] = value
+        return exported
+    
+    def merge(self, state, **labels):
+        """
+        Add metrics exported by another process, e.g. a city shard. Counters
+        and histograms are summed, gauges take the exported value.
+        
+        Args:
+            state (dict): Result of export() in the other process
+            **labels: Labels added to every merged value
+        """
+        with self._lock:
+            for name, values in state.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                for key, value in values.items():
+                    key = _label_key({**dict(key), **labels})
+                    if isinstance(metric, Histogram):
+                        current = metric._values.setdefault(
+                            key, {'buckets': [0] * len(metric.buckets), 'sum': 0.0, 'count': 0}
+                        )
+                        current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+                        current['sum'] += value['sum']
+                        current['count'] += value['count']
+                    elif isinstance(metric, Counter):
+                        metric._values[key] = metric._values.get(key, 0) + value
+                    else:
+                        metric._values[key] = value
+
+
+# Process-wide registry and the metrics recorded by the scraper pipeline
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram('scraper_stage_seconds', 'Time spent in each pipeline stage')
+PAGES_FETCHED = REGISTRY.counter('scraper_pages_fetched_total', 'Pages fetched successfully')
+BYTES_FETCHED = REGISTRY.counter('scraper_bytes_fetched_total', 'Response bytes fetched')
+FETCH_RETRIES = REGISTRY.counter('scraper_fetch_retries_total', 'Failed fetch attempts that were retried')
+FETCH_FAILURES = REGISTRY.counter('scraper_fetch_failures_total', 'Fetches that failed after all retries')
+EVENTS_SCRAPED = REGISTRY.counter('scraper_events_scraped_total', 'Events produced by scrapers')
+EVENTS_SAVED = REGISTRY.counter('scraper_events_saved_total', 'Events written to the database by result')
+EVENTS_REJECTED = REGISTRY.counter('scraper_events_rejected_total', 'Events quarantined by failed validation rule')
+EVENTS_NORMALIZED = REGISTRY.counter('scraper_events_normalized_total', 'Event fields truncated or cleared to pass validation, by rule')
+CACHE_HITS = REGISTRY.counter('scraper_cache_hits_total', 'Lookups answered from a cache instead of the network')
+QUEUE_DEPTH = REGISTRY.gauge('scraper_queue_depth', 'Items waiting in a pipeline queue')
+HOST_CONCURRENCY = REGISTRY.gauge('scraper_host_concurrency_limit', 'Adaptive concurrent request limit per host')
+CIRCUIT_OPENS = REGISTRY.counter('scraper_circuit_opens_total', 'Times a host circuit breaker opened')
+RUNS = REGISTRY.counter('scraper_runs_total', 'Completed scraper runs')
+
+
+def diff_snapshots(before, after):
+    """
+    Compute what changed between two registry snapshots.
+    Counters and histograms are reported as deltas, gauges as their latest value.
+    
+    Args:
+        before (dict): Earlier snapshot
+        after (dict): Later snapshot
+    
+    Returns:
+        dict: Per-run metric values
+    """
+    delta = {}
+    for name, values in after.items():
+        earlier = before.get(name, {})
+        delta[name] = {}
+        for labels, value in values.items():
+            if isinstance(value, dict):
+                base = earlier.get(labels, {'sum': 0.0, 'count': 0})
+                delta[name][labels] = {
+                    'sum': round(value['sum'] - base['sum'], 6),
+                    'count': value['count'] - base['count']
+                }
+            elif name in (QUEUE_DEPTH.name, HOST_CONCURRENCY.name):
+                delta[name][labels] = value
+            else:
+                delta[name][labels] = value - earlier.get(labels, 0)
+    return delta
+
+
+def write_run_report(report_dir, started_at, before, extra=None, registry=REGISTRY, run_id=None):
+    """
+    Write a JSON report of the metrics recorded during one run.
+    
+    Args:
+        report_dir (str): Directory to write the report into
+        started_at (datetime): Run start time
+        before (dict): Registry snapshot taken at run start
+        extra (dict, optional): Additional fields to include
+        registry (MetricsRegistry): Registry to report on
+        run_id (str, optional): Id of the run, so that runs started in the same
+            second (e.g. by parallel workers) get their own reports
+    
+    Returns:
+        str: Path of the written report
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    finished_at = datetime.now()
+    
+    report = {
+        'started_at': started_at.isoformat(),
+        'finished_at': finished_at.isoformat(),
+        'duration_seconds': round((finished_at - started_at).total_seconds(), 3),
+        'metrics': diff_snapshots(before, registry.snapshot())
+    }
+    if extra:
+        report.update(extra)
+    
+    name = run_id or started_at.strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(report_dir, f"run-{name}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    
+    return path
+
+
+def start_metrics_server(port, host='127.0.0.1', registry=REGISTRY):
+    """
+    Serve the registry at /metrics from a background thread.
+    
+    Args:
+        port (int): Port to listen on
+        host (str): Interface to bind
+        registry (MetricsRegistry): Registry to expose
+    
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            # Keep scrape requests out of the scheduler log
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    PAGES_FETCHED.inc(source='example.com')
+    BYTES_FETCHED.inc(5120, source='example.com')
+    QUEUE_DEPTH.set(3, queue='events')
+    
+    with STAGE_SECONDS.time(stage='parse'):
+        time.sleep(0.01)
+    
+    print(REGISTRY.render_prometheus())
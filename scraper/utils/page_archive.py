@@ -0,0 +1,419 @@
+"""
+Raw Page Archive
+Content-addressed, compressed store of fetched pages, replayable without network
+
+Layout under the archive directory:
+
+    blobs/<aa>/<sha256>.zst   page bodies, zstd (zlib '.zz' when zstandard is missing)
+    dicts/<id>.zdict          trained zstd dictionaries; CURRENT names the active one
+    runs/<run_id>.jsonl       one line per fetch: url, source, sha256, status, headers
+
+Identical bodies are stored once. Listing pages share most of their markup,
+so a dictionary trained on earlier pages compresses new ones far better than
+plain zstd; each zstd frame records the id of the dictionary it was made with.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from datetime import datetime
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# Pages are compressed as they are fetched, so a fast level; the dictionary
+# does most of the work on listing pages
+ZSTD_LEVEL = int(os.getenv('PAGE_ARCHIVE_ZSTD_LEVEL', 3))
+DICTIONARY_SIZE = 112_640
+
+# Response headers kept for replay
+KEPT_HEADERS = ('Content-Type', 'Content-Encoding', 'Retry-After', 'ETag', 'Last-Modified')
+
+# Last run id handed out by this process, and how often it was
+_last_run_id = [None, 0]
+_run_id_lock = threading.Lock()
+
+
+def make_run_id(now=None):
+    """
+    Build a sortable id for a scraper run. Runs started by one process in
+    the same second (e.g. a worker's short tasks) get a sequence suffix.
+    
+    Returns:
+        str: Run id, e.g. '20260301-061500-4821', then '20260301-061500-4821-2'
+    """
+    run_id = f"{(now or datetime.now()).strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    with _run_id_lock:
+        if _last_run_id[0] == run_id:
+            _last_run_id[1] += 1
+            return f"{run_id}-{_last_run_id[1]}"
+        _last_run_id[0], _last_run_id[1] = run_id, 1
+    return run_id
+
+
+class PageArchive:
+    """
+    Archive of raw page bodies plus a per-run log of what was fetched.
+    """
+    
+    def __init__(self, root):
+        """
+        Open (or create) an archive.
+        
+        Args:
+            root (str): Archive directory
+        """
+        self.root = root
+        self._lock = threading.Lock()
+        self._run_files = {}
+        self._dictionaries = {}
+        self._compressor = None
+        self._dict_id = 0
+        
+        for sub in ('blobs', 'dicts', 'runs'):
+            os.makedirs(os.path.join(root, sub), exist_ok=True)
+        
+        if ZSTD_AVAILABLE:
+            self._load_current_dictionary()
+    
+    def _load_current_dictionary(self):
+        try:
+            with open(os.path.join(self.root, 'dicts', 'CURRENT')) as f:
+                dict_id = int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            dict_id = 0
+        
+        dictionary = self._dictionary(dict_id) if dict_id else None
+        self._dict_id = dict_id if dictionary else 0
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary)
+    
+    def _dictionary(self, dict_id):
+        if dict_id not in self._dictionaries:
+            path = os.path.join(self.root, 'dicts', f'{dict_id}.zdict')
+            with open(path, 'rb') as f:
+                self._dictionaries[dict_id] = zstandard.ZstdCompressionDict(f.read())
+        return self._dictionaries[dict_id]
+    
+    def _compress(self, body):
+        if ZSTD_AVAILABLE:
+            return self._compressor.compress(body), '.zst'
+        return zlib.compress(body, 9), '.zz'
+    
+    def _decompress(self, data, suffix):
+        if suffix == '.zz':
+            return zlib.decompress(data)
+        
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is required to read .zst archive blobs")
+        
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        dictionary = self._dictionary(dict_id) if dict_id else None
+        return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(data)
+    
+    def train_dictionary(self, max_samples=2000):
+        """
+        Train a zstd dictionary on stored pages and use it for new blobs.
+        
+        Args:
+            max_samples (int): Most recent pages to train on
+        
+        Returns:
+            int: Dictionary id, or 0 if there was not enough data
+        """
+        if not ZSTD_AVAILABLE:
+            print("[SKIP] zstandard not installed, dictionary training unavailable")
+            return 0
+        
+        paths = sorted(self._blob_paths(), key=os.path.getmtime, reverse=True)[:max_samples]
+        samples = [self._read_blob(path) for path in paths]
+        if len(samples) < 8:
+            print(f"[SKIP] Need at least 8 pages to train a dictionary, have {len(samples)}")
+            return 0
+        
+        try:
+            dictionary = zstandard.train_dictionary(DICTIONARY_SIZE, samples)
+        except zstandard.ZstdError as e:
+            print(f"[ERROR] Dictionary training failed: {e}")
+            return 0
+        
+        dict_id = dictionary.dict_id()
+        with open(os.path.join(self.root, 'dicts', f'{dict_id}.zdict'), 'wb') as f:
+            f.write(dictionary.as_bytes())
+        self._write_atomic(os.path.join(self.root, 'dicts', 'CURRENT'), f'{dict_id}\n'.encode('ascii'))
+        
+        with self._lock:
+            self._load_current_dictionary()
+        
+        print(f"[OK] Trained dictionary {dict_id} on {len(samples)} pages")
+        return dict_id
+    
+    def _blob_path(self, digest, suffix):
+        return os.path.join(self.root, 'blobs', digest[:2], digest + suffix)
+    
+    def _blob_paths(self):
+        for directory, _, files in os.walk(os.path.join(self.root, 'blobs')):
+            for name in files:
+                if not name.startswith('.'):
+                    yield os.path.join(directory, name)
+    
+    def _read_blob(self, path):
+        with open(path, 'rb') as f:
+            return self._decompress(f.read(), os.path.splitext(path)[1])
+    
+    def _write_atomic(self, path, data):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def put(self, body):
+        """
+        Store a body unless an identical one is already archived.
+        
+        Args:
+            body (bytes): Raw page body
+        
+        Returns:
+            str: SHA-256 of the body
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        for suffix in ('.zst', '.zz'):
+            if os.path.exists(self._blob_path(digest, suffix)):
+                return digest
+        
+        with self._lock:
+            data, suffix = self._compress(body)
+        self._write_atomic(self._blob_path(digest, suffix), data)
+        return digest
+    
+    def get(self, digest):
+        """
+        Read a body by its hash.
+        
+        Args:
+            digest (str): SHA-256 of the body
+        
+        Returns:
+            bytes: Raw page body
+        """
+        for suffix in ('.zst', '.zz'):
+            path = self._blob_path(digest, suffix)
+            if os.path.exists(path):
+                return self._read_blob(path)
+        raise KeyError(digest)
+    
+    def record(self, run_id, source, response):
+        """
+        Archive a fetched response under a run.
+        
+        Args:
+            run_id (str): Run the fetch belongs to
+            source (str): Source name
+            response (requests.Response): Successful response
+        """
+        entry = {
+            'url': response.request.url if response.request is not None else response.url,
+            'final_url': response.url,
+            'source': source,
+            'sha256': self.put(response.content),
+            'status': response.status_code,
+            'reason': response.reason,
+            'encoding': response.encoding,
+            'headers': {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers},
+            'fetched_at': datetime.now().isoformat()
+        }
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        
+        with self._lock:
+            f = self._run_files.get(run_id)
+            if f is None:
+                f = open(os.path.join(self.root, 'runs', f'{run_id}.jsonl'), 'a', encoding='utf-8')
+                self._run_files[run_id] = f
+            f.write(line)
+            f.flush()
+    
+    def close(self):
+        """Close open run logs."""
+        with self._lock:
+            for f in self._run_files.values():
+                f.close()
+            self._run_files = {}
+    
+    def list_runs(self):
+        """
+        List archived runs.
+        
+        Returns:
+            list: Run ids, oldest first
+        """
+        return sorted(
+            name[:-len('.jsonl')]
+            for name in os.listdir(os.path.join(self.root, 'runs'))
+            if name.endswith('.jsonl')
+        )
+    
+    def resolve_run(self, run_id):
+        """
+        Resolve 'latest' to the newest run id.
+        
+        Args:
+            run_id (str): Run id, or 'latest'
+        
+        Returns:
+            str: Run id
+        """
+        if run_id != 'latest':
+            return run_id
+        runs = self.list_runs()
+        if not runs:
+            raise FileNotFoundError("Archive has no runs")
+        return runs[-1]
+    
+    def iter_run(self, run_id):
+        """
+        Iterate over the fetch log of a run in fetch order.
+        
+        Args:
+            run_id (str): Run id, or 'latest'
+        
+        Yields:
+            dict: Log entries
+        """
+        path = os.path.join(self.root, 'runs', f'{self.resolve_run(run_id)}.jsonl')
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    def load_run(self, run_id):
+        """
+        Load the fetch log of a run, keyed by requested URL (last fetch wins).
+        
+        Args:
+            run_id (str): Run id, or 'latest'
+        
+        Returns:
+            dict: URL to log entry
+        """
+        return {entry['url']: entry for entry in self.iter_run(run_id)}
+    
+    def stats(self):
+        """
+        Summarize archive size.
+        
+        Returns:
+            dict: Blob count, stored bytes and run count
+        """
+        paths = list(self._blob_paths())
+        return {
+            'blobs': len(paths),
+            'stored_bytes': sum(os.path.getsize(path) for path in paths),
+            'runs': len(self.list_runs()),
+            'dictionary': self._dict_id
+        }
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Requests transport adapter that fetches from the network and records every
+    response, errors and 429s included, as a replayable archive run (a fixture).
+    """
+    
+    def __init__(self, archive, run_id, source='fixtures', **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+        self.run_id = run_id
+        self.source = source
+    
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.archive.record(self.run_id, self.source, response)
+        return response
+
+
+class ArchiveReplayAdapter(BaseAdapter):
+    """
+    Requests transport adapter that answers from an archived run instead of the network.
+    A URL fetched several times replays its responses in the recorded order, then
+    keeps returning the last one; URLs that were not fetched in that run get a 404.
+    """
+    
+    def __init__(self, archive, run_id):
+        super().__init__()
+        self.archive = archive
+        self.run_id = archive.resolve_run(run_id)
+        self.entries = {}
+        for entry in archive.iter_run(self.run_id):
+            self.entries.setdefault(entry['url'], []).append(entry)
+        self._positions = {}
+        self._lock = threading.Lock()
+    
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        
+        recorded = self.entries.get(request.url)
+        if recorded is None:
+            response.status_code = 404
+            response.reason = 'Not Archived'
+            response._content = b''
+            return response
+        
+        with self._lock:
+            position = self._positions.get(request.url, 0)
+            self._positions[request.url] = position + 1
+        entry = recorded[min(position, len(recorded) - 1)]
+        
+        response.status_code = entry['status']
+        response.reason = entry.get('reason') or 'OK'
+        response.url = entry.get('final_url') or request.url
+        response.encoding = entry.get('encoding')
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        # Bodies are archived decoded, so the original transfer encoding no longer applies
+        response.headers.pop('Content-Encoding', None)
+        response._content = self.archive.get(entry['sha256'])
+        return response
+    
+    def close(self):
+        pass
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Inspect a raw page archive')
+    parser.add_argument('archive_dir', help='Archive directory')
+    parser.add_argument('--train', action='store_true', help='Train a compression dictionary on stored pages')
+    args = parser.parse_args()
+    
+    archive = PageArchive(args.archive_dir)
+    if args.train:
+        archive.train_dictionary()
+    
+    stats = archive.stats()
+    print(f"zstandard available: {ZSTD_AVAILABLE}")
+    print(f"Blobs: {stats['blobs']} ({stats['stored_bytes'] / 1024:.1f} KB)")
+    print(f"Runs: {stats['runs']}")
+    print(f"Dictionary: {stats['dictionary'] or 'none'}")
+    for run_id in archive.list_runs()[-5:]:
+        print(f"  {run_id}: {len(archive.load_run(run_id))} pages")
@@ -0,0 +1,188 @@
+"""
+Profiling Utility
+Per-stage CPU profiles and allocation reports for scraper runs
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+    SAMPLING_AVAILABLE = True
+except ImportError:
+    SAMPLING_AVAILABLE = False
+
+
+# Number of entries written to the text reports
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+
+class RunProfiler:
+    """
+    Profiles one scraper run, writing results into a run directory.
+    
+    Each stage gets its own profiler, so the output shows where a run spent
+    its time per source and per stage without post-processing. Only one
+    stage is profiled at a time; a stage opened inside another stage is
+    attributed to the outer one. tracemalloc runs for the whole run and
+    produces a top-allocation report at the end.
+    """
+    
+    def __init__(self, output_dir, mode='auto', trace_allocations=True):
+        """
+        Initialize the profiler.
+        
+        Args:
+            output_dir (str): Run directory for the profile files
+            mode (str): 'cprofile', 'sampling' or 'auto' (sampling when pyinstrument is installed)
+            trace_allocations (bool): Record allocations with tracemalloc
+        """
+        if mode == 'auto':
+            mode = 'sampling' if SAMPLING_AVAILABLE else 'cprofile'
+        if mode == 'sampling' and not SAMPLING_AVAILABLE:
+            raise ValueError("Sampling mode requires pyinstrument")
+        
+        self.output_dir = output_dir
+        self.mode = mode
+        self.trace_allocations = trace_allocations
+        self.stage_times = {}
+        self._active = None
+        self._combined = None
+    
+    def __enter__(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.trace_allocations:
+            tracemalloc.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self.trace_allocations:
+            self._write_allocations()
+            tracemalloc.stop()
+        self._write_summary()
+        return False
+    
+    @contextmanager
+    def stage(self, name, source=None):
+        """
+        Profile a pipeline stage.
+        
+        Args:
+            name (str): Stage name, e.g. 'scrape' or 'db_write'
+            source (str, optional): Source the stage runs for
+        """
+        if self._active is not None:
+            yield
+            return
+        
+        label = name if not source else f"{name}-{_safe_name(source)}"
+        self._active = label
+        profiler = self._start()
+        start = time.perf_counter()
+        
+        try:
+            yield
+        finally:
+            self.stage_times[label] = self.stage_times.get(label, 0) + time.perf_counter() - start
+            self._stop(profiler, label)
+            self._active = None
+    
+    def _start(self):
+        if self.mode == 'sampling':
+            profiler = SamplingProfiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+    
+    def _stop(self, profiler, label):
+        path = os.path.join(self.output_dir, label)
+        
+        if self.mode == 'sampling':
+            profiler.stop()
+            with open(f"{path}.txt", 'w') as f:
+                f.write(profiler.output_text(unicode=False, color=False))
+            with open(f"{path}.html", 'w') as f:
+                f.write(profiler.output_html())
+            return
+        
+        profiler.disable()
+        profiler.dump_stats(f"{path}.prof")
+        
+        if self._combined is None:
+            self._combined = pstats.Stats(profiler)
+        else:
+            self._combined.add(profiler)
+    
+    def _write_summary(self):
+        with open(os.path.join(self.output_dir, 'summary.txt'), 'w') as f:
+            f.write(f"Profile mode: {self.mode}\n")
+            f.write("Stage times (seconds):\n")
+            for label, seconds in sorted(self.stage_times.items(), key=lambda item: -item[1]):
+                f.write(f"  {label}: {seconds:.3f}\n")
+            
+            if self._combined is not None:
+                self._combined.dump_stats(os.path.join(self.output_dir, 'run.prof'))
+                
+                stream = io.StringIO()
+                self._combined.stream = stream
+                self._combined.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+                f.write("\nTop functions (cumulative):\n")
+                f.write(stream.getvalue())
+    
+    def _write_allocations(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        current, peak = tracemalloc.get_traced_memory()
+        
+        with open(os.path.join(self.output_dir, 'allocations.txt'), 'w') as f:
+            f.write(f"Current traced memory: {current / 1024:.1f} KiB\n")
+            f.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n\n")
+            f.write(f"Top {TOP_ALLOCATIONS} allocation sites:\n")
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+                f.write(f"  {stat}\n")
+
+
+def _safe_name(name):
+    """Turn a source name such as 'timeout.com/sydney' into a file-safe label."""
+    return ''.join(c if c.isalnum() or c in '.-_' else '_' for c in name)
+
+
+def make_run_dir(base_dir):
+    """
+    Build a timestamped run directory path.
+    
+    Args:
+        base_dir (str): Directory holding all profiled runs
+    
+    Returns:
+        str: Path for this run's profiles
+    """
+    return os.path.join(base_dir, datetime.now().strftime('%Y%m%d-%H%M%S'))
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import tempfile
+    
+    output_dir = make_run_dir(tempfile.gettempdir())
+    
+    with RunProfiler(output_dir) as profiler:
+        with profiler.stage('build', source='example.com/demo'):
+            data = [str(i) * 10 for i in range(100000)]
+        with profiler.stage('sort'):
+            data.sort()
+    
+    print(f"Profiles written to: {output_dir}")
+    for name in sorted(os.listdir(output_dir)):
+        print(f"  {name}")
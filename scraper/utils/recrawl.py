@@ -0,0 +1,175 @@
+"""
+Recrawl Planner
+Schedules detail-page refreshes for stored events within a per-run fetch budget
+"""
+
+import heapq
+import math
+from datetime import datetime
+
+
+# Events this many days away get half the proximity weight of events today
+PROXIMITY_HALF_LIFE_DAYS = 7
+
+# Events checked more recently than this are not worth refreshing yet
+MIN_RECHECK_HOURS = 6
+
+# Default number of detail pages fetched per run
+DEFAULT_FETCH_BUDGET = 20
+
+
+def proximity_score(event_date, now=None):
+    """
+    Score an event by how close its date is.
+    
+    Args:
+        event_date (datetime): Event date
+        now (datetime, optional): Reference time
+    
+    Returns:
+        float: 1.0 for an event happening now, decaying towards 0.0
+    """
+    if not event_date:
+        return 0.0
+    
+    now = now or datetime.now()
+    days_until = (event_date - now).total_seconds() / 86400
+    
+    # Past events are expired by cleanup, never refreshed
+    if days_until < 0:
+        return 0.0
+    
+    return math.pow(0.5, days_until / PROXIMITY_HALF_LIFE_DAYS)
+
+
+def volatility_score(event):
+    """
+    Score an event by how often its content has changed when refreshed.
+    Uses a smoothed change rate so that events with no history start at 0.5.
+    
+    Args:
+        event (dict): Stored event document
+    
+    Returns:
+        float: Estimated probability that a refresh finds a change
+    """
+    changes = event.get('change_count', 0)
+    checks = event.get('check_count', 0)
+    
+    return (changes + 1) / (checks + 2)
+
+
+def staleness_factor(event, now=None):
+    """
+    Scale down events that were refreshed recently.
+    
+    Args:
+        event (dict): Stored event document
+        now (datetime, optional): Reference time
+    
+    Returns:
+        float: 0.0 for an event checked just now, 1.0 once it is stale
+    """
+    last_checked = event.get('last_checked')
+    if not last_checked:
+        return 1.0
+    
+    now = now or datetime.now()
+    hours_since = (now - last_checked).total_seconds() / 3600
+    
+    return max(0.0, min(1.0, hours_since / MIN_RECHECK_HOURS))
+
+
+def score_event(event, now=None):
+    """
+    Compute the refresh priority of a stored event.
+    
+    Args:
+        event (dict): Stored event document
+        now (datetime, optional): Reference time
+    
+    Returns:
+        float: Refresh priority, higher is more urgent
+    """
+    now = now or datetime.now()
+    
+    return (
+        proximity_score(event.get('date'), now)
+        * volatility_score(event)
+        * staleness_factor(event, now)
+    )
+
+
+def plan_recrawl(events, budget=DEFAULT_FETCH_BUDGET, now=None):
+    """
+    Pick the events whose detail pages should be refreshed this run.
+    
+    Args:
+        events (list): Stored event documents
+        budget (int): Maximum number of detail pages to fetch
+        now (datetime, optional): Reference time
+    
+    Returns:
+        list: Events to refresh, most urgent first
+    """
+    if budget <= 0:
+        return []
+    
+    now = now or datetime.now()
+    
+    scored = (
+        (score_event(event, now), index, event)
+        for index, event in enumerate(events)
+        if event.get('ticket_url')
+    )
+    top = heapq.nlargest(budget, scored)
+    
+    return [event for score, _, event in top if score > 0]
+
+
+def record_refresh(collection, event, changes):
+    """
+    Store the outcome of a detail-page refresh.
+    
+    Args:
+        collection: MongoDB events collection
+        event (dict): Stored event document that was refreshed
+        changes (dict): Fields whose value changed (empty if unchanged)
+    """
+    now = datetime.now()
+    update = {
+        '$set': {'last_checked': now},
+        '$inc': {'check_count': 1}
+    }
+    
+    if changes:
+        update['$set'].update(changes)
+        update['$set']['last_updated'] = now
+        update['$inc']['change_count'] = 1
+    
+    collection.update_one({'_id': event['_id']}, update)
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    from datetime import timedelta
+    
+    now = datetime.now()
+    stored = [
+        {'title': 'Tonight', 'date': now + timedelta(hours=6), 'ticket_url': 'https://example.com/a'},
+        {'title': 'Next week', 'date': now + timedelta(days=7), 'ticket_url': 'https://example.com/b',
+         'change_count': 3, 'check_count': 4},
+        {'title': 'In three months', 'date': now + timedelta(days=90), 'ticket_url': 'https://example.com/c'},
+        {'title': 'Just checked', 'date': now + timedelta(days=1), 'ticket_url': 'https://example.com/d',
+         'last_checked': now},
+    ]
+    
+    print("Testing Recrawl Planner:")
+    print("=" * 50)
+    
+    for event in stored:
+        print(f"{event['title']}: {score_event(event, now):.4f}")
+    
+    print("-" * 50)
+    plan = plan_recrawl(stored, budget=2, now=now)
+    print(f"Planned refreshes: {[event['title'] for event in plan]}")
@@ -0,0 +1,179 @@
+"""
+Run Diff
+Compares the events seen this run with the stored active set and retires
+events that vanished from their source
+"""
+
+import os
+from datetime import datetime
+
+
+# Consecutive runs an event may be missing from its source before it is deactivated
+DEFAULT_GRACE_RUNS = 3
+
+# Incremental crawls stop at known events, so their sources are never diffed;
+# a source crawls every page at least once in this many runs (0 never forces it)
+FULL_CRAWL_EVERY = int(os.getenv('FULL_CRAWL_EVERY', 4))
+
+
+def sorted_difference(left, right):
+    """
+    Items of a sorted sequence that are not in another sorted sequence.
+    
+    Args:
+        left (list): Sorted items
+        right (list): Sorted items
+    
+    Returns:
+        list: Items of left missing from right, in order
+    """
+    missing = []
+    j = 0
+    for item in left:
+        while j < len(right) and right[j] < item:
+            j += 1
+        if j == len(right) or right[j] != item:
+            missing.append(item)
+    return missing
+
+
+def diff_source(events_collection, source, seen, grace_runs=DEFAULT_GRACE_RUNS, now=None):
+    """
+    Diff one source's stored active events against the hashes seen this run,
+    and apply the result with bulk updates.
+    
+    Args:
+        events_collection: MongoDB events collection
+        source (str): Source that was scraped successfully this run
+        seen (list): Sorted hashes seen this run, across all sources
+        grace_runs (int): Missed runs before an event is deactivated
+        now (datetime, optional): Reference time
+    
+    Returns:
+        dict: Compact report for the source
+    """
+    now = now or datetime.now()
+    
+    stored = list(events_collection.find(
+        {'source': source, 'is_active': True, 'date': {'$gte': now}},
+        {'_id': 0, 'event_hash': 1, 'missed_runs': 1}
+    ).sort('event_hash', 1))
+    missed_before = {e['event_hash']: e.get('missed_runs', 0) for e in stored}
+    
+    stored_hashes = [e['event_hash'] for e in stored]
+    missing = sorted_difference(stored_hashes, seen)
+    missing_set = set(missing)
+    
+    vanished = [h for h in missing if missed_before[h] + 1 >= grace_runs]
+    pending = [h for h in missing if missed_before[h] + 1 < grace_runs]
+    restored = [h for h in stored_hashes if missed_before[h] and h not in missing_set]
+    
+    if pending:
+        events_collection.update_many(
+            {'event_hash': {'$in': pending}},
+            {'$inc': {'missed_runs': 1}}
+        )
+    if vanished:
+        events_collection.update_many(
+            {'event_hash': {'$in': vanished}},
+            {
+                '$set': {'is_active': False, 'deactivated_reason': 'vanished', 'last_updated': now},
+                '$inc': {'missed_runs': 1}
+            }
+        )
+    if restored:
+        events_collection.update_many(
+            {'event_hash': {'$in': restored}},
+            {'$set': {'missed_runs': 0}}
+        )
+    
+    return {
+        'stored': len(stored_hashes),
+        'missed': len(pending),
+        'deactivated': len(vanished),
+        'restored': len(restored),
+        'deactivated_hashes': vanished
+    }
+
+
+def diff_run(events_collection, seen_by_source, grace_runs=DEFAULT_GRACE_RUNS, now=None, partial_sources=()):
+    """
+    Diff every successfully scraped source against the stored active set.
+    
+    Args:
+        events_collection: MongoDB events collection
+        seen_by_source (dict): Source name to the event hashes it returned this run
+        grace_runs (int): Missed runs before an event is deactivated
+        now (datetime, optional): Reference time
+        partial_sources (iterable): Sources crawled only in part; their events count
+                                    as seen, but their unseen events are not missed
+    
+    Returns:
+        dict: Report per source
+    """
+    # An event stored under one source may only be listed by another now
+    seen = sorted(set().union(*seen_by_source.values()))
+    report = {}
+    
+    for source, hashes in sorted(seen_by_source.items()):
+        # An empty listing is more likely a broken scraper than a cancelled catalogue
+        if not hashes:
+            report[source] = {'skipped': 'no events scraped'}
+            continue
+        if source in partial_sources:
+            report[source] = {'skipped': 'partial crawl'}
+            continue
+        report[source] = diff_source(events_collection, source, seen, grace_runs, now)
+    
+    return report
+
+
+def due_full_crawl(db, sources, every=FULL_CRAWL_EVERY):
+    """
+    Get the sources whose crawls stopped early in the last every - 1 runs,
+    so that this run crawls them fully and diffs them.
+    
+    Args:
+        db: Database holding the crawl_state collection
+        sources (list): Source names
+        every (int): Runs in which a source crawls fully at least once
+    
+    Returns:
+        set: Source names due for a full crawl
+    """
+    if not every:
+        return set()
+    
+    partial_runs = {
+        doc['_id']: doc.get('partial_runs', 0)
+        for doc in db.crawl_state.find({'_id': {'$in': list(sources)}})
+    }
+    return {source for source in sources if partial_runs.get(source, 0) + 1 >= every}
+
+
+def record_crawls(db, complete, partial):
+    """
+    Count the consecutive runs in which each source's crawl stopped early.
+    
+    Args:
+        db: Database holding the crawl_state collection
+        complete (list): Sources crawled to their last page this run
+        partial (list): Sources whose crawl stopped before its last page
+    """
+    now = datetime.now()
+    for source in partial:
+        db.crawl_state.update_one(
+            {'_id': source},
+            {'$inc': {'partial_runs': 1}, '$set': {'updated_at': now}},
+            upsert=True
+        )
+    
+    if complete:
+        db.crawl_state.delete_many({'_id': {'$in': list(complete)}})
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print(sorted_difference(['a', 'b', 'c', 'e'], ['b', 'd', 'e']))
+    print(sorted_difference(['a', 'b'], []))
+    print(sorted_difference([], ['a']))
@@ -0,0 +1,394 @@
+"""
+Catalogue Snapshot
+Versioned, compressed, memory-mappable snapshots of active upcoming events
+
+File layout (all integers little-endian):
+
+    header        magic, format version, snapshot version, counts and section offsets
+    dates         int64[rows]   microseconds since epoch, sorted ascending
+    source_ids    uint16[rows]  index into the source table
+    source_index  per source: uint32 row ids (ascending, so also date-ordered)
+    block_offsets uint64[blocks + 1] into the blocks section
+    blocks        zlib-compressed JSON lines, BLOCK_ROWS records per block
+    source_table  JSON list of source names
+
+Readers mmap the file, binary-search the date column and only decompress
+the blocks that hold matching rows, so a date range scan needs no database.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+import zlib
+from datetime import datetime, timedelta
+
+
+MAGIC = b'LXSNAP01'
+FORMAT_VERSION = 1
+BLOCK_ROWS = 256
+
+# magic, format, snapshot version, rows, block rows, blocks, sources,
+# then offsets of dates, source_ids, source_index, block_offsets, blocks, source_table
+HEADER = struct.Struct('<8sIQIIII6Q')
+
+SNAPSHOT_PATTERN = re.compile(r'^events-(\d{8})\.snap$')
+LATEST_FILE = 'LATEST'
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+RECORD_FIELDS = ('title', 'date', 'location', 'description', 'image_url', 'ticket_url',
+                 'source', 'event_hash')
+
+
+def _to_micros(date):
+    return (date - EPOCH) // MICROSECOND
+
+
+def _from_micros(micros):
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def _record(event):
+    """Reduce an event to the JSON-serializable snapshot fields."""
+    record = {field: event.get(field) for field in RECORD_FIELDS}
+    record['date'] = event['date'].isoformat()
+    return record
+
+
+def _fsync_dir(directory):
+    """Persist a rename on filesystems that need the directory synced."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def list_snapshots(snapshot_dir):
+    """
+    List the snapshot versions present in a directory.
+    
+    Args:
+        snapshot_dir (str): Snapshot directory
+    
+    Returns:
+        list: Snapshot versions, ascending
+    """
+    if not os.path.isdir(snapshot_dir):
+        return []
+    
+    versions = []
+    for name in os.listdir(snapshot_dir):
+        match = SNAPSHOT_PATTERN.match(name)
+        if match:
+            versions.append(int(match.group(1)))
+    return sorted(versions)
+
+
+def snapshot_path(snapshot_dir, version):
+    """Path of a snapshot version inside a directory."""
+    return os.path.join(snapshot_dir, f"events-{version:08d}.snap")
+
+
+def write_snapshot(events, snapshot_dir, version=None):
+    """
+    Write a snapshot atomically and point LATEST at it.
+    
+    Args:
+        events (list): Events with a datetime 'date' (any order)
+        snapshot_dir (str): Snapshot directory
+        version (int, optional): Snapshot version; next free version if omitted
+    
+    Returns:
+        str: Path of the written snapshot
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    
+    if version is None:
+        existing = list_snapshots(snapshot_dir)
+        version = existing[-1] + 1 if existing else 1
+    
+    rows = sorted((e for e in events if e.get('date')), key=lambda e: e['date'])
+    
+    sources = sorted({e.get('source') or '' for e in rows})
+    source_ids = {source: i for i, source in enumerate(sources)}
+    
+    dates = struct.pack(f'<{len(rows)}q', *(_to_micros(e['date']) for e in rows))
+    row_sources = [source_ids[e.get('source') or ''] for e in rows]
+    source_column = struct.pack(f'<{len(rows)}H', *row_sources)
+    
+    # Per source: (row count, row ids) laid out back to back after a count table
+    per_source = [[] for _ in sources]
+    for row, source_id in enumerate(row_sources):
+        per_source[source_id].append(row)
+    source_index = struct.pack(f'<{len(sources)}I', *(len(r) for r in per_source))
+    source_index += b''.join(struct.pack(f'<{len(r)}I', *r) for r in per_source)
+    
+    blocks = []
+    for start in range(0, len(rows), BLOCK_ROWS):
+        lines = '\n'.join(
+            json.dumps(_record(e), ensure_ascii=False, separators=(',', ':'))
+            for e in rows[start:start + BLOCK_ROWS]
+        )
+        blocks.append(zlib.compress(lines.encode('utf-8'), 6))
+    
+    block_offsets = [0]
+    for block in blocks:
+        block_offsets.append(block_offsets[-1] + len(block))
+    block_offset_table = struct.pack(f'<{len(block_offsets)}Q', *block_offsets)
+    
+    source_table = json.dumps(sources, ensure_ascii=False).encode('utf-8')
+    
+    offsets = []
+    position = HEADER.size
+    for section in (dates, source_column, source_index, block_offset_table):
+        offsets.append(position)
+        position += len(section)
+    offsets.append(position)
+    position += block_offsets[-1]
+    offsets.append(position)
+    
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, version, len(rows), BLOCK_ROWS,
+                         len(blocks), len(sources), *offsets)
+    
+    path = snapshot_path(snapshot_dir, version)
+    fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, prefix='.tmp-', suffix='.snap')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for section in (header, dates, source_column, source_index, block_offset_table):
+                f.write(section)
+            for block in blocks:
+                f.write(block)
+            f.write(source_table)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        
+        _write_latest(snapshot_dir, os.path.basename(path))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    _fsync_dir(snapshot_dir)
+    return path
+
+
+def _write_latest(snapshot_dir, name):
+    """Atomically replace the LATEST pointer."""
+    fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, prefix='.tmp-latest-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(name + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(snapshot_dir, LATEST_FILE))
+
+
+def latest_snapshot(snapshot_dir):
+    """
+    Get the path of the snapshot LATEST points to.
+    
+    Args:
+        snapshot_dir (str): Snapshot directory
+    
+    Returns:
+        str: Snapshot path, or None if no snapshot was written yet
+    """
+    try:
+        with open(os.path.join(snapshot_dir, LATEST_FILE)) as f:
+            return os.path.join(snapshot_dir, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def collect_garbage(snapshot_dir, keep=3):
+    """
+    Delete old snapshot versions, never touching the one LATEST points to.
+    Readers that already mmap'd a deleted file keep working on POSIX systems.
+    
+    Args:
+        snapshot_dir (str): Snapshot directory
+        keep (int): Number of newest versions to keep
+    
+    Returns:
+        list: Deleted versions
+    """
+    latest = latest_snapshot(snapshot_dir)
+    deleted = []
+    
+    for version in list_snapshots(snapshot_dir)[:-keep or None]:
+        path = snapshot_path(snapshot_dir, version)
+        if latest and os.path.abspath(path) == os.path.abspath(latest):
+            continue
+        try:
+            os.remove(path)
+            deleted.append(version)
+        except OSError:
+            pass
+    
+    return deleted
+
+
+class SnapshotReader:
+    """
+    Memory-mapped reader for a snapshot file.
+    """
+    
+    def __init__(self, path):
+        """
+        Open a snapshot.
+        
+        Args:
+            path (str): Snapshot file, or a snapshot directory to open its LATEST
+        """
+        if os.path.isdir(path):
+            path = latest_snapshot(path)
+            if path is None:
+                raise FileNotFoundError("Snapshot directory has no LATEST snapshot")
+        
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        (magic, file_format, self.version, self.rows, self.block_rows, self.block_count,
+         source_count, dates_at, sources_at, index_at, offsets_at, blocks_at,
+         table_at) = HEADER.unpack_from(self._map, 0)
+        
+        if magic != MAGIC or file_format != FORMAT_VERSION:
+            raise ValueError(f"Not a supported snapshot file: {path}")
+        
+        view = memoryview(self._map)
+        self.dates = view[dates_at:dates_at + 8 * self.rows].cast('q')
+        self.source_ids = view[sources_at:sources_at + 2 * self.rows].cast('H')
+        self._block_offsets = view[offsets_at:offsets_at + 8 * (self.block_count + 1)].cast('Q')
+        self._blocks_at = blocks_at
+        self.sources = json.loads(bytes(self._map[table_at:]).decode('utf-8'))
+        
+        counts = view[index_at:index_at + 4 * source_count].cast('I')
+        self._source_rows = {}
+        position = index_at + 4 * source_count
+        for source, count in zip(self.sources, counts):
+            self._source_rows[source] = view[position:position + 4 * count].cast('I')
+            position += 4 * count
+        
+        self._block_cache = {}
+    
+    def close(self):
+        """Release the memory map."""
+        self.dates.release()
+        self.source_ids.release()
+        self._block_offsets.release()
+        for rows in self._source_rows.values():
+            rows.release()
+        self._map.close()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    def __len__(self):
+        return self.rows
+    
+    def _block(self, number):
+        block = self._block_cache.get(number)
+        if block is None:
+            start = self._blocks_at + self._block_offsets[number]
+            end = self._blocks_at + self._block_offsets[number + 1]
+            block = zlib.decompress(self._map[start:end]).decode('utf-8').split('\n')
+            self._block_cache = {number: block}
+        return block
+    
+    def record(self, row):
+        """
+        Decode one row.
+        
+        Args:
+            row (int): Row number
+        
+        Returns:
+            dict: Event record with a datetime 'date'
+        """
+        record = json.loads(self._block(row // self.block_rows)[row % self.block_rows])
+        record['date'] = datetime.fromisoformat(record['date'])
+        return record
+    
+    def range_scan(self, start=None, end=None, source=None):
+        """
+        Iterate over events dated in [start, end), in date order.
+        
+        Args:
+            start (datetime, optional): Inclusive lower bound
+            end (datetime, optional): Exclusive upper bound
+            source (str, optional): Only events from this source
+        
+        Yields:
+            dict: Event records
+        """
+        low = _to_micros(start) if start else None
+        high = _to_micros(end) if end else None
+        
+        if source is None:
+            first = bisect.bisect_left(self.dates, low) if low is not None else 0
+            last = bisect.bisect_left(self.dates, high) if high is not None else self.rows
+            rows = range(first, last)
+        else:
+            source_rows = self._source_rows.get(source)
+            if source_rows is None:
+                return
+            first = _bisect_rows(source_rows, self.dates, low) if low is not None else 0
+            last = _bisect_rows(source_rows, self.dates, high) if high is not None else len(source_rows)
+            rows = (source_rows[i] for i in range(first, last))
+        
+        for row in rows:
+            yield self.record(row)
+
+
+def _bisect_rows(rows, dates, value):
+    """Leftmost position in rows (date-ordered row ids) whose date is >= value."""
+    low, high = 0, len(rows)
+    while low < high:
+        middle = (low + high) // 2
+        if dates[rows[middle]] < value:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import shutil
+    
+    directory = tempfile.mkdtemp()
+    now = datetime.now().replace(microsecond=0)
+    events = [
+        {'title': f'Event {i}', 'date': now + timedelta(hours=i), 'location': 'Sydney',
+         'description': '', 'image_url': '', 'ticket_url': f'https://example.com/{i}',
+         'source': 'a' if i % 2 else 'b', 'event_hash': f'{i:032x}'}
+        for i in range(1000)
+    ]
+    
+    for _ in range(4):
+        write_snapshot(events, directory)
+    print(f"Versions: {list_snapshots(directory)}")
+    print(f"Deleted: {collect_garbage(directory, keep=2)}")
+    
+    with SnapshotReader(directory) as reader:
+        print(f"Opened version {reader.version} with {len(reader)} rows")
+        window = list(reader.range_scan(now + timedelta(hours=10), now + timedelta(hours=15)))
+        print(f"Range scan: {[e['title'] for e in window]}")
+        window = list(reader.range_scan(now + timedelta(hours=10), now + timedelta(hours=15), source='a'))
+        print(f"Source 'a': {[e['title'] for e in window]}")
+    
+    shutil.rmtree(directory)
@@ -0,0 +1,1148 @@
+"""
+Storage Backends
+Opens the event store named by MONGODB_URI: MongoDB, or an in-process stand-in
+
+    mongodb://... / mongodb+srv://...   MongoDB through pymongo
+    memory://<name>                     In-memory store with the pymongo API subset
+                                        the scraper uses; databases with the same
+                                        name are shared within a process
+
+The in-memory store implements find/find_one (with projection and sort),
+insert, update_one/update_many (with upsert), find_one_and_update, bulk_write,
+delete, count_documents, distinct, single-field indexes (unique and sparse),
+2dsphere indexes on GeoJSON points (a lat/lon grid serving $nearSphere) and
+the aggregation stages used for stats. It lets the whole pipeline, DB
+writes included, run and be benchmarked on a machine with no database.
+"""
+
+import math
+import os
+import re
+import threading
+import uuid
+from urllib.parse import urlsplit
+
+try:
+    from pymongo import MongoClient, ReturnDocument, ASCENDING, DESCENDING, GEOSPHERE, InsertOne, UpdateOne
+    from pymongo.errors import DuplicateKeyError, BulkWriteError
+    MONGODB_AVAILABLE = True
+except ImportError:
+    MONGODB_AVAILABLE = False
+    
+    ASCENDING = 1
+    DESCENDING = -1
+    GEOSPHERE = '2dsphere'
+    
+    class ReturnDocument:
+        BEFORE = False
+        AFTER = True
+    
+    class DuplicateKeyError(Exception):
+        pass
+    
+    class BulkWriteError(Exception):
+        def __init__(self, details):
+            super().__init__("batch op errors occurred")
+            self.details = details
+    
+    class InsertOne:
+        def __init__(self, document):
+            self._doc = document
+    
+    class UpdateOne:
+        def __init__(self, filter, update, upsert=False):
+            self._filter = filter
+            self._doc = update
+            self._upsert = upsert
+
+
+DEFAULT_URI = 'mongodb://localhost:27017/sydney-events'
+
+# Mean Earth radius MongoDB uses for spherical distances
+EARTH_RADIUS_M = 6378100
+
+# Side of a 2dsphere grid cell in the in-memory store, in degrees (about 1 km)
+GEO_CELL_DEGREES = 0.01
+
+
+def connect_database(uri=None, database=None):
+    """
+    Open the database named by a URI.
+    
+    Args:
+        uri (str, optional): Database URI; MONGODB_URI or the local default if omitted
+        database (str, optional): Database to open on that server instead of the URI's
+    
+    Returns:
+        Database: pymongo Database or MemoryDatabase
+    """
+    uri = uri or os.getenv('MONGODB_URI', DEFAULT_URI)
+    
+    if uri.startswith('memory://'):
+        return MemoryClient(uri).get_database(database)
+    
+    if not MONGODB_AVAILABLE:
+        raise RuntimeError("pymongo is not installed; set MONGODB_URI=memory:// for the in-process store")
+    
+    return MongoClient(uri).get_database(database)
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class UpdateResult:
+    def __init__(self, matched_count, modified_count, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+class BulkWriteResult:
+    def __init__(self):
+        self.inserted_count = 0
+        self.matched_count = 0
+        self.modified_count = 0
+        self.upserted_count = 0
+        self.deleted_count = 0
+
+
+_MISSING = object()
+
+
+def _copy(value):
+    """Copy a document deep enough that callers cannot alias stored state."""
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _get(doc, path):
+    """Read a dotted field path, returning _MISSING when absent."""
+    for part in path.split('.'):
+        if isinstance(doc, dict) and part in doc:
+            doc = doc[part]
+        else:
+            return _MISSING
+    return doc
+
+
+def _set(doc, path, value):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset(doc, path):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def _compare(value, other, op):
+    """Ordered comparison that, like MongoDB, never matches across null or type mismatches."""
+    if value is _MISSING or value is None or other is None:
+        return False
+    try:
+        return op(value, other)
+    except TypeError:
+        return False
+
+
+_COMPARISONS = {
+    '$gt': lambda a, b: a > b,
+    '$gte': lambda a, b: a >= b,
+    '$lt': lambda a, b: a < b,
+    '$lte': lambda a, b: a <= b,
+}
+
+
+def _equals(value, expected):
+    if value is _MISSING:
+        return expected is None
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+def _point(value):
+    """(lon, lat) of a GeoJSON point, or None."""
+    if not isinstance(value, dict) or value.get('type') != 'Point':
+        return None
+    coordinates = value.get('coordinates')
+    if not isinstance(coordinates, (list, tuple)) or len(coordinates) != 2:
+        return None
+    return coordinates[0], coordinates[1]
+
+
+def _distance_m(a, b):
+    """Great-circle distance in metres between two (lon, lat) points."""
+    lon1, lat1, lon2, lat2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _near(condition):
+    """Center (lon, lat), min and max distance in metres of a $nearSphere operand."""
+    operand = condition['$nearSphere']
+    center = _point(operand.get('$geometry'))
+    if center is None:
+        raise ValueError("$nearSphere needs a GeoJSON Point $geometry")
+    return center, operand.get('$minDistance', 0), operand.get('$maxDistance', math.inf)
+
+
+def _match_condition(value, condition):
+    if not (isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition)):
+        if isinstance(condition, re.Pattern):
+            return isinstance(value, str) and bool(condition.search(value))
+        return _equals(value, condition)
+    
+    for op, operand in condition.items():
+        if op in _COMPARISONS:
+            if not _compare(value, operand, _COMPARISONS[op]):
+                return False
+        elif op == '$eq':
+            if not _equals(value, operand):
+                return False
+        elif op == '$ne':
+            if _equals(value, operand):
+                return False
+        elif op == '$in':
+            if not any(_equals(value, item) for item in operand):
+                return False
+        elif op == '$nin':
+            if any(_equals(value, item) for item in operand):
+                return False
+        elif op == '$exists':
+            if (value is not _MISSING) != bool(operand):
+                return False
+        elif op == '$regex':
+            flags = re.IGNORECASE if 'i' in condition.get('$options', '') else 0
+            if not (isinstance(value, str) and re.search(operand, value, flags)):
+                return False
+        elif op == '$options':
+            continue
+        elif op == '$nearSphere':
+            center, min_distance, max_distance = _near(condition)
+            point = _point(value)
+            if point is None or not min_distance <= _distance_m(point, center) <= max_distance:
+                return False
+        elif op == '$geoWithin':
+            (lon, lat), radians = operand['$centerSphere']
+            point = _point(value)
+            if point is None or _distance_m(point, (lon, lat)) > radians * EARTH_RADIUS_M:
+                return False
+        elif op == '$not':
+            if _match_condition(value, operand):
+                return False
+        else:
+            raise ValueError(f"Unsupported query operator: {op}")
+    return True
+
+
+def match(doc, query):
+    """
+    Test a document against a MongoDB query.
+    
+    Args:
+        doc (dict): Document
+        query (dict): Query filter
+    
+    Returns:
+        bool: True if the document matches
+    """
+    for key, condition in (query or {}).items():
+        if key == '$or':
+            if not any(match(doc, sub) for sub in condition):
+                return False
+        elif key == '$and':
+            if not all(match(doc, sub) for sub in condition):
+                return False
+        elif key == '$nor':
+            if any(match(doc, sub) for sub in condition):
+                return False
+        elif not _match_condition(_get(doc, key), condition):
+            return False
+    return True
+
+
+def _project(doc, projection):
+    if not projection:
+        return _copy(doc)
+    
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    
+    include = {k for k, v in projection.items() if v and k != '_id'}
+    if include:
+        result = {}
+        if projection.get('_id', 1) and '_id' in doc:
+            result['_id'] = doc['_id']
+        for field in include:
+            value = _get(doc, field)
+            if value is not _MISSING:
+                _set(result, field, _copy(value))
+        return result
+    
+    result = _copy(doc)
+    for field, keep in projection.items():
+        if not keep:
+            _unset(result, field)
+    return result
+
+
+def _sort_spec(key_or_list, direction=None):
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or ASCENDING)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return list(key_or_list)
+
+
+class _SortKey:
+    """Orders values like MongoDB: missing/null first, then by value."""
+    
+    __slots__ = ('value',)
+    
+    def __init__(self, value):
+        self.value = None if value is _MISSING else value
+    
+    def __lt__(self, other):
+        if self.value is None:
+            return other.value is not None
+        if other.value is None:
+            return False
+        try:
+            return self.value < other.value
+        except TypeError:
+            return type(self.value).__name__ < type(other.value).__name__
+    
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _sort_documents(docs, spec):
+    # Stable sorts from the last key to the first give a multi-key sort
+    for field, direction in reversed(spec):
+        docs.sort(key=lambda doc: _SortKey(_get(doc, field)), reverse=direction < 0)
+    return docs
+
+
+def _apply_update(doc, update, inserting=False):
+    """
+    Apply update operators to a stored document in place.
+    
+    Returns:
+        bool: True if the document changed
+    """
+    if not any(key.startswith('$') for key in update):
+        raise ValueError("Replacement documents are not supported, use update operators")
+    
+    before = _copy(doc)
+    for op, fields in update.items():
+        for path, value in fields.items():
+            current = _get(doc, path)
+            if op == '$set':
+                _set(doc, path, _copy(value))
+            elif op == '$setOnInsert':
+                if inserting:
+                    _set(doc, path, _copy(value))
+            elif op == '$unset':
+                _unset(doc, path)
+            elif op == '$inc':
+                _set(doc, path, (0 if current is _MISSING or current is None else current) + value)
+            elif op == '$min':
+                if current is _MISSING or _compare(value, current, _COMPARISONS['$lt']):
+                    _set(doc, path, value)
+            elif op == '$max':
+                if current is _MISSING or _compare(value, current, _COMPARISONS['$gt']):
+                    _set(doc, path, value)
+            elif op == '$push':
+                _set(doc, path, ([] if current is _MISSING else current) + [_copy(value)])
+            elif op == '$addToSet':
+                items = [] if current is _MISSING else current
+                if value not in items:
+                    _set(doc, path, items + [_copy(value)])
+            else:
+                raise ValueError(f"Unsupported update operator: {op}")
+    return doc != before
+
+
+def _evaluate(expression, doc):
+    """Evaluate a (small subset of) aggregation expression."""
+    if isinstance(expression, str) and expression.startswith('$'):
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict):
+        return {key: _evaluate(value, doc) for key, value in expression.items()}
+    return expression
+
+
+def _group(docs, spec):
+    groups = {}
+    for doc in docs:
+        group_id = _evaluate(spec['_id'], doc)
+        key = repr(group_id)
+        if key not in groups:
+            groups[key] = {'_id': group_id, '_values': {field: [] for field in spec if field != '_id'}}
+        for field, accumulator in spec.items():
+            if field != '_id':
+                (op, expression), = accumulator.items()
+                groups[key]['_values'][field].append(_evaluate(expression, doc))
+    
+    results = []
+    for group in groups.values():
+        row = {'_id': group['_id']}
+        for field, accumulator in spec.items():
+            if field == '_id':
+                continue
+            op = next(iter(accumulator))
+            values = group['_values'][field]
+            present = [v for v in values if v is not None]
+            if op == '$sum':
+                row[field] = sum(v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool))
+            elif op == '$avg':
+                numbers = [v for v in present if isinstance(v, (int, float))]
+                row[field] = sum(numbers) / len(numbers) if numbers else None
+            elif op == '$min':
+                row[field] = min(present) if present else None
+            elif op == '$max':
+                row[field] = max(present) if present else None
+            elif op == '$first':
+                row[field] = values[0] if values else None
+            elif op == '$last':
+                row[field] = values[-1] if values else None
+            elif op == '$push':
+                row[field] = values
+            elif op == '$addToSet':
+                unique = []
+                for value in values:
+                    if value not in unique:
+                        unique.append(value)
+                row[field] = unique
+            else:
+                raise ValueError(f"Unsupported accumulator: {op}")
+        results.append(row)
+    return results
+
+
+class MemoryCursor:
+    """
+    Lazily evaluated query result supporting sort, skip and limit.
+    """
+    
+    def __init__(self, collection, query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+    
+    def sort(self, key_or_list, direction=None):
+        """
+        Sort the result.
+        
+        Args:
+            key_or_list: Field name, or list of (field, direction) pairs
+            direction (int, optional): ASCENDING or DESCENDING, with a field name
+        
+        Returns:
+            MemoryCursor: This cursor
+        """
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+    
+    def skip(self, count):
+        """
+        Skip the first documents of the result.
+        
+        Args:
+            count (int): Documents to skip
+        
+        Returns:
+            MemoryCursor: This cursor
+        """
+        self._skip = count
+        return self
+    
+    def limit(self, count):
+        """
+        Return at most this many documents.
+        
+        Args:
+            count (int): Most documents returned, 0 for no limit
+        
+        Returns:
+            MemoryCursor: This cursor
+        """
+        self._limit = count
+        return self
+    
+    def batch_size(self, size):
+        """Accepted for pymongo compatibility; results are already in memory."""
+        return self
+    
+    def close(self):
+        """Accepted for pymongo compatibility; nothing to release."""
+        pass
+    
+    def __iter__(self):
+        docs = self._collection._find_stored(self._query, self._sort)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return iter([_project(doc, self._projection) for doc in docs])
+
+
+class MemoryCollection:
+    """
+    Collection of documents held in a dict by _id, with optional
+    single-field hash indexes for equality and $in lookups, and 2dsphere
+    indexes that bucket GeoJSON points into GEO_CELL_DEGREES grid cells.
+    """
+    
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self._docs = {}
+        # field -> {'unique': bool, 'sparse': bool, 'geo': bool, 'entries': {value or cell: set of _id}}
+        self._indexes = {}
+        self._lock = threading.RLock()
+    
+    @property
+    def full_name(self):
+        return f"{self.database.name}.{self.name}"
+    
+    def create_index(self, keys, unique=False, sparse=False, name=None, **kwargs):
+        """
+        Create an index. Single-field indexes are used for lookups and
+        uniqueness, 2dsphere indexes for $nearSphere queries; compound indexes
+        are accepted and ignored.
+        
+        Args:
+            keys: Field name, or list of (field, direction) pairs
+            unique (bool): Reject a second document with the same value
+            sparse (bool): Leave documents without the field out of the index
+            name (str, optional): Index name; derived from the keys if omitted
+        
+        Returns:
+            str: Index name
+        """
+        spec = _sort_spec(keys, ASCENDING)
+        index_name = name or '_'.join(f"{field}_{direction}" for field, direction in spec)
+        if len(spec) != 1:
+            return index_name
+        
+        field, direction = spec[0]
+        with self._lock:
+            if field not in self._indexes:
+                # Like MongoDB's, 2dsphere indexes skip documents without a point
+                geo = direction == GEOSPHERE
+                index = {'unique': unique, 'sparse': sparse or geo, 'geo': geo, 'entries': {}}
+                for doc in self._docs.values():
+                    self._index_add(index, field, doc)
+                self._indexes[field] = index
+        return index_name
+    
+    def _index_key(self, value):
+        return repr(value) if isinstance(value, (dict, list)) else value
+    
+    def _geo_cell(self, value):
+        point = _point(value)
+        if point is None:
+            return None
+        return math.floor(point[1] / GEO_CELL_DEGREES), math.floor(point[0] / GEO_CELL_DEGREES)
+    
+    def _index_add(self, index, field, doc):
+        value = _get(doc, field)
+        if index['geo']:
+            key = self._geo_cell(value)
+            if key is not None:
+                index['entries'].setdefault(key, set()).add(doc['_id'])
+            return
+        if value is _MISSING and index['sparse']:
+            return
+        key = self._index_key(None if value is _MISSING else value)
+        ids = index['entries'].setdefault(key, set())
+        if index['unique'] and ids and doc['_id'] not in ids:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: {field}")
+        ids.add(doc['_id'])
+    
+    def _index_remove(self, doc):
+        for field, index in self._indexes.items():
+            value = _get(doc, field)
+            if index['geo']:
+                key = self._geo_cell(value)
+            else:
+                key = self._index_key(None if value is _MISSING else value)
+            ids = index['entries'].get(key)
+            if ids is not None:
+                ids.discard(doc['_id'])
+                if not ids:
+                    del index['entries'][key]
+    
+    def _check_unique(self, doc, ignore_id=None):
+        if doc['_id'] in self._docs and doc['_id'] != ignore_id:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: _id_")
+        for field, index in self._indexes.items():
+            if not index['unique']:
+                continue
+            value = _get(doc, field)
+            if value is _MISSING and index['sparse']:
+                continue
+            ids = index['entries'].get(self._index_key(None if value is _MISSING else value), set())
+            if ids - {ignore_id, doc['_id']}:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: {field}")
+    
+    def _store(self, doc):
+        for field, index in self._indexes.items():
+            self._index_add(index, field, doc)
+        self._docs[doc['_id']] = doc
+    
+    def _geo_candidates(self, index, condition):
+        """Documents in the grid cells a $nearSphere search circle overlaps."""
+        (lon, lat), _, max_distance = _near(condition)
+        if max_distance == math.inf:
+            return None
+        
+        lat_span = math.degrees(max_distance / EARTH_RADIUS_M)
+        lon_span = lat_span / max(math.cos(math.radians(min(abs(lat) + lat_span, 89.9))), 1e-6)
+        rows = range(math.floor((lat - lat_span) / GEO_CELL_DEGREES), math.floor((lat + lat_span) / GEO_CELL_DEGREES) + 1)
+        columns = range(math.floor((lon - lon_span) / GEO_CELL_DEGREES), math.floor((lon + lon_span) / GEO_CELL_DEGREES) + 1)
+        # A circle covering more cells than there are filled ones is cheaper to scan
+        if len(rows) * len(columns) > len(index['entries']):
+            return None
+        
+        ids = set()
+        for row in rows:
+            for column in columns:
+                ids |= index['entries'].get((row, column), set())
+        return [self._docs[i] for i in ids]
+    
+    def _candidates(self, query):
+        """Narrow a scan with the _id, a 2dsphere index or an indexed equality/$in condition."""
+        query = query or {}
+        for field, condition in query.items():
+            if isinstance(condition, dict) and '$nearSphere' in condition:
+                index = self._indexes.get(field)
+                if index is None or not index['geo']:
+                    raise ValueError(f"$nearSphere on {field} needs a 2dsphere index")
+                docs = self._geo_candidates(index, condition)
+                if docs is not None:
+                    return docs
+        
+        for field, condition in query.items():
+            if field.startswith('$'):
+                continue
+            if isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition):
+                if set(condition) != {'$in'}:
+                    continue
+                values = condition['$in']
+            else:
+                values = [condition]
+            if any(isinstance(v, (dict, list, re.Pattern)) for v in values):
+                continue
+            
+            if field == '_id':
+                return [self._docs[v] for v in values if v in self._docs]
+            index = self._indexes.get(field)
+            if index is not None and not index['geo'] and not (index['sparse'] and None in values):
+                ids = set()
+                for value in values:
+                    ids |= index['entries'].get(value, set())
+                return [self._docs[i] for i in ids]
+        return list(self._docs.values())
+    
+    def _find_stored(self, query, sort=None):
+        with self._lock:
+            docs = [doc for doc in self._candidates(query) if match(doc, query)]
+            near = [(field, condition) for field, condition in (query or {}).items()
+                    if isinstance(condition, dict) and '$nearSphere' in condition]
+            if sort:
+                docs = _sort_documents(docs, sort)
+            elif near:
+                # $nearSphere returns the nearest documents first
+                field, condition = near[0]
+                center = _near(condition)[0]
+                docs.sort(key=lambda doc: _distance_m(_point(_get(doc, field)), center))
+            elif len(docs) > 1:
+                # Keep insertion order, like an unindexed MongoDB scan
+                order = {key: i for i, key in enumerate(self._docs)}
+                docs.sort(key=lambda doc: order[doc['_id']])
+            return docs
+    
+    def find(self, filter=None, projection=None, sort=None, **kwargs):
+        """
+        Find documents.
+        
+        Args:
+            filter (dict, optional): Query; all documents if omitted
+            projection (dict, optional): Fields to include or exclude
+            sort (list, optional): (field, direction) pairs
+        
+        Returns:
+            MemoryCursor: Lazily evaluated result
+        """
+        cursor = MemoryCursor(self, filter, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor
+    
+    def find_one(self, filter=None, projection=None, sort=None, **kwargs):
+        """
+        Find the first matching document.
+        
+        Args:
+            filter (dict, optional): Query
+            projection (dict, optional): Fields to include or exclude
+            sort (list, optional): (field, direction) pairs deciding which is first
+        
+        Returns:
+            dict: Copy of the document, or None if nothing matches
+        """
+        for doc in self.find(filter, projection, sort=sort).limit(1):
+            return doc
+        return None
+    
+    def count_documents(self, filter, **kwargs):
+        """
+        Count matching documents.
+        
+        Args:
+            filter (dict): Query
+        
+        Returns:
+            int: Number of matches
+        """
+        return len(self._find_stored(filter))
+    
+    def estimated_document_count(self, **kwargs):
+        """
+        Count all documents.
+        
+        Returns:
+            int: Number of documents in the collection
+        """
+        return len(self._docs)
+    
+    def distinct(self, key, filter=None, **kwargs):
+        """
+        Get the distinct values of a field, flattening arrays.
+        
+        Args:
+            key (str): Field, in dotted notation
+            filter (dict, optional): Query limiting the documents looked at
+        
+        Returns:
+            list: Values, in order of first occurrence
+        """
+        values = []
+        for doc in self._find_stored(filter):
+            value = _get(doc, key)
+            for item in (value if isinstance(value, list) else [value]):
+                if item is not _MISSING and item not in values:
+                    values.append(item)
+        return values
+    
+    def insert_one(self, document, **kwargs):
+        """
+        Insert a document, giving it an _id if it has none.
+        
+        Args:
+            document (dict): Document; its '_id' is set in place like pymongo does
+        
+        Returns:
+            InsertOneResult: The inserted _id
+        
+        Raises:
+            DuplicateKeyError: If the _id or a unique index value is taken
+        """
+        with self._lock:
+            document.setdefault('_id', _new_id())
+            doc = _copy(document)
+            self._check_unique(doc)
+            self._store(doc)
+        return InsertOneResult(doc['_id'])
+    
+    def insert_many(self, documents, ordered=True, **kwargs):
+        """
+        Insert documents one by one.
+        
+        Args:
+            documents (list): Documents
+            ordered (bool): Accepted for pymongo compatibility
+        
+        Returns:
+            InsertManyResult: The inserted _ids
+        """
+        return InsertManyResult([self.insert_one(doc).inserted_id for doc in documents])
+    
+    def _update(self, filter, update, upsert, multi, sort=None):
+        with self._lock:
+            docs = self._find_stored(filter, sort)
+            if not multi:
+                docs = docs[:1]
+            
+            if not docs:
+                if not upsert:
+                    return UpdateResult(0, 0), None, None
+                doc = {
+                    key: _copy(value)
+                    for key, value in (filter or {}).items()
+                    if not key.startswith('$') and not (isinstance(value, dict) and any(k.startswith('$') for k in value))
+                }
+                _apply_update(doc, update, inserting=True)
+                doc.setdefault('_id', _new_id())
+                self._check_unique(doc)
+                self._store(doc)
+                return UpdateResult(0, 0, doc['_id']), None, doc
+            
+            modified = 0
+            before = None
+            for doc in docs:
+                updated = _copy(doc)
+                if before is None:
+                    before = _copy(doc)
+                if _apply_update(updated, update):
+                    self._check_unique(updated, ignore_id=doc['_id'])
+                    self._index_remove(doc)
+                    self._store(updated)
+                    modified += 1
+            return UpdateResult(len(docs), modified), before, self._docs[docs[0]['_id']]
+    
+    def update_one(self, filter, update, upsert=False, **kwargs):
+        """
+        Update the first matching document.
+        
+        Args:
+            filter (dict): Query
+            update (dict): Update operators ($set, $inc, $unset, $setOnInsert, ...)
+            upsert (bool): Insert a document built from filter and update if none matches
+        
+        Returns:
+            UpdateResult: Matched, modified and upserted counts
+        """
+        return self._update(filter, update, upsert, multi=False)[0]
+    
+    def update_many(self, filter, update, upsert=False, **kwargs):
+        """
+        Update every matching document.
+        
+        Args:
+            filter (dict): Query
+            update (dict): Update operators
+            upsert (bool): Insert a document built from filter and update if none matches
+        
+        Returns:
+            UpdateResult: Matched, modified and upserted counts
+        """
+        return self._update(filter, update, upsert, multi=True)[0]
+    
+    def find_one_and_update(self, filter, update, projection=None, sort=None, upsert=False,
+                            return_document=ReturnDocument.BEFORE, **kwargs):
+        """
+        Update the first matching document atomically and return it.
+        
+        Args:
+            filter (dict): Query
+            update (dict): Update operators
+            projection (dict, optional): Fields to include or exclude
+            sort (list, optional): (field, direction) pairs deciding which is first
+            upsert (bool): Insert a document if none matches
+            return_document: ReturnDocument.BEFORE or ReturnDocument.AFTER the update
+        
+        Returns:
+            dict: The document, or None if nothing matched (or was upserted, with BEFORE)
+        """
+        with self._lock:
+            result, before, after = self._update(filter, update, upsert, multi=False,
+                                                 sort=_sort_spec(sort) if sort else None)
+            document = after if return_document == ReturnDocument.AFTER else before
+            return _project(document, projection) if document is not None else None
+    
+    def delete_one(self, filter, **kwargs):
+        """
+        Delete the first matching document.
+        
+        Args:
+            filter (dict): Query
+        
+        Returns:
+            DeleteResult: Deleted count
+        """
+        return self._delete(filter, multi=False)
+    
+    def delete_many(self, filter, **kwargs):
+        """
+        Delete every matching document.
+        
+        Args:
+            filter (dict): Query
+        
+        Returns:
+            DeleteResult: Deleted count
+        """
+        return self._delete(filter, multi=True)
+    
+    def _delete(self, filter, multi):
+        with self._lock:
+            docs = self._find_stored(filter)
+            if not multi:
+                docs = docs[:1]
+            for doc in docs:
+                self._index_remove(doc)
+                del self._docs[doc['_id']]
+            return DeleteResult(len(docs))
+    
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        """
+        Apply InsertOne / UpdateOne operations.
+        
+        Raises:
+            BulkWriteError: With 'writeErrors' (index, errmsg) for failed operations
+        """
+        result = BulkWriteResult()
+        errors = []
+        
+        for i, request in enumerate(requests):
+            try:
+                if isinstance(request, InsertOne):
+                    self.insert_one(request._doc)
+                    result.inserted_count += 1
+                elif isinstance(request, UpdateOne):
+                    update = self.update_one(request._filter, request._doc, upsert=request._upsert)
+                    result.matched_count += update.matched_count
+                    result.modified_count += update.modified_count
+                    result.upserted_count += update.upserted_id is not None
+                else:
+                    raise ValueError(f"Unsupported bulk operation: {type(request).__name__}")
+            except DuplicateKeyError as e:
+                errors.append({'index': i, 'code': 11000, 'errmsg': str(e)})
+                if ordered:
+                    break
+        
+        if errors:
+            raise BulkWriteError({
+                'writeErrors': errors,
+                'nInserted': result.inserted_count,
+                'nMatched': result.matched_count,
+                'nModified': result.modified_count,
+                'nUpserted': result.upserted_count
+            })
+        return result
+    
+    def aggregate(self, pipeline, **kwargs):
+        """
+        Run an aggregation with $match, $group, $sort, $skip, $limit, $project and $count stages.
+        
+        Returns:
+            iterator: Result documents
+        """
+        docs = None
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if docs is None:
+                docs = self._find_stored(spec if op == '$match' else None)
+                if op == '$match':
+                    docs = [_copy(doc) for doc in docs]
+                    continue
+                docs = [_copy(doc) for doc in docs]
+            
+            if op == '$match':
+                docs = [doc for doc in docs if match(doc, spec)]
+            elif op == '$group':
+                docs = _group(docs, spec)
+            elif op == '$sort':
+                docs = _sort_documents(docs, _sort_spec(spec))
+            elif op == '$skip':
+                docs = docs[spec:]
+            elif op == '$limit':
+                docs = docs[:spec]
+            elif op == '$project':
+                docs = [
+                    _project(doc, {k: v for k, v in spec.items() if not isinstance(v, str)})
+                    | {k: _evaluate(v, doc) for k, v in spec.items() if isinstance(v, str)}
+                    for doc in docs
+                ]
+            elif op == '$count':
+                docs = [{spec: len(docs)}]
+            else:
+                raise ValueError(f"Unsupported aggregation stage: {op}")
+        
+        return iter(docs or [])
+    
+    def drop(self):
+        """Remove all documents and indexes."""
+        with self._lock:
+            self._docs = {}
+            self._indexes = {}
+    
+    def index_information(self):
+        """
+        Describe the collection's indexes like pymongo does.
+        
+        Returns:
+            dict: Index name to its key, and unique and sparse flags
+        """
+        info = {'_id_': {'key': [('_id', 1)]}}
+        for field, index in self._indexes.items():
+            if index['geo']:
+                info[f"{field}_{GEOSPHERE}"] = {'key': [(field, GEOSPHERE)]}
+                continue
+            info[f"{field}_1"] = {'key': [(field, 1)], 'unique': index['unique'], 'sparse': index['sparse']}
+        return info
+
+
+def _new_id():
+    try:
+        from bson import ObjectId
+        return ObjectId()
+    except ImportError:
+        return uuid.uuid4().hex[:24]
+
+
+class MemoryDatabase:
+    """
+    Named set of in-memory collections; attribute and item access create them on demand.
+    """
+    
+    def __init__(self, name):
+        self.name = name
+        self._collections = {}
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(self, name)
+            return self._collections[name]
+    
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+    
+    def get_collection(self, name):
+        """
+        Get a collection, creating it if needed.
+        
+        Args:
+            name (str): Collection name
+        
+        Returns:
+            MemoryCollection: The collection
+        """
+        return self[name]
+    
+    def list_collection_names(self):
+        """
+        List the collections used so far.
+        
+        Returns:
+            list: Collection names
+        """
+        return list(self._collections)
+    
+    def drop_collection(self, name):
+        """
+        Drop a collection with its documents and indexes.
+        
+        Args:
+            name (str): Collection name
+        """
+        with self._lock:
+            self._collections.pop(name, None)
+    
+    def command(self, command, *args, **kwargs):
+        """
+        Run a database command; only ping is supported.
+        
+        Returns:
+            dict: Command result
+        
+        Raises:
+            ValueError: For any other command
+        """
+        if command in ('ping', {'ping': 1}):
+            return {'ok': 1.0}
+        raise ValueError(f"Unsupported command: {command}")
+
+
+class MemoryClient:
+    """
+    Client for memory:// URIs. Databases live for the lifetime of the process.
+    """
+    
+    _databases = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, uri='memory://'):
+        self.default_name = urlsplit(uri).netloc or urlsplit(uri).path.strip('/') or 'sydney-events'
+        self.admin = self.get_database('admin')
+    
+    def get_database(self, name=None):
+        """
+        Get a database, creating it if needed.
+        
+        Args:
+            name (str, optional): Database name; the URI's if omitted
+        
+        Returns:
+            MemoryDatabase: The database
+        """
+        name = name or self.default_name
+        with MemoryClient._lock:
+            if name not in MemoryClient._databases:
+                MemoryClient._databases[name] = MemoryDatabase(name)
+            return MemoryClient._databases[name]
+    
+    def __getitem__(self, name):
+        return self.get_database(name)
+    
+    def close(self):
+        """Accepted for pymongo compatibility; databases outlive the client."""
+        pass
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    from datetime import datetime, timedelta
+    
+    db = connect_database('memory://demo')
+    events = db.events
+    events.create_index('event_hash', unique=True, sparse=True)
+    
+    now = datetime.now()
+    for i in range(5):
+        events.insert_one({
+            'title': f'Event {i}', 'date': now + timedelta(days=i - 2),
+            'source': 'a' if i % 2 else 'b', 'is_active': True, 'event_hash': f'h{i}'
+        })
+    
+    print(f"By hash: {events.find_one({'event_hash': 'h3'}, {'_id': 0, 'title': 1})}")
+    result = events.update_many({'date': {'$lt': now}, 'is_active': True}, {'$set': {'is_active': False}})
+    print(f"Expired: {result.modified_count}")
+    print(f"Upcoming: {[e['title'] for e in events.find({'is_active': True}).sort('date', -1)]}")
+    print(f"By source: {list(events.aggregate([{'$group': {'_id': '$source', 'count': {'$sum': 1}}}]))}")
+    try:
+        events.insert_one({'title': 'Dup', 'event_hash': 'h1'})
+    except DuplicateKeyError as e:
+        print(f"Duplicate rejected: {e}")
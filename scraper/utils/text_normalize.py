@@ -0,0 +1,144 @@
+"""
+Text Normalization
+Cleanup of scraped text into its display form and dedup keys
+
+The display form has HTML entities decoded, Unicode NFKC-normalized,
+invisible characters dropped and whitespace collapsed. Keys are derived from
+it: the hash key is what generate_event_hash() compares, the title and
+location keys what normalize_title() and normalize_location() compare.
+"""
+
+import html
+import re
+import unicodedata
+
+
+# Zero-width and soft-hyphen characters, and control characters that are not whitespace
+INVISIBLE_PATTERN = re.compile('[\x00-\x08\x0e-\x1f\x7f\u00ad\u200b-\u200d\u2060\ufeff]')
+
+# Punctuation left out of title keys
+TITLE_PUNCTUATION_PATTERN = re.compile('[,.!?:;"\']')
+
+# Location words compared in their short form, whole words only
+ABBREVIATIONS = {
+    'street': 'st',
+    'avenue': 'ave',
+    'road': 'rd',
+    'sydney': 'syd',
+    'australia': 'aus'
+}
+# One pattern per word, tried only when the word occurs at all: most locations
+# contain none of them, and a substring check is cheaper than a regex scan
+ABBREVIATION_PATTERNS = [
+    (word, abbreviation, re.compile(r'\b' + word + r'\b'))
+    for word, abbreviation in ABBREVIATIONS.items()
+]
+
+
+def clean_text(text):
+    """
+    Get the display form of scraped text.
+    
+    Entity decoding, NFKC and the invisible-character pass only run when the
+    text needs them; whitespace is always collapsed.
+    
+    Args:
+        text (str): Raw text
+    
+    Returns:
+        str: Display text, '' for empty input
+    """
+    if not text:
+        return ""
+    
+    if '&' in text:
+        text = html.unescape(text)
+    if not text.isascii() and not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
+    
+    # Splitting on any whitespace turns newlines, tabs and NBSP into single spaces
+    text = ' '.join(text.split())
+    
+    # Whitespace is collapsed, so only invisible (or other unprintable) characters fail this
+    if not text.isprintable():
+        text = ' '.join(INVISIBLE_PATTERN.sub('', text).split())
+    return text
+
+
+def hash_key(display):
+    """
+    Key of a display string in the event hash: lowercase, with no whitespace.
+    
+    Args:
+        display (str): Display form from clean_text()
+    
+    Returns:
+        str: Hash key
+    """
+    # Display text has no whitespace but single spaces left
+    return display.lower().replace(' ', '')
+
+
+def normalize_field(text):
+    """
+    Clean a scraped field and key it for deduplication in one step.
+    
+    Args:
+        text (str): Raw text
+    
+    Returns:
+        tuple: (display form, hash key)
+    """
+    display = clean_text(text)
+    # Same as hash_key(), inlined: this runs for every field of every event
+    return display, display.lower().replace(' ', '')
+
+
+def title_key(text):
+    """
+    Comparison key of a title: lowercase, without punctuation.
+    
+    Args:
+        text (str): Display form of a title, from clean_text()
+    
+    Returns:
+        str: Title key
+    """
+    return ' '.join(TITLE_PUNCTUATION_PATTERN.sub('', text.lower()).split())
+
+
+def location_key(text):
+    """
+    Comparison key of a location: lowercase, with street, avenue and road
+    (and Sydney and Australia) abbreviated.
+    
+    Args:
+        text (str): Display form of a location, from clean_text()
+    
+    Returns:
+        str: Location key
+    """
+    text = text.lower()
+    for word, abbreviation, pattern in ABBREVIATION_PATTERNS:
+        if word in text:
+            text = pattern.sub(abbreviation, text)
+    return text
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    samples = [
+        '  Jazz &amp; Blues\n\tNight  ',
+        'Café Sydney – Rooftop​ Sessions',
+        'ＳＹＤ Festival ①',
+        '123 George Street, Sydney NSW',
+        'Broadway Roadhouse, 5 Oxford Road',
+    ]
+    
+    for sample in samples:
+        display, key = normalize_field(sample)
+        print(f"{sample!r}")
+        print(f"  display:  {display!r}")
+        print(f"  hash key: {key!r}")
+        print(f"  title:    {title_key(display)!r}")
+        print(f"  location: {location_key(display)!r}")
@@ -0,0 +1,224 @@
+"""
+Event Validation
+Checks and normalizes a batch of events against the backend Event model
+(backend/src/models/Event.js) before they are written
+
+Strings are trimmed and cut to the model's maxlength, an invalid optional URL
+is cleared, and events still breaking a rule (a required field missing, a
+ticket URL that is not http(s)) are rejected, to be quarantined instead of
+written. Rules are compiled once and applied field by field over the batch.
+"""
+
+import os
+import re
+import sys
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.event_record import to_document
+from utils.storage import UpdateOne
+
+
+# Same pattern as the model's URL validators
+URL_PATTERN = re.compile(r'https?://.+')
+
+# Mirrors the Event model; every string field of the model is trimmed
+EVENT_SCHEMA = {
+    'title': {'type': str, 'required': True, 'maxlength': 200},
+    'date': {'type': datetime, 'required': True},
+    'location': {'type': str, 'required': True, 'maxlength': 300},
+    'description': {'type': str, 'required': True, 'maxlength': 2000},
+    'image_url': {'type': str, 'match': URL_PATTERN},
+    'ticket_url': {'type': str, 'required': True, 'match': URL_PATTERN},
+    'source': {'type': str, 'required': True},
+}
+
+# Marks a value cut at its maxlength
+ELLIPSIS = '…'
+
+
+def utf16_length(text):
+    """
+    Length of a string as JavaScript (and so the model's maxlength) counts it,
+    in UTF-16 code units: characters outside the BMP count twice.
+    
+    Args:
+        text (str): String to measure
+    
+    Returns:
+        int: UTF-16 code units
+    """
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-16-le')) // 2
+
+
+def truncate(text, limit):
+    """
+    Cut a string to at most limit UTF-16 code units, ending it with an ellipsis.
+    
+    Args:
+        text (str): String longer than limit
+        limit (int): Maximum length
+    
+    Returns:
+        str: Truncated string
+    """
+    # Slicing the encoded text never splits a surrogate pair: a half pair is dropped
+    head = text.encode('utf-16-le')[:(limit - 1) * 2].decode('utf-16-le', errors='ignore')
+    return head.rstrip() + ELLIPSIS
+
+
+def _replace(event, field, value):
+    """
+    Set a field without changing the event's identity: the event hash stays
+    the one the scraper gave it, so the event still matches what is stored.
+    """
+    event_hash = event.get('event_hash')
+    event[field] = value
+    if event_hash:
+        event['event_hash'] = event_hash
+
+
+class EventValidator:
+    """
+    Validation of event batches against a schema in the form of EVENT_SCHEMA.
+    
+    Rule names are '<field>:<rule>', e.g. 'ticket_url:match'. Rejections are
+    counted per rule; so are the normalizations that let an event through
+    ('title:maxlength' for a truncated title, 'image_url:match' for a cleared
+    image URL).
+    """
+    
+    def __init__(self, schema=None):
+        """
+        Args:
+            schema (dict, optional): Field to rules (type, required, maxlength,
+                match); EVENT_SCHEMA if omitted
+        """
+        schema = EVENT_SCHEMA if schema is None else schema
+        self.fields = [
+            (field, rules['type'], rules.get('required', False), rules.get('maxlength'),
+             rules['match'].match if rules.get('match') else None)
+            for field, rules in schema.items()
+        ]
+    
+    def validate(self, events):
+        """
+        Normalize a batch of events in place and split off the invalid ones.
+        
+        Args:
+            events (list): Events (Event records or dictionaries)
+        
+        Returns:
+            dict: 'valid' events, 'rejected' (event, rule names) pairs, and
+                'rejections' and 'normalized' counts per rule
+        """
+        failed = {}
+        rejections = {}
+        normalized = {}
+        
+        for field, kind, required, maxlength, match in self.fields:
+            for i, event in enumerate(events):
+                value = event.get(field)
+                
+                if kind is str and isinstance(value, str):
+                    stripped = value.strip()
+                    if stripped != value:
+                        value = stripped
+                        _replace(event, field, value)
+                
+                if value is None or value == '':
+                    if required:
+                        failed.setdefault(i, []).append(f"{field}:required")
+                    continue
+                
+                if not isinstance(value, kind):
+                    failed.setdefault(i, []).append(f"{field}:type")
+                    continue
+                
+                if maxlength is not None and len(value) > maxlength // 2 and utf16_length(value) > maxlength:
+                    _replace(event, field, truncate(value, maxlength))
+                    rule = f"{field}:maxlength"
+                    normalized[rule] = normalized.get(rule, 0) + 1
+                
+                if match is not None and not match(value):
+                    rule = f"{field}:match"
+                    if required:
+                        failed.setdefault(i, []).append(rule)
+                    else:
+                        _replace(event, field, '')
+                        normalized[rule] = normalized.get(rule, 0) + 1
+        
+        rejected = []
+        for i, rules in failed.items():
+            rejected.append((events[i], rules))
+            for rule in rules:
+                rejections[rule] = rejections.get(rule, 0) + 1
+        
+        return {
+            'valid': [event for i, event in enumerate(events) if i not in failed],
+            'rejected': rejected,
+            'rejections': rejections,
+            'normalized': normalized
+        }
+
+
+def quarantine_events(collection, rejected, run_id=None):
+    """
+    Keep rejected events aside for inspection, one document per event: a
+    rejected event seen again replaces its earlier quarantine entry.
+    
+    Args:
+        collection: MongoDB collection, e.g. db.quarantine
+        rejected (list): (event, rule names) pairs from EventValidator.validate()
+        run_id (str, optional): Run the events were rejected in
+    
+    Returns:
+        int: Events quarantined
+    """
+    requests = []
+    for event, rules in rejected:
+        document = dict(to_document(event))
+        document.pop('_id', None)
+        requests.append(UpdateOne(
+            {'event_hash': document.get('event_hash'), 'source': document.get('source')},
+            {'$set': {
+                'event': document,
+                'rules': rules,
+                'run_id': run_id,
+                'quarantined_at': datetime.now()
+            }},
+            upsert=True
+        ))
+    
+    if requests:
+        collection.bulk_write(requests, ordered=False)
+    return len(requests)
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    from datetime import timedelta
+    
+    now = datetime.now()
+    events = [
+        {'title': '  Vivid Sydney  ', 'date': now + timedelta(days=5), 'location': 'Circular Quay',
+         'description': 'Lights ' * 400, 'image_url': 'img/vivid.jpg',
+         'ticket_url': 'https://example.com/vivid', 'source': 'demo'},
+        {'title': 'No Details', 'date': now, 'location': 'The Rocks', 'description': '',
+         'image_url': '', 'ticket_url': 'mailto:tickets@example.com', 'source': 'demo'},
+        {'title': 'Jazz Night', 'date': '2025-01-01', 'location': 'The Basement',
+         'description': 'Live jazz', 'ticket_url': 'http://example.com/jazz', 'source': 'demo'},
+    ]
+    
+    result = EventValidator().validate(events)
+    print(f"Valid: {len(result['valid'])}, rejected: {len(result['rejected'])}")
+    print(f"Rejections: {result['rejections']}")
+    print(f"Normalized: {result['normalized']}")
+    valid = result['valid'][0]
+    print(f"Title: {valid['title']!r}, description: {len(valid['description'])} chars, "
+          f"image: {valid['image_url']!r}")
+    print(f"Truncated emoji: {truncate('ab' + chr(0x1F389) * 3, 4)!r}")
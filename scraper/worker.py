@@ -0,0 +1,327 @@
+"""
+Distributed Scraper Worker
+Runs scraper tasks claimed from a shared MongoDB lease queue
+
+Each source is a task of its own. The stages over the whole catalogue
+(vanished-event diff, catalog version, snapshot, API payloads) run once per
+city and seeding round, in a finalize task queued when the last of its
+source tasks has finished.
+
+Usage:
+    python worker.py seed                  # enqueue one task per source
+    python worker.py work --processes 4    # start 4 worker processes on this node
+    python worker.py status                # show task counts by status
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from run_scraper import ScraperRunner
+from sources.registry import select_sources
+from utils.lease_queue import LeaseQueue, make_worker_id, DEFAULT_LEASE_SECONDS
+from utils.page_archive import make_run_id
+from utils.storage import connect_database
+
+
+# benchmarks/worker_scaling.py points its workers at a collection of their own
+TASK_COLLECTION = os.getenv('WORKER_TASK_COLLECTION', 'crawl_tasks')
+
+
+def get_queue(lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Connect to MongoDB and open the shared task queue.
+    
+    Args:
+        lease_seconds (int): Lease duration for claimed tasks
+    
+    Returns:
+        LeaseQueue: Queue backed by the crawl_tasks collection
+    """
+    mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/sydney-events')
+    db = connect_database(mongodb_uri)
+    return LeaseQueue(db[TASK_COLLECTION], lease_seconds=lease_seconds)
+
+
+def seed_tasks(queue, round_id=None):
+    """
+    Enqueue one scrape task per configured source.
+    
+    Args:
+        queue (LeaseQueue): Shared task queue
+        round_id (str, optional): Seeding round the tasks belong to; a new one if omitted
+    
+    Returns:
+        int: Number of tasks added or re-opened
+    """
+    queue.ensure_indexes()
+    round_id = round_id or make_run_id()
+    
+    added = 0
+    for spec in select_sources():
+        payload = {'source': spec['name'], 'city': spec['city']}
+        if queue.enqueue(f"source:{spec['name']}", 'source', payload, round_id=round_id):
+            added += 1
+    
+    return added
+
+
+def enqueue_finalize(queue, task):
+    """
+    Queue the finalize task of a source task's city and round, once none of
+    the round's source tasks in that city is left to run.
+    
+    Args:
+        queue (LeaseQueue): Shared task queue
+        task (dict): Source task that just finished or was parked
+    
+    Returns:
+        bool: True if the finalize task was queued
+    """
+    city = task['payload'].get('city')
+    live = queue.collection.count_documents({
+        'kind': 'source',
+        'round': task.get('round'),
+        'payload.city': city,
+        'status': {'$in': ['pending', 'leased']}
+    })
+    if live:
+        return False
+    
+    # Queued at most once per round, however many workers see the round end
+    return queue.enqueue(f"finalize:{city}", 'finalize', {'city': city},
+                         priority=-1, round_id=task.get('round'))
+
+
+def run_source(task):
+    """
+    Scrape one source, leaving the whole-catalogue stages to the finalize task.
+    
+    Args:
+        task (dict): Claimed source task
+    
+    Returns:
+        dict: Event count, and the event hashes, crawl completeness and
+            change counts the finalize task needs
+    """
+    source = task['payload']['source']
+    runner = ScraperRunner(sources=[source], city=task['payload'].get('city'))
+    runner.run(finalize=False)
+    
+    result = {
+        'events': len(runner.all_events),
+        'partial': source in runner.partial_sources,
+        'changes': runner.changes.get(source, {})
+    }
+    # Only a source that scraped successfully is diffed
+    if source in runner.seen_hashes:
+        result['seen'] = sorted(runner.seen_hashes[source])
+    return result
+
+
+def run_finalize(queue, task):
+    """
+    Diff and publish the catalogue of a city from the results of its round's source tasks.
+    
+    Args:
+        queue (LeaseQueue): Shared task queue
+        task (dict): Claimed finalize task
+    
+    Returns:
+        dict: Diff report and change counts
+    """
+    city = task['payload'].get('city')
+    done = list(queue.collection.find({
+        'kind': 'source',
+        'round': task.get('round'),
+        'payload.city': city,
+        'status': 'done'
+    }))
+    
+    seen = {}
+    partial = []
+    changes = {}
+    for source_task in done:
+        source = source_task['payload']['source']
+        result = source_task.get('result') or {}
+        if 'seen' in result:
+            seen[source] = result['seen']
+        if result.get('partial'):
+            partial.append(source)
+        if result.get('changes'):
+            changes[source] = result['changes']
+    
+    runner = ScraperRunner(sources=sorted(seen), city=city)
+    return runner.finalize(seen, partial, changes)
+
+
+def run_bench(task):
+    """
+    Stand in for a source task in benchmarks/worker_scaling.py: wait as long
+    as its fetches would, then spend CPU time as its parsing would.
+    
+    Args:
+        task (dict): Claimed bench task, with 'wait' and 'cpu' seconds in its payload
+    
+    Returns:
+        dict: Id of the process that ran it
+    """
+    time.sleep(task['payload'].get('wait', 0))
+    busy_until = time.process_time() + task['payload'].get('cpu', 0)
+    while time.process_time() < busy_until:
+        pass
+    return {'pid': os.getpid()}
+
+
+def run_task(queue, task):
+    """
+    Execute a claimed task.
+    
+    Args:
+        queue (LeaseQueue): Shared task queue
+        task (dict): Claimed task document
+    
+    Returns:
+        dict: Result summary stored on the task
+    """
+    if task['kind'] == 'source':
+        return run_source(task)
+    if task['kind'] == 'finalize':
+        return run_finalize(queue, task)
+    if task['kind'] == 'bench':
+        return run_bench(task)
+    raise ValueError(f"Unknown task kind: {task['kind']}")
+
+
+def keep_lease(queue, task, worker_id, stop):
+    """
+    Heartbeat a task's lease until the stop event is set.
+    
+    Args:
+        queue (LeaseQueue): Shared task queue
+        task (dict): Claimed task document
+        worker_id (str): Id of the worker holding the lease
+        stop (threading.Event): Set when the task finishes
+    """
+    while not stop.wait(queue.lease_seconds / 3):
+        if not queue.heartbeat(task, worker_id):
+            print(f"[WARNING] {worker_id} lost lease on {task['_id']}")
+            return
+
+
+def work(lease_seconds=DEFAULT_LEASE_SECONDS, idle_exit=True, poll_interval=5):
+    """
+    Claim and run tasks until the queue is drained.
+    
+    Args:
+        lease_seconds (int): Lease duration for claimed tasks
+        idle_exit (bool): Exit when no task is available instead of polling
+        poll_interval (int): Seconds to wait between polls of an empty queue
+    
+    Returns:
+        int: Number of tasks completed by this worker
+    """
+    queue = get_queue(lease_seconds)
+    worker_id = make_worker_id()
+    completed = 0
+    
+    print(f"[OK] Worker {worker_id} started")
+    
+    while True:
+        # Tasks whose worker died on their last attempt end their round like failed ones
+        for parked in queue.park_expired():
+            print(f"[WARNING] {worker_id} parked {parked['_id']}: {parked['error']}")
+            if parked['kind'] == 'source':
+                enqueue_finalize(queue, parked)
+        
+        task = queue.claim(worker_id)
+        
+        if task is None:
+            if idle_exit:
+                break
+            time.sleep(poll_interval)
+            continue
+        
+        print(f"[OK] {worker_id} claimed {task['_id']} (attempt {task['attempts']})")
+        
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=keep_lease, args=(queue, task, worker_id, stop), daemon=True)
+        heartbeat.start()
+        
+        try:
+            result = run_task(queue, task)
+            if queue.complete(task, worker_id, result):
+                completed += 1
+            else:
+                # The lease expired and another worker has the task now; its result counts
+                print(f"[WARNING] {worker_id} lost lease on {task['_id']} before completing it, "
+                      f"result discarded")
+        except Exception as e:
+            print(f"[ERROR] {worker_id} failed {task['_id']}: {e}")
+            queue.fail(task, worker_id, str(e))
+        finally:
+            stop.set()
+            heartbeat.join()
+        
+        if task['kind'] == 'source' and enqueue_finalize(queue, task):
+            print(f"[OK] {worker_id} queued finalize:{task['payload'].get('city')}")
+    
+    print(f"[OK] Worker {worker_id} finished: {completed} tasks")
+    return completed
+
+
+def main():
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='Distributed scraper worker')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    subparsers.add_parser('seed', help='Enqueue one task per source')
+    subparsers.add_parser('status', help='Show task counts by status')
+    
+    work_parser = subparsers.add_parser('work', help='Claim and run tasks')
+    work_parser.add_argument('--processes', type=int, default=1,
+                             help='Worker processes to start on this node')
+    work_parser.add_argument('--lease-seconds', type=int, default=DEFAULT_LEASE_SECONDS,
+                             help='Lease duration for claimed tasks')
+    work_parser.add_argument('--forever', action='store_true',
+                             help='Keep polling instead of exiting when the queue is drained')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'seed':
+        print(f"[OK] Enqueued {seed_tasks(get_queue())} tasks")
+    
+    elif args.command == 'status':
+        for status, count in sorted(get_queue().stats().items()):
+            print(f"  {status}: {count}")
+    
+    elif args.command == 'work':
+        worker_args = (args.lease_seconds, not args.forever)
+        
+        if args.processes == 1:
+            work(*worker_args)
+            return
+        
+        processes = [
+            multiprocessing.Process(target=work, args=worker_args)
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()